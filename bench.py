@@ -0,0 +1,244 @@
+import argparse
+import collections
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from unittest import mock
+
+import local as lcl
+import main
+import raster
+from geometry import calculate_hexagon_centers, clear_geometry_cache
+from patterns import alternation, chess_pattern, pattern_colors
+
+
+# Hexagons per row (and per column) of the benchmarked grids.
+BENCH_SIZES = (4, 10, 100, 1000, 10000)
+# Grid size in pixels passed to the geometry.
+BENCH_GRID_SIZE = 500
+# Relative loss of throughput, or growth of peak memory, reported as a regression.
+REGRESSION_THRESHOLD = 0.2
+# Minimum total time spent timing one benchmark at one size; the best run counts.
+MIN_TIME = 0.2
+MAX_REPEATS = 5
+
+
+class HeadlessTurtle:
+    """
+    Stand-in for the turtle module: drawing calls do nothing, timers run in order.
+    """
+
+    class Terminator(Exception):
+        pass
+
+    def __init__(self):
+        self.timers = collections.deque()
+        self.calls = 0
+
+    def __getattr__(self, name: str):
+        return self._ignore
+
+    def _ignore(self, *args, **kwargs) -> None:
+        self.calls += 1
+
+    def ontimer(self, fun, t: int = 0) -> None:
+        self.timers.append(fun)
+
+    def run(self) -> None:
+        """
+        Call scheduled timers, including the ones they schedule, until none are left.
+        """
+
+        while self.timers:
+            self.timers.popleft()()
+
+
+def _animate(n: int):
+    """
+    animate_drawing of an n x n grid on HeadlessTurtle with sleeping disabled.
+    """
+
+    centers, side = calculate_hexagon_centers(n, BENCH_GRID_SIZE)
+    colors = pattern_colors(n, 'red', 'blue', f'{lcl.CHEQUERED}', '')
+
+    def run():
+        stub = HeadlessTurtle()
+        with mock.patch.object(main, 'turtle', stub), mock.patch('time.sleep'):
+            main.animate_drawing(centers, colors, side, 3, f'{lcl.BLACK}'.lower(), 5,
+                                 duration=None)
+            stub.run()
+
+    return run
+
+
+def _centers(n: int):
+    def run():
+        clear_geometry_cache()
+        calculate_hexagon_centers(n, BENCH_GRID_SIZE)
+
+    return run
+
+
+def _render(n: int):
+    centers, side = calculate_hexagon_centers(n, BENCH_GRID_SIZE)
+    colors = pattern_colors(n, 'red', 'blue', f'{lcl.CHEQUERED}', '')
+    return lambda: raster.render(centers, colors, side, 3, f'{lcl.BLACK}'.lower(), 5)
+
+
+# name: (setup returning the function to time, largest grid in cells)
+BENCHMARKS = {
+    'calculate_hexagon_centers': (_centers, 10 ** 7),
+    'chess_pattern': (lambda n: lambda: chess_pattern(n, 'red', 'blue'), 10 ** 7),
+    'alternation': (lambda n: lambda: alternation(n, f'{lcl.ROW_BY_ROW}', 'red', 'blue'),
+                    10 ** 7),
+    'pattern_colors': (lambda n: lambda: pattern_colors(n, 'red', 'blue',
+                                                        f'{lcl.ALTERNATING_COLORS}',
+                                                        f'{lcl.COLUMN_WISE}'), 10 ** 7),
+    'animate_drawing': (_animate, 10 ** 5),
+    'raster.render': (_render, 10 ** 6),
+}
+
+
+def measure(fun) -> tuple:
+    """
+    Best wall time of a function over a few runs, and its peak traced memory.
+
+    Args:
+        fun: Function without arguments.
+
+    Returns:
+        tuple: (seconds, peak bytes)
+    """
+
+    tracemalloc.start()
+    try:
+        fun()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    best = float('inf')
+    total = 0.0
+    for _ in range(MAX_REPEATS):
+        start = time.perf_counter()
+        fun()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+        if total >= MIN_TIME:
+            break
+
+    return best, peak
+
+
+def run_benchmarks(names: list = None, sizes: tuple = BENCH_SIZES, max_cells: int = None) -> dict:
+    """
+    Time every benchmark at every grid size.
+
+    Args:
+        names (list): Benchmarks to run; defaults to all of BENCHMARKS.
+        sizes (tuple): Hexagons per row and column.
+        max_cells (int): Skip grids with more cells; defaults to the limit
+            of each benchmark.
+
+    Returns:
+        dict: {name: {N: {'seconds', 'cells_per_sec', 'peak_mb'}}}, with N
+        as a string, as stored in JSON.
+    """
+
+    results = {}
+    for name in names or BENCHMARKS:
+        setup, limit = BENCHMARKS[name]
+        results[name] = {}
+        for n in sizes:
+            if n * n > (max_cells or limit):
+                print(f"skip {name:26} {n:>6}")
+                continue
+            seconds, peak = measure(setup(n))
+            results[name][str(n)] = {
+                'seconds': seconds,
+                'cells_per_sec': n * n / seconds if seconds else float('inf'),
+                'peak_mb': peak / 2 ** 20,
+            }
+            print(f"     {name:26} {n:>6} {n * n / seconds:14,.0f} cells/s"
+                  f" {peak / 2 ** 20:9.1f} MB")
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float = REGRESSION_THRESHOLD) -> list:
+    """
+    Find benchmarks that got slower or use more memory than a baseline.
+
+    Args:
+        results (dict): Result of run_benchmarks.
+        baseline (dict): Earlier result of run_benchmarks.
+        threshold (float): Tolerated relative change.
+
+    Returns:
+        list: One message per regression.
+    """
+
+    regressions = []
+    for name, by_size in results.items():
+        for n, now in by_size.items():
+            before = baseline.get(name, {}).get(n)
+            if before is None:
+                continue
+            if now['cells_per_sec'] < before['cells_per_sec'] * (1 - threshold):
+                regressions.append(f"{name} N={n}: {now['cells_per_sec']:,.0f} cells/s,"
+                                   f" baseline {before['cells_per_sec']:,.0f}")
+            # Ignore growth below a megabyte, which is allocator noise for small grids.
+            if (now['peak_mb'] > before['peak_mb'] * (1 + threshold)
+                    and now['peak_mb'] - before['peak_mb'] > 1):
+                regressions.append(f"{name} N={n}: {now['peak_mb']:.1f} MB,"
+                                   f" baseline {before['peak_mb']:.1f} MB")
+    return regressions
+
+
+def bench(argv: list = None) -> int:
+    """
+    Entry point: run the benchmarks, compare with and optionally save a baseline.
+
+    Args:
+        argv (list): Arguments without the program name; defaults to sys.argv.
+
+    Returns:
+        int: Exit status, 1 if a regression was found.
+    """
+
+    parser = argparse.ArgumentParser(description=f'{lcl.BENCH_DESCRIPTION}')
+    parser.add_argument('names', nargs='*', metavar='NAME',
+                        help=f"{lcl.BENCH_NAMES}{', '.join(BENCHMARKS)}")
+    parser.add_argument('--sizes', type=int, nargs='+', default=BENCH_SIZES,
+                        help=f'{lcl.BENCH_SIZES}')
+    parser.add_argument('--max-cells', type=int, help=f'{lcl.BENCH_MAX_CELLS}')
+    parser.add_argument('--baseline', help=f'{lcl.BENCH_BASELINE}')
+    parser.add_argument('--save', help=f'{lcl.BENCH_SAVE}')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help=f'{lcl.BENCH_THRESHOLD}')
+    args = parser.parse_args(argv)
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"{lcl.ERROR_UNKNOWN_OPTION}{', '.join(sorted(unknown))}")
+
+    results = run_benchmarks(args.names, tuple(args.sizes), args.max_cells)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(),
+                       'benchmarks': results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['benchmarks']
+        regressions = compare(results, baseline, args.threshold)
+        for message in regressions:
+            print(f'FAIL {message}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(bench(sys.argv[1:]))
@@ -0,0 +1,183 @@
+import numpy as np
+
+from geometry import (center_points, edge_polylines, grid_outline, hexagon_vertices,
+                      shared_edges)
+from lazy import lazy_import
+from settings import color_map, hex_color
+
+turtle = lazy_import('turtle')
+
+
+SHADOW_COLOR = "#686868"
+
+
+def polygon_coords(centers, side: float, offset: float = 0) -> np.ndarray:
+    """
+    Canvas coordinates of every hexagon polygon.
+
+    The turtle canvas has its origin in the middle and the y axis pointing
+    down, so turtle y coordinates are negated.
+
+    Args:
+        centers: List of (x, y) tuples, or an (x, y) tuple of arrays.
+        side (float): Side length of hexagons.
+        offset (float): Shift right and down, used for shadows.
+
+    Returns:
+        np.ndarray: (n, 12) array of x0, y0, ..., x5, y5 per hexagon.
+    """
+
+    points = center_points(centers)
+
+    vertices = hexagon_vertices(side)
+    coords = points[:, None, :] + vertices[None, :, :]
+    coords[..., 0] += offset
+    coords[..., 1] = offset - coords[..., 1]
+    return coords.reshape(len(points), 12)
+
+
+class CanvasGrid:
+    """
+    Hexagon grid drawn as one Tk polygon item per cell.
+
+    Item ids are kept by cell index, so recoloring, changing the border
+    or toggling the shadow reconfigures existing items instead of
+    drawing them again.
+    """
+
+    def __init__(self, canvas=None):
+        """
+        Args:
+            canvas: Tk canvas to draw on; defaults to the turtle canvas.
+        """
+
+        self.canvas = canvas if canvas is not None else turtle.getcanvas()
+        self.items = []
+        self.shadows = []
+        self.colors = []
+        self.shadow_intensity = 0
+        self.cell_tag = f"cells{id(self)}"
+        self.shadow_tag = f"shadows{id(self)}"
+        self.border_tag = f"borders{id(self)}"
+
+    def draw(self, centers, colors: list, side: float, thickness_width: int,
+             border_color: str, shadow_intensity: int, shared_borders: bool = False,
+             merged_shadow: bool = False) -> None:
+        """
+        Create the polygon items for the grid, replacing any previous ones.
+
+        Args:
+            centers: List of (x, y) tuples, or an (x, y) tuple of arrays.
+            colors (list): Corresponding fill colors for each hexagon.
+            side (float): Side length of hexagons.
+            thickness_width (int): Border line thickness.
+            border_color (str): Border color.
+            shadow_intensity (int): Shadow offset; 0 for no shadow.
+            shared_borders (bool): Stroke each lattice edge once as line items
+                on top of the cells instead of outlining every polygon.
+            merged_shadow (bool): Create one shadow polygon for the outline
+                of the whole grid instead of one per cell.
+        """
+
+        self.clear()
+        points = center_points(centers)
+        points = points[:min(len(points), len(colors))]
+        outline = hex_color(color_map.get(border_color, "black"))
+        self.shadow_intensity = shadow_intensity
+
+        if shadow_intensity > 0 and merged_shadow:
+            for line in grid_outline(points, side):
+                line = (line + (shadow_intensity, -shadow_intensity)) * (1, -1)
+                self.shadows.append(self.canvas.create_polygon(
+                    line[:-1].ravel().tolist(), fill=SHADOW_COLOR, outline="black",
+                    tags=(self.shadow_tag,)))
+        elif shadow_intensity > 0:
+            for coords in polygon_coords(points, side, shadow_intensity).tolist():
+                self.shadows.append(self.canvas.create_polygon(
+                    coords, fill=SHADOW_COLOR, outline="black", tags=(self.shadow_tag,)))
+
+        cell_outline = "" if shared_borders else outline
+        for coords, color in zip(polygon_coords(points, side).tolist(), colors):
+            item = self.canvas.create_polygon(coords, fill=hex_color(color), outline=cell_outline,
+                                              width=thickness_width, tags=(self.cell_tag,))
+            self.items.append(item)
+            self.colors.append(color)
+
+        if shared_borders:
+            for line in edge_polylines(shared_edges(points, side)):
+                line = line * (1, -1)
+                self.canvas.create_line(line.ravel().tolist(), fill=outline,
+                                        width=thickness_width, capstyle="round",
+                                        joinstyle="round", tags=(self.border_tag,))
+
+    def recolor(self, colors: list) -> int:
+        """
+        Change cell fills in place, touching only cells shown in another color.
+
+        Args:
+            colors (list): New fill color for each hexagon.
+
+        Returns:
+            int: Number of cells reconfigured.
+        """
+
+        changed = 0
+        for i, (item, old, new) in enumerate(zip(self.items, self.colors, colors)):
+            if old != new:
+                self.colors[i] = new
+                fill = hex_color(new)
+                # 'red' and '#ff0000' are the same fill.
+                if fill != hex_color(old):
+                    self.canvas.itemconfigure(item, fill=fill)
+                    changed += 1
+        return changed
+
+    def set_color(self, i: int, color: str) -> None:
+        """
+        Change the fill of a single cell.
+
+        Args:
+            i (int): Cell index.
+            color (str): New fill color.
+        """
+
+        self.canvas.itemconfigure(self.items[i], fill=hex_color(color))
+        self.colors[i] = color
+
+    def set_border(self, thickness_width: int, border_color: str) -> None:
+        """
+        Change the border of every cell with a single canvas call.
+
+        Args:
+            thickness_width (int): Border line thickness.
+            border_color (str): Border color.
+        """
+
+        color = hex_color(color_map.get(border_color, "black"))
+        if self.canvas.find_withtag(self.border_tag):
+            self.canvas.itemconfigure(self.border_tag, width=thickness_width, fill=color)
+        else:
+            self.canvas.itemconfigure(self.cell_tag, width=thickness_width, outline=color)
+
+    def show_shadow(self, visible: bool) -> None:
+        """
+        Show or hide the shadows drawn by draw(), keeping their offset.
+
+        Args:
+            visible (bool): Whether shadows are shown.
+        """
+
+        self.canvas.itemconfigure(self.shadow_tag, state="normal" if visible else "hidden")
+
+    def clear(self) -> None:
+        """
+        Delete all items created by this grid.
+        """
+
+        self.canvas.delete(self.shadow_tag)
+        self.canvas.delete(self.cell_tag)
+        self.canvas.delete(self.border_tag)
+        self.items.clear()
+        self.shadows.clear()
+        self.colors.clear()
+        self.shadow_intensity = 0
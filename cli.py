@@ -0,0 +1,424 @@
+import argparse
+import functools
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import geometry
+import instrument
+import local as lcl
+import main
+import mosaic
+import patterns
+import raster
+import recorder
+import render_cache
+import settings
+import tiles
+import vector_export
+
+
+DEFAULT_JOB = {
+    'n': 10,
+    'rows': None,
+    'colors': ['red', 'blue'],
+    'border_thickness': f'{lcl.THIN}',
+    'border_color': f'{lcl.BLACK}'.lower(),
+    'shadow': f'{lcl.NO}',
+    'pattern': f'{lcl.CHEQUERED}',
+    'pattern_type': f'{lcl.ROW_BY_ROW}',
+    'size': 500,
+    'width': 800,
+    'height': 800,
+    'output': None,
+    'lod': None,
+    'image': None,
+    'snap': False,
+    'frame_cells': 1,
+    'tiled': None,
+}
+
+# Accepted spellings of yes/no options, as in query strings and configs.
+FLAG_WORDS = {'1': True, 'true': True, 'yes': True, '0': False, 'false': False, 'no': False}
+
+
+def _choice(value, options: dict, name: str) -> int:
+    """
+    Resolve a named option such as 'тонкий' or a plain integer.
+
+    Args:
+        value: Option name or number.
+        options (dict): Mapping of option names to values.
+        name (str): Parameter name for the error message.
+
+    Returns:
+        int: Resolved value.
+
+    Raises:
+        ValueError: If the value is neither a known name nor one of the
+            option values.
+    """
+
+    text = str(value).strip().lower()
+    if text in options:
+        return options[text]
+    if not isinstance(value, bool) and text.isdigit() and int(text) in options.values():
+        return int(text)
+    raise ValueError(f'{lcl.ERROR_UNKNOWN_OPTION}{name}: {value}')
+
+
+def _flag(value, name: str) -> bool:
+    """
+    Resolve a yes/no option given as a boolean, 0/1 or a word.
+
+    Args:
+        value: Option value, e.g. True, 0 or 'false'.
+        name (str): Parameter name for the error message.
+
+    Returns:
+        bool: Resolved value.
+
+    Raises:
+        ValueError: If the value is not a recognized yes or no.
+    """
+
+    text = str(value).strip().lower()
+    if text in FLAG_WORDS:
+        return FLAG_WORDS[text]
+    raise ValueError(f'{lcl.ERROR_UNKNOWN_OPTION}{name}: {value}')
+
+
+def _color(value: str) -> str:
+    """
+    Resolve a fill color given by palette name (Russian), English name or HEX.
+
+    Args:
+        value (str): Color as written in the job.
+
+    Returns:
+        str: Turtle color.
+    """
+
+    text = str(value).strip().lower()
+    palette = {c[0][1:].lower(): c[1]
+               for c in settings.available_colors_1 + settings.available_colors_2
+               if c[1] is not None}
+    return palette.get(text) or settings.validate_color(text)
+
+
+def normalize_job(job: dict) -> dict:
+    """
+    Fill in defaults and validate one render job.
+
+    Args:
+        job (dict): Render parameters; keys as in DEFAULT_JOB.
+
+    Returns:
+        dict: Job with resolved numbers and colors.
+
+    Raises:
+        ValueError: If a parameter is invalid.
+    """
+
+    unknown = set(job) - set(DEFAULT_JOB)
+    if unknown:
+        raise ValueError(f'{lcl.ERROR_UNKNOWN_OPTION}{", ".join(sorted(unknown))}')
+
+    result = dict(DEFAULT_JOB, **job)
+
+    result['n'] = int(result['n'])
+    result['rows'] = result['n'] if result['rows'] is None else int(result['rows'])
+    result['size'] = float(result['size'])
+    result['width'] = int(result['width'])
+    result['height'] = int(result['height'])
+    numbers = (result['n'], result['rows'], result['size'], result['width'], result['height'])
+    if not all(0 < number < math.inf for number in numbers):
+        raise ValueError(f'{lcl.ERROR_INVALID_NUMBER}')
+
+    if len(result['colors']) != 2:
+        raise ValueError(f'{lcl.ERROR_UNKNOWN_OPTION}colors: {result["colors"]}')
+    result['colors'] = [_color(c) for c in result['colors']]
+
+    result['border_thickness'] = _choice(result['border_thickness'], settings.thickness_options,
+                                         'border_thickness')
+    result['shadow'] = _choice(result['shadow'], settings.shadow_options, 'shadow')
+
+    border = str(result['border_color']).strip().lower()
+    if border not in settings.color_map:
+        raise ValueError(f'{lcl.ERROR_UNKNOWN_OPTION}border_color: {result["border_color"]}')
+    result['border_color'] = border
+
+    result['pattern'] = str(result['pattern']).strip().lower()
+    if result['pattern'] not in (f'{lcl.CHEQUERED}', f'{lcl.ALTERNATING_COLORS}'):
+        raise ValueError(f'{lcl.ERROR_UNKNOWN_OPTION}pattern: {result["pattern"]}')
+    result['pattern_type'] = str(result['pattern_type']).strip().lower()
+    if result['pattern_type'] not in (f'{lcl.ROW_BY_ROW}', f'{lcl.COLUMN_WISE}'):
+        raise ValueError(f'{lcl.ERROR_UNKNOWN_OPTION}pattern_type: {result["pattern_type"]}')
+
+    result['snap'] = _flag(result['snap'], 'snap')
+    if result['tiled'] is not None:
+        result['tiled'] = _flag(result['tiled'], 'tiled')
+    result['frame_cells'] = int(result['frame_cells'])
+    if result['frame_cells'] < 1:
+        raise ValueError(f'{lcl.ERROR_INVALID_NUMBER}')
+
+    lod = result['lod'] or {}
+    if not isinstance(lod, dict) or set(lod) - set(settings.lod_thresholds):
+        raise ValueError(f'{lcl.ERROR_UNKNOWN_OPTION}lod: {result["lod"]}')
+    result['lod'] = {key: float(value) for key, value in lod.items()}
+
+    return result
+
+
+def job_colors(job: dict) -> tuple:
+    """
+    Cell colors of a job: its two-color pattern, or a mosaic of its image.
+
+    Args:
+        job (dict): Job returned by normalize_job.
+
+    Returns:
+        tuple: (index array, palette list)
+    """
+
+    if job['image']:
+        return mosaic.mosaic_colors(job['image'], job['rows'], job['n'], job['size'],
+                                    job['snap'])
+
+    indices = patterns.pattern_indices(job['rows'], job['n'], job['pattern'], job['pattern_type'])
+    return indices, patterns.pattern_palette(*job['colors'])
+
+
+def render_job(job: dict, workers: int = 1, cache_dir: str = None,
+               cache_limit: int = render_cache.CACHE_LIMIT) -> str:
+    """
+    Render one normalized job to its output file without turtle.
+
+    The format follows the extension: .svg, .svgz and .pdf are written by
+    vector_export, .gif and .apng as a recording of the drawing animation,
+    anything else as PNG. A PNG larger than tiles.TILED_PIXELS, or any PNG
+    of a job with 'tiled' set, is rendered tile by tile through a file, so
+    the picture never has to fit into memory.
+
+    Args:
+        job (dict): Job returned by normalize_job.
+        workers (int): Processes for a PNG; more than one splits the
+            picture into tiles rendered by tiles.render_parallel.
+        cache_dir (str): Serve repeated jobs from a render_cache in this
+            directory; None renders every time.
+        cache_limit (int): Size of the cache in bytes.
+
+    Returns:
+        str: Path of the written file.
+    """
+
+    if cache_dir:
+        return render_cache.cached_render(job, functools.partial(render_job, workers=workers),
+                                          cache_dir, cache_limit)
+
+    is_vector = job['output'].lower().endswith(('.svg', '.svgz', '.pdf'))
+    is_animation = job['output'].lower().endswith(('.gif', '.apng'))
+    tiled = job['tiled']
+    if tiled is None:
+        tiled = job['width'] * job['height'] > tiles.TILED_PIXELS
+    if tiled and not is_vector and not is_animation and not job['image']:
+        tiles.render_tiled(job['output'], job['rows'], job['n'], job['size'], *job['colors'],
+                           job['pattern'], job['pattern_type'], job['border_thickness'],
+                           job['border_color'], job['shadow'], job['width'], job['height'])
+        return job['output']
+    if workers != 1 and not is_vector and not is_animation and not job['image']:
+        tiles.render_parallel(job['output'], job['rows'], job['n'], job['size'], *job['colors'],
+                              job['pattern'], job['pattern_type'], job['border_thickness'],
+                              job['border_color'], job['shadow'], job['width'], job['height'],
+                              workers=workers)
+        return job['output']
+
+    x, y, side = geometry.hexagon_center_arrays(job['rows'], job['n'], job['size'])
+
+    if is_animation:
+        recorder.record(job['output'], (x, y), job_colors(job), side, job['border_thickness'],
+                        job['border_color'], job['shadow'], job['width'], job['height'],
+                        job['frame_cells'])
+        return job['output']
+    if is_vector:
+        render = vector_export.export
+    else:
+        render = raster.render_png
+    render(job['output'], (x, y), job_colors(job), side, job['border_thickness'],
+           job['border_color'], job['shadow'], job['width'], job['height'])
+    return job['output']
+
+
+def run_jobs(jobs: list, workers: int = None, cache_dir: str = None,
+             cache_limit: int = render_cache.CACHE_LIMIT) -> list:
+    """
+    Render many jobs in parallel on a process pool.
+
+    A single job is rendered on all workers by splitting its picture.
+
+    Args:
+        jobs (list): Normalized jobs, each with an output path.
+        workers (int): Number of processes; defaults to the CPU count.
+        cache_dir (str): Render cache directory, see render_job.
+        cache_limit (int): Size of the cache in bytes.
+
+    Returns:
+        list: Written file paths, in job order.
+    """
+
+    if any(not job['output'] for job in jobs):
+        raise ValueError(f'{lcl.ERROR_NO_OUTPUT}')
+    render = functools.partial(render_job, cache_dir=cache_dir, cache_limit=cache_limit)
+    if len(jobs) == 1:
+        return [render(jobs[0], workers)]
+    if workers == 1:
+        return [render(job) for job in jobs]
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(render, jobs))
+
+
+def load_jobs(path: str) -> list:
+    """
+    Read jobs from a JSON config file.
+
+    The file holds either one job, a list of jobs, or an object whose
+    "jobs" list inherits every other top-level key as a default.
+
+    Args:
+        path (str): Config file path.
+
+    Returns:
+        list: Job dicts, not yet normalized.
+    """
+
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+
+    if isinstance(config, list):
+        return config
+    if 'jobs' in config:
+        defaults = {k: v for k, v in config.items() if k != 'jobs'}
+        return [dict(defaults, **job) for job in config['jobs']]
+    return [config]
+
+
+def draw_job(job: dict, trace: str = None) -> None:
+    """
+    Draw one normalized job in the turtle window.
+
+    Args:
+        job (dict): Job returned by normalize_job.
+        trace (str): Write per-stage timings and a Chrome trace of the
+            drawing to this JSON file once it is finished.
+    """
+
+    main.turtle.setup(job['width'], job['height'])
+    main.turtle.speed(0)
+    main.turtle.hideturtle()
+    main.turtle.bgcolor("white")
+
+    x, y, side = geometry.hexagon_center_arrays(job['rows'], job['n'], job['size'])
+    colors = patterns.resolve_colors(*job_colors(job))
+    centers = list(zip(x.tolist(), y.tolist()))
+
+    level = settings.level_of_detail(side, job['lod'])
+    print(settings.describe_detail(side, level))
+    if level['flat']:
+        main.draw_flat(centers, colors, side)
+        main.turtle.done()
+        return
+
+    profiler = instrument.Profiler() if trace else None
+
+    def on_done(animation: main.Animation) -> None:
+        if profiler is not None:
+            profiler.dump(trace)
+            print(f'{lcl.CLI_TRACE_WRITTEN}{trace}')
+
+    animation = main.animate_drawing(centers, colors, side, job['border_thickness'],
+                                     job['border_color'],
+                                     job['shadow'] if level['shadow'] else 0,
+                                     on_done=on_done, shared_borders=level['shared_borders'],
+                                     merged_shadow=level['merged_shadow'], profiler=profiler)
+    main.turtle.onkey(animation.toggle, 'space')
+    main.turtle.onkey(animation.cancel, 'Escape')
+    main.turtle.listen()
+    main.turtle.done()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Command line options mirroring the prompts of main().
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+
+    parser = argparse.ArgumentParser(description=f'{lcl.CLI_DESCRIPTION}')
+    parser.add_argument('--config', help=f'{lcl.CLI_CONFIG}')
+    parser.add_argument('-n', type=int, help=f'{lcl.CLI_N}')
+    parser.add_argument('--rows', type=int, help=f'{lcl.CLI_ROWS}')
+    parser.add_argument('--colors', nargs=2, metavar='COLOR', help=f'{lcl.CLI_COLORS}')
+    parser.add_argument('--border-thickness', help=f'{lcl.CLI_BORDER_THICKNESS}')
+    parser.add_argument('--border-color', help=f'{lcl.CLI_BORDER_COLOR}')
+    parser.add_argument('--shadow', help=f'{lcl.CLI_SHADOW}')
+    parser.add_argument('--pattern', help=f'{lcl.CLI_PATTERN}')
+    parser.add_argument('--pattern-type', help=f'{lcl.CLI_PATTERN_TYPE}')
+    parser.add_argument('--size', type=float, help=f'{lcl.CLI_SIZE}')
+    parser.add_argument('--width', type=int)
+    parser.add_argument('--height', type=int)
+    parser.add_argument('-o', '--output', help=f'{lcl.CLI_OUTPUT}')
+    parser.add_argument('-j', '--workers', type=int, help=f'{lcl.CLI_WORKERS}')
+    parser.add_argument('--image', help=f'{lcl.CLI_IMAGE}')
+    parser.add_argument('--snap', action='store_true', default=None, help=f'{lcl.CLI_SNAP}')
+    parser.add_argument('--tiled', action=argparse.BooleanOptionalAction,
+                        help=f'{lcl.CLI_TILED}')
+    parser.add_argument('--frame-cells', type=int, help=f'{lcl.CLI_FRAME_CELLS}')
+    parser.add_argument('--cache', nargs='?', const=render_cache.CACHE_DIR, metavar='DIR',
+                        help=f'{lcl.CLI_CACHE}')
+    parser.add_argument('--cache-limit', type=float, metavar='MB', help=f'{lcl.CLI_CACHE_LIMIT}')
+    parser.add_argument('--trace', help=f'{lcl.CLI_TRACE}')
+    parser.add_argument('--lod', type=float, nargs=4,
+                        metavar=('SHADOW', 'BORDERS', 'FLAT', 'MERGED_SHADOW'),
+                        help=f'{lcl.CLI_LOD}')
+    return parser
+
+
+def cli(argv: list = None) -> None:
+    """
+    Entry point: render jobs from command line options and/or a config file.
+
+    Command line options override the matching keys of every config job.
+
+    Args:
+        argv (list): Arguments without the program name; defaults to sys.argv.
+    """
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    overrides = {key: value for key, value in vars(args).items()
+                 if key in DEFAULT_JOB and value is not None}
+    if args.lod:
+        overrides['lod'] = dict(zip(settings.lod_thresholds, args.lod))
+    jobs = load_jobs(args.config) if args.config else [{}]
+
+    try:
+        jobs = [normalize_job(dict(job, **overrides)) for job in jobs]
+        if len(jobs) == 1 and not jobs[0]['output']:
+            draw_job(jobs[0], args.trace)
+            return
+        cache_limit = int(args.cache_limit * 2 ** 20) if args.cache_limit else \
+            render_cache.CACHE_LIMIT
+        for path in run_jobs(jobs, args.workers, args.cache, cache_limit):
+            print(f'{lcl.CLI_RENDERED}{path}')
+    except ValueError as error:
+        parser.error(str(error))
+
+
+if __name__ == '__main__':
+    cli(sys.argv[1:])
@@ -1,17 +1,19 @@
-import turtle
 import math
+import turtle
+
+from geometry import calculate_hexagon_centers, hexagon_path
 
 def draw_hexagon(x, y, side_length): #код маши без заливки
-    turtle.right(30)
+    #вершины из общего шаблона geometry; он привязан к левой верхней вершине,
+    #а (x, y) здесь, как раньше при turtle.right(30), верхняя вершина
+    path = hexagon_path(x - math.sqrt(3) / 2 * side_length, y - side_length / 2, side_length)
 
     turtle.up()
-    turtle.goto(x, y)
+    turtle.goto(path[0])
     turtle.down()
 
-    for _ in range(6):
-        turtle.forward(side_length)
-        turtle.right(60)
-    turtle.left(30)
+    for point in path[1:]:
+        turtle.goto(point)
 
 def get_num_hexagons():
     while True:
@@ -28,23 +30,10 @@ def main():
     N = get_num_hexagons() #ввод количества шестиугольников в строке
 
     size = 500
-    side_length = size / N #длина стороны зависит от количества
-    diagonal = math.sqrt(3) * side_length
-
-    start_x_0 = -size + diagonal #начальное положение
-    start_y_0 = size - side_length
-
-    for row in range(N): #смещение по координате y
-        y_offset = start_y_0 - row * side_length * 1.5
-        if row % 2 == 0: #проверяет четная ли строка по счету
-            x_offset = start_x_0 #если да, то она принимает начальное положение
-        else:
-            x_offset = start_x_0 + diagonal / 2 # иначе сдвигается вправо
-
-        for col in range(N):
-            x = x_offset + col * diagonal
-            y = y_offset
-            draw_hexagon(x, y, side_length)
+    centers, side_length = calculate_hexagon_centers(N, size) #общая сетка из geometry
+
+    for x, y in centers:
+        draw_hexagon(x, y, side_length)
 
     turtle.done()
 
@@ -0,0 +1,409 @@
+import functools
+import math
+
+import numpy as np
+
+
+# Number of distinct grids, and of distinct hexagon sizes, kept by the caches.
+GEOMETRY_CACHE_SIZE = 16
+
+# Vertices of the hexagon with side 1 traced by the turtle draw functions:
+# starting at the upper-left vertex, heading 30 degrees and turning right
+# by 60 degrees after each side.
+UNIT_HEXAGON = np.array([(0.0, 0.0), (math.sqrt(3) / 2, 0.5), (math.sqrt(3), 0.0),
+                         (math.sqrt(3), -1.0), (math.sqrt(3) / 2, -1.5), (0.0, -1.0)])
+UNIT_HEXAGON.flags.writeable = False
+
+
+def read_only(array: np.ndarray) -> np.ndarray:
+    """
+    Make a cached array read-only, so no caller can change it for the others.
+    """
+
+    array.flags.writeable = False
+    return array
+
+
+def clear_geometry_cache() -> None:
+    """
+    Empty the geometry caches, e.g. to time the geometry work itself.
+    """
+
+    hexagon_center_arrays.cache_clear()
+    hexagon_polygons.cache_clear()
+    _center_tuples.cache_clear()
+    hexagon_vertices.cache_clear()
+
+
+def calculate_side_length(number: int, size: float) -> float:
+    """
+    Calculate the side length of each hexagon based on total size and number of hexagons.
+
+    Args:
+        number (int): Number of hexagons.
+        size (float): Total size or width constraint.
+
+    Returns:
+        float: Computed side length of a hexagon.
+    """
+
+    return size / (number + 0.5)
+
+
+def grid_layout(rows: int, cols: int, size: float) -> tuple:
+    """
+    Position of the first hexagon and the spacing of a rows x cols grid.
+
+    Cell (row, col) is at x = start_x + col * width_hex (+ width_hex / 2 on
+    odd rows) and y = start_y - row * side * 1.5.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of hexagons per row.
+        size (float): Approximate total size of the grid.
+
+    Returns:
+        tuple: (start_x, start_y, width_hex, side)
+    """
+
+    side = calculate_side_length(max(rows, cols), size)
+    width_hex = math.sqrt(3) * side
+
+    total_width = width_hex * cols
+    total_height = side * 1.5 * rows
+
+    start_x = -total_width / 2 + width_hex / 2
+    start_y = total_height / 2 - side / 2
+
+    return start_x, start_y, width_hex, side
+
+
+@functools.lru_cache(maxsize=GEOMETRY_CACHE_SIZE)
+def hexagon_center_arrays(rows: int, cols: int, size: float) -> tuple:
+    """
+    Calculate the centers coordinates for a rows x cols grid as flat arrays.
+
+    Cells are ordered row by row, as in calculate_hexagon_centers. The side
+    length is chosen so that the larger dimension fits into size. Results
+    are cached per (rows, cols, size) and the arrays are read-only.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of hexagons per row.
+        size (float): Approximate total size of the grid.
+
+    Returns:
+        tuple: (x array, y array, side length of hexagons); both arrays are
+        contiguous float64 of length rows * cols.
+    """
+
+    start_x, start_y, width_hex, side = grid_layout(rows, cols, size)
+
+    row = np.arange(rows, dtype=np.float64)[:, None]
+    col = np.arange(cols, dtype=np.float64)[None, :]
+
+    x = start_x + col * width_hex + (row % 2) * (width_hex / 2)
+    y = start_y - row * side * 1.5
+
+    x = np.ascontiguousarray(x, dtype=np.float64).reshape(-1)
+    y = np.ascontiguousarray(np.broadcast_to(y, (rows, cols)), dtype=np.float64).reshape(-1)
+
+    return read_only(x), read_only(y), side
+
+
+@functools.lru_cache(maxsize=GEOMETRY_CACHE_SIZE)
+def hexagon_polygons(rows: int, cols: int, size: float) -> np.ndarray:
+    """
+    Vertices of every hexagon of a rows x cols grid, cached like the centers.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of hexagons per row.
+        size (float): Approximate total size of the grid.
+
+    Returns:
+        np.ndarray: Read-only (rows * cols, 6, 2) array in turtle coordinates.
+    """
+
+    x, y, side = hexagon_center_arrays(rows, cols, size)
+    polygons = np.column_stack((x, y))[:, None, :] + hexagon_vertices(side)[None, :, :]
+
+    return read_only(polygons)
+
+
+@functools.lru_cache(maxsize=GEOMETRY_CACHE_SIZE)
+def _center_tuples(number: int, size: float) -> tuple:
+    """
+    Cached (x, y) tuples of calculate_hexagon_centers.
+    """
+
+    x, y, _ = hexagon_center_arrays(number, number, size)
+
+    return tuple(zip(x.tolist(), y.tolist()))
+
+
+def calculate_hexagon_centers(number: int, size: float) -> tuple:
+    """
+    Calculate the centers coordinates for a grid of hexagons.
+
+    Args:
+        number (int): Number of hexagons per row and column.
+        size (float): Approximate total size of the grid.
+
+    Returns:
+        tuple: (list of (x, y) centers, side length of hexagons)
+    """
+
+    side = hexagon_center_arrays(number, number, size)[2]
+
+    return list(_center_tuples(number, size)), side
+
+
+@functools.lru_cache(maxsize=GEOMETRY_CACHE_SIZE)
+def hexagon_vertices(side: float) -> np.ndarray:
+    """
+    Vertex offsets of the hexagon traced by the turtle draw functions.
+
+    The turtle starts at (x, y), heads 30 degrees and turns right by 60
+    degrees after each side, so (x, y) is the upper-left vertex.
+
+    Args:
+        side (float): Side length of hexagon.
+
+    Returns:
+        np.ndarray: Read-only (6, 2) array of (dx, dy) offsets in turtle
+        coordinates.
+    """
+
+    return read_only(UNIT_HEXAGON * side)
+
+
+def hexagon_path(x: float, y: float, side: float) -> list:
+    """
+    Closed path of a hexagon anchored at (x, y), ready for turtle.goto.
+
+    Args:
+        x (float): X coordinate of the upper-left vertex.
+        y (float): Y coordinate of the upper-left vertex.
+        side (float): Side length of hexagon.
+
+    Returns:
+        list: Seven (x, y) points, the first one repeated last.
+    """
+
+    path = (hexagon_vertices(side) + (x, y)).tolist()
+    path.append(path[0])
+
+    return path
+
+
+def cell_indices(x, y, rows: int, cols: int, size: float) -> np.ndarray:
+    """
+    Index of the cell that contains each point, for whole arrays of points.
+
+    Rows are offset coordinates with odd rows shifted right, so the points
+    are converted to axial coordinates of the hexagon centers, rounded to
+    the nearest hexagon in cube coordinates and converted back, with no
+    search over the cells.
+
+    Args:
+        x: X coordinates in turtle coordinates; any array shape.
+        y: Y coordinates, broadcast against x.
+        rows (int): Number of rows.
+        cols (int): Number of hexagons per row.
+        size (float): Approximate total size of the grid.
+
+    Returns:
+        np.ndarray: row * cols + col of every point, -1 outside the grid.
+    """
+
+    start_x, start_y, width_hex, side = grid_layout(rows, cols, size)
+
+    # Offset from the middle of cell (0, 0), with y pointing down the rows.
+    dx = np.asarray(x, dtype=float) - (start_x + width_hex / 2)
+    dy = (start_y - side / 2) - np.asarray(y, dtype=float)
+
+    r = dy / (side * 1.5)
+    q = dx / width_hex - r / 2
+    s = -q - r
+
+    rq, rr, rs = np.rint(q), np.rint(r), np.rint(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq).astype(np.intp)
+    rr = np.where(fix_r, -rq - rs, rr).astype(np.intp)
+
+    row = rr
+    col = rq + (rr - (rr & 1)) // 2
+    inside = (row >= 0) & (row < rows) & (col >= 0) & (col < cols)
+
+    return np.where(inside, row * cols + col, -1)
+
+
+def cell_at(x: float, y: float, rows: int, cols: int, size: float):
+    """
+    Find the cell of a rows x cols grid that contains a point, in O(1).
+
+    Args:
+        x (float): X coordinate in turtle coordinates.
+        y (float): Y coordinate in turtle coordinates.
+        rows (int): Number of rows.
+        cols (int): Number of hexagons per row.
+        size (float): Approximate total size of the grid.
+
+    Returns:
+        tuple: (row, col) of the cell, or None outside the grid.
+    """
+
+    index = int(cell_indices(x, y, rows, cols, size))
+    if index < 0:
+        return None
+    return divmod(index, cols)
+
+
+def cell_neighbors(row: int, col: int, rows: int, cols: int) -> list:
+    """
+    Cells sharing an edge with a cell of a rows x cols grid.
+
+    Args:
+        row (int): Row of the cell.
+        col (int): Column of the cell.
+        rows (int): Number of rows.
+        cols (int): Number of hexagons per row.
+
+    Returns:
+        list: (row, col) of every neighbor inside the grid.
+    """
+
+    # Odd rows are shifted right, so their diagonal neighbors are one column further.
+    shift = row & 1
+    candidates = [(row, col - 1), (row, col + 1),
+                  (row - 1, col - 1 + shift), (row - 1, col + shift),
+                  (row + 1, col - 1 + shift), (row + 1, col + shift)]
+
+    return [(r, c) for r, c in candidates if 0 <= r < rows and 0 <= c < cols]
+
+
+def center_points(centers) -> np.ndarray:
+    """
+    Normalize hexagon centers into an (n, 2) float array.
+
+    Args:
+        centers: List of (x, y) tuples, or an (x, y) tuple of arrays.
+
+    Returns:
+        np.ndarray: (n, 2) array of centers.
+    """
+
+    if isinstance(centers, tuple):
+        return np.column_stack(centers[:2]).astype(float)
+    return np.asarray(centers, dtype=float).reshape(-1, 2)
+
+
+def shared_edges(centers, side: float) -> np.ndarray:
+    """
+    Unique edges of the hexagon lattice; edges shared by two cells appear once.
+
+    Args:
+        centers: List of (x, y) tuples, or an (x, y) tuple of arrays.
+        side (float): Side length of hexagons.
+
+    Returns:
+        np.ndarray: (E, 2, 2) array of segment endpoints.
+    """
+
+    segments, first, _ = _unique_edges(centers, side)
+
+    return segments[first]
+
+
+def grid_outline(centers, side: float) -> list:
+    """
+    Outline of the whole grid: the edges that belong to a single hexagon.
+
+    Args:
+        centers: List of (x, y) tuples, or an (x, y) tuple of arrays.
+        side (float): Side length of hexagons.
+
+    Returns:
+        list: Closed polylines as (k, 2) arrays, first point repeated last.
+    """
+
+    segments, first, counts = _unique_edges(centers, side)
+
+    return edge_polylines(segments[first[counts == 1]])
+
+
+def _unique_edges(centers, side: float) -> tuple:
+    """
+    All hexagon edges of the grid and which of them are distinct.
+
+    Returns:
+        tuple: ((6n, 2, 2) segments, sorted indices of the first occurrence
+        of every distinct edge, number of hexagons sharing each of them)
+    """
+
+    points = center_points(centers)
+
+    vertices = points[:, None, :] + hexagon_vertices(side)[None, :, :]
+    segments = np.stack([vertices, np.roll(vertices, -1, axis=1)], axis=2).reshape(-1, 2, 2)
+
+    # Shared vertices are computed from different cells, so compare them on a
+    # grid much finer than a side but coarser than the rounding noise.
+    keys = np.rint(segments * (1e6 / side)).astype(np.int64)
+    swap = (keys[:, 0, 0] > keys[:, 1, 0]) | ((keys[:, 0, 0] == keys[:, 1, 0])
+                                              & (keys[:, 0, 1] > keys[:, 1, 1]))
+    keys[swap] = keys[swap, ::-1]
+    _, first, counts = np.unique(keys.reshape(-1, 4), axis=0,
+                                 return_index=True, return_counts=True)
+    order = np.argsort(first)
+
+    return segments, first[order], counts[order]
+
+
+def edge_polylines(segments: np.ndarray) -> list:
+    """
+    Chain lattice edges into as few polylines as a walk can make.
+
+    Args:
+        segments (np.ndarray): (E, 2, 2) array from shared_edges.
+
+    Returns:
+        list: List of (k, 2) arrays of polyline points.
+    """
+
+    if not len(segments):
+        return []
+
+    scale = 1e6 / max(np.ptp(segments), 1e-9)
+    keys = [tuple(k) for k in np.rint(segments * scale).astype(np.int64).reshape(-1, 2).tolist()]
+    points = {}
+    adjacency = {}
+    for e in range(len(segments)):
+        for end in (0, 1):
+            key = keys[2 * e + end]
+            points.setdefault(key, segments[e, end])
+            adjacency.setdefault(key, []).append(e)
+
+    used = np.zeros(len(segments), dtype=bool)
+    polylines = []
+    # Paths have to start or end at odd-degree vertices, so start there first.
+    starts = sorted(adjacency, key=lambda k: len(adjacency[k]) % 2 == 0)
+
+    for start in starts:
+        while adjacency[start]:
+            vertex = start
+            path = [points[vertex]]
+            while adjacency[vertex]:
+                e = adjacency[vertex].pop()
+                if used[e]:
+                    continue
+                used[e] = True
+                a, b = keys[2 * e], keys[2 * e + 1]
+                vertex = b if a == vertex else a
+                path.append(points[vertex])
+            if len(path) > 1:
+                polylines.append(np.array(path))
+
+    return polylines
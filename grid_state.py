@@ -0,0 +1,81 @@
+import numpy as np
+
+from patterns import palette_colors
+from raster import pack, to_rgb
+from settings import color_map
+
+
+class GridState:
+    """
+    Fill, border and shadow of every cell of a drawn grid.
+
+    Besides the strings handed to turtle, every cell keeps its colors as
+    packed RGB, so states are compared by what is shown on screen:
+    'red' and '#ff0000' are the same fill.
+    """
+
+    def __init__(self, colors: list, thickness_width: int, border_color: str,
+                 shadow_intensity: int):
+        """
+        Args:
+            colors (list): Fill color of each cell.
+            thickness_width (int): Border line thickness of every cell.
+            border_color (str): Border color of every cell.
+            shadow_intensity (int): Shadow offset of every cell; 0 for no shadow.
+        """
+
+        indices, palette = palette_colors(colors)
+        count = len(indices)
+
+        self.colors = [palette[i] for i in indices.tolist()]
+        self.fill = pack([to_rgb(c) for c in palette] or [(0, 0, 0)])[indices]
+        self.border_colors = [border_color] * count
+        self.border = np.full(count, pack(to_rgb(color_map.get(border_color, 'black'))),
+                              dtype=np.uint32)
+        self.width = np.full(count, thickness_width, dtype=np.int32)
+        self.shadow = np.full(count, shadow_intensity, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.colors)
+
+    def set_color(self, i: int, color: str) -> None:
+        """
+        Change the fill of a single cell.
+
+        Args:
+            i (int): Cell index.
+            color (str): New fill color.
+        """
+
+        self.colors[i] = color
+        self.fill[i] = pack(to_rgb(color))
+
+    def diff(self, other: 'GridState') -> np.ndarray:
+        """
+        Cells whose fill or border is shown differently in another state.
+
+        Args:
+            other (GridState): State of the same grid to compare with.
+
+        Returns:
+            np.ndarray: Sorted indices of the cells to redraw.
+        """
+
+        return np.flatnonzero((self.fill != other.fill) | (self.border != other.border)
+                              | (self.width != other.width))
+
+    def shadow_changed(self, other: 'GridState') -> bool:
+        """
+        Whether any shadow differs in another state.
+
+        A shadow lies under the neighbors drawn after its cell, so changing
+        one needs those neighbors drawn again as well.
+
+        Args:
+            other (GridState): State of the same grid to compare with.
+
+        Returns:
+            bool: True if a shadow was added, removed or moved.
+        """
+
+        return bool(np.any(self.shadow != other.shadow))
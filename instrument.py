@@ -0,0 +1,187 @@
+import collections
+import functools
+import json
+import os
+import threading
+import time
+
+
+# Functions of main timed as stages of a drawing.
+STAGES = ('draw_shadow', 'draw_shadow_silhouette', 'draw_hexagon', 'draw_hexagon_border',
+          'draw_border_lattice')
+
+
+class Profiler:
+    """
+    Per-stage counters, timings and frame statistics of animate_drawing.
+
+    Nothing is measured until install() replaces the stage functions of
+    main, turtle.update and Animation._frame with timing wrappers; while
+    it is not installed the drawing code runs unchanged, so a disabled
+    profiler costs nothing. uninstall() puts the originals back.
+    """
+
+    def __init__(self, trace: bool = True):
+        """
+        Args:
+            trace (bool): Keep every timed call for a Chrome trace; without
+                it only the counters and the frames are kept.
+        """
+
+        self.trace = trace
+        self.counts = collections.Counter()
+        self.totals = collections.defaultdict(float)
+        self.frames = []
+        self.events = []
+        self.hooks = []
+        self._patched = []
+        self._origin = time.perf_counter()
+
+    def add_hook(self, hook) -> None:
+        """
+        Call a function for every timed call.
+
+        Args:
+            hook: Called as hook(stage, start, duration) with times in seconds
+                from time.perf_counter.
+        """
+
+        self.hooks.append(hook)
+
+    def record(self, stage: str, start: float, duration: float) -> None:
+        """
+        Account one timed call of a stage.
+
+        Args:
+            stage (str): Stage name.
+            start (float): time.perf_counter at the start of the call.
+            duration (float): Duration in seconds.
+        """
+
+        self.counts[stage] += 1
+        self.totals[stage] += duration
+        if self.trace:
+            self.events.append((stage, start, duration))
+        for hook in self.hooks:
+            hook(stage, start, duration)
+
+    def _timed(self, stage: str, fun):
+        @functools.wraps(fun)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fun(*args, **kwargs)
+            finally:
+                self.record(stage, start, time.perf_counter() - start)
+        return wrapper
+
+    def _timed_frame(self, fun):
+        @functools.wraps(fun)
+        def wrapper(animation):
+            start = time.perf_counter()
+            try:
+                return fun(animation)
+            finally:
+                duration = time.perf_counter() - start
+                self.frames.append((start, duration, animation.drawn))
+                self.record('frame', start, duration)
+        return wrapper
+
+    def _patch(self, owner, name: str, wrapper) -> None:
+        # None marks a name that was only found through lookup, e.g. in a base class.
+        self._patched.append((owner, name, vars(owner).get(name)))
+        setattr(owner, name, wrapper)
+
+    def install(self, module) -> 'Profiler':
+        """
+        Start measuring the drawing functions of a module.
+
+        Args:
+            module: main, or a module with the same drawing functions.
+
+        Returns:
+            Profiler: self, for chaining.
+        """
+
+        for name in STAGES:
+            self._patch(module, name, self._timed(name, getattr(module, name)))
+        self._patch(module.turtle, 'update', self._timed('update', module.turtle.update))
+        self._patch(module.Animation, '_frame', self._timed_frame(module.Animation._frame))
+        return self
+
+    def uninstall(self) -> None:
+        """
+        Restore every function replaced by install().
+        """
+
+        while self._patched:
+            owner, name, original = self._patched.pop()
+            if original is None:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, original)
+
+    def summary(self) -> dict:
+        """
+        Totals per stage and frame statistics.
+
+        The time between frames is reported as idle: it is spent waiting for
+        the next turtle timer, which is where the animation sleeps.
+
+        Returns:
+            dict: JSON-serializable statistics.
+        """
+
+        stages = {stage: {'calls': self.counts[stage], 'seconds': self.totals[stage],
+                          'mean_ms': self.totals[stage] / self.counts[stage] * 1000}
+                  for stage in self.counts}
+        result = {'stages': stages}
+
+        if self.frames:
+            first = self.frames[0][0]
+            last = self.frames[-1][0] + self.frames[-1][1]
+            busy = sum(duration for _, duration, _ in self.frames)
+            drawn = self.frames[-1][2]
+            durations = [duration * 1000 for _, duration, _ in self.frames]
+            result['frames'] = {
+                'count': len(self.frames),
+                'mean_ms': busy / len(self.frames) * 1000,
+                'max_ms': max(durations),
+                'idle_seconds': last - first - busy,
+                'wall_seconds': last - first,
+                'cells': drawn,
+                'cells_per_sec': drawn / (last - first) if last > first else None,
+                'times_ms': durations,
+            }
+        return result
+
+    def chrome_trace(self) -> dict:
+        """
+        Timed calls in the Chrome trace event format (chrome://tracing, Perfetto).
+
+        Returns:
+            dict: {'traceEvents': [...]} with complete events in microseconds.
+        """
+
+        pid, tid = os.getpid(), threading.get_ident()
+        return {'traceEvents': [
+            {'name': stage, 'ph': 'X', 'pid': pid, 'tid': tid,
+             'ts': (start - self._origin) * 1e6, 'dur': duration * 1e6}
+            for stage, start, duration in self.events
+        ]}
+
+    def dump(self, path: str) -> None:
+        """
+        Write the summary, and the Chrome trace events when tracing, as JSON.
+
+        The file opens in chrome://tracing or Perfetto; the summary is kept
+        under 'otherData'.
+
+        Args:
+            path (str): Output file path.
+        """
+
+        data = self.chrome_trace() if self.trace else {}
+        data['otherData'] = self.summary()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
@@ -0,0 +1,108 @@
+import importlib.util
+import subprocess
+import sys
+import types
+
+
+# Budget in seconds for importing each headless module in a fresh interpreter.
+IMPORT_BUDGET = {
+    'geometry': 0.5,
+    'patterns': 0.5,
+    'settings': 0.1,
+    'raster': 0.6,
+    'main': 0.6,
+}
+
+# Modules the headless modules must not pull in at import time.
+DEFERRED = ('tkinter', 'turtle', 'webcolors')
+
+
+class MissingModule(types.ModuleType):
+    """
+    Stand-in for a module that is not installed.
+
+    Importing code that only might use the module keeps working; the
+    ImportError is raised on first attribute access instead.
+    """
+
+    def __getattr__(self, attr: str):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        raise ImportError(f"No module named '{self.__name__}'", name=self.__name__)
+
+
+def lazy_import(name: str):
+    """
+    Return a module whose real import happens on first attribute access.
+
+    Args:
+        name (str): Module name.
+
+    Returns:
+        module: The already imported module, a lazy stand-in for it, or a
+        MissingModule if it is not installed.
+    """
+
+    if name in sys.modules:
+        return sys.modules[name]
+
+    try:
+        spec = importlib.util.find_spec(name)
+    except ImportError:
+        # A missing parent package of a dotted name.
+        spec = None
+    if spec is None:
+        return MissingModule(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def measure_import(name: str) -> tuple:
+    """
+    Import a module in a fresh interpreter and report what it cost.
+
+    Args:
+        name (str): Module name.
+
+    Returns:
+        tuple: (import time in seconds, list of DEFERRED modules actually loaded)
+    """
+
+    code = ('import sys, time\n'
+            't = time.perf_counter()\n'
+            f'import {name}\n'
+            'print(time.perf_counter() - t)\n'
+            f'print(" ".join(m for m in {DEFERRED!r} '
+            'if m in sys.modules and type(sys.modules[m]).__name__ != "_LazyModule"))\n')
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                         check=True).stdout.split('\n')
+    return float(out[0]), out[1].split()
+
+
+def check_imports(budget: dict = None) -> bool:
+    """
+    Print import times and fail if a module is over budget or loads Tk/webcolors.
+
+    Args:
+        budget (dict): Module name to allowed seconds; defaults to IMPORT_BUDGET.
+
+    Returns:
+        bool: True if every module is within its budget.
+    """
+
+    ok = True
+    for name, limit in (budget or IMPORT_BUDGET).items():
+        seconds, loaded = measure_import(name)
+        passed = seconds <= limit and not loaded
+        ok = ok and passed
+        print(f"{'ok' if passed else 'FAIL':4} {name:10} {seconds * 1000:7.1f} ms"
+              f" (limit {limit * 1000:.0f} ms){' loads ' + ', '.join(loaded) if loaded else ''}")
+    return ok
+
+
+if __name__ == '__main__':
+    sys.exit(0 if check_imports() else 1)
@@ -32,8 +32,8 @@ FAINT = '''слабый'''
 STRONG = '''сильный'''
 SHADOW_INTENSITY = '''Интенсивность тени: нет, слабый, средний, сильный'''
 SELECT_SHADOW_INTENSITY = '''Выберите интенсивность тени: '''
-HEX_COUNT_IN_ROW = '''Введите количество шестиугольников в ряду (4-20): '''
-ERROR_INVALID_NUMBER = '''Ошибка: введите число от 4 до 20.'''
+HEX_COUNT_IN_ROW = '''Введите количество шестиугольников в ряду: '''
+ERROR_INVALID_NUMBER = '''Ошибка: введите целое положительное число.'''
 COLOR_1 = '''Цвет 1: '''
 COLOR_2 = '''Цвет 2: '''
 START_DRAWING_PROMPT = '''Нажмите Enter в консоли, чтобы начать рисование'''
@@ -46,3 +46,52 @@ CHOOSE_FILL_OPTION = '''Выберите вариант заливки: '''
 COLUMN_WISE = '''по столбцам'''
 FILL_OPTIONS_COLUMNS = '''Варианты заливки: по строкам, по столбцам'''
 CHOOSE_FILL_OPTION_COLUMNS = '''Выберите вариант заливки: '''
+ANIMATION_CONTROLS = '''Пробел в окне рисунка — пауза/продолжить, Esc — остановить рисование,
+щелчок по шестиугольнику после рисования — сменить его цвет, C — сменить заливку и цвета'''
+CHANGE_SETTINGS = '''Заливка и цвета'''
+KEEP_CURRENT = '''Пустой ввод оставляет текущее значение: '''
+LOD_SIDE = '''Сторона шестиугольника, пикс.: '''
+LOD_FULL = '''полная детализация'''
+LOD_NO_SHADOW = '''без теней'''
+LOD_MERGED_SHADOW = '''общая тень'''
+LOD_SHARED_BORDERS = '''общие границы'''
+LOD_FLAT = '''заливка без границ одним изображением'''
+CLI_DESCRIPTION = '''Рисование шестиугольной сетки без диалога в консоли'''
+CLI_CONFIG = '''JSON-файл с одним заданием или списком заданий в поле "jobs"'''
+CLI_N = '''количество шестиугольников в ряду'''
+CLI_ROWS = '''количество рядов (по умолчанию равно N)'''
+CLI_COLORS = '''два цвета заливки: название из списка, английское имя или HEX'''
+CLI_BORDER_THICKNESS = '''толщина границы: тонкий, средний, толстый или число'''
+CLI_BORDER_COLOR = '''цвет границы'''
+CLI_SHADOW = '''интенсивность тени: нет, слабый, средний, сильный или число'''
+CLI_PATTERN = '''вариант заливки: шахматный, чередование цветов'''
+CLI_PATTERN_TYPE = '''направление чередования: по строкам, по столбцам'''
+CLI_SIZE = '''размер сетки в пикселях'''
+CLI_OUTPUT = '''файл PNG, SVG, SVGZ, PDF или анимация GIF/APNG; без него рисунок открывается в окне'''
+CLI_TILED = '''рисовать PNG по плиткам через файл, не держа весь рисунок в памяти (по умолчанию — для рисунков больше 128 Мпикс)'''
+CLI_FRAME_CELLS = '''сколько шестиугольников добавляет каждый кадр анимации GIF/APNG'''
+CLI_WORKERS = '''число процессов для пакетной отрисовки'''
+CLI_IMAGE = '''изображение для мозаики: цвет каждого шестиугольника — средний цвет под ним'''
+CLI_SNAP = '''приводить цвета мозаики к цветам из списка'''
+CLI_CACHE = '''брать повторяющиеся рисунки из кэша на диске (по умолчанию ~/.cache/hexgrid)'''
+CLI_CACHE_LIMIT = '''наибольший размер кэша в МБ'''
+CLI_TRACE = '''записать время этапов рисования в окне в JSON (формат Chrome trace)'''
+CLI_TRACE_WRITTEN = '''Время этапов записано: '''
+CLI_LOD = '''пороги длины стороны в пикселях: без теней, общие границы, заливка одним изображением, общая тень'''
+CLI_RENDERED = '''Готово: '''
+ERROR_UNKNOWN_OPTION = '''Ошибка: недопустимое значение '''
+ERROR_IMAGE_FORMAT = '''Ошибка: поддерживаются PNG (8 бит без чересстрочности) и PPM/PGM; для других форматов установите Pillow'''
+BENCH_DESCRIPTION = '''Замеры скорости геометрии, заливок и отрисовки'''
+BENCH_NAMES = '''какие замеры запускать (по умолчанию все): '''
+BENCH_SIZES = '''количество шестиугольников в ряду'''
+BENCH_MAX_CELLS = '''пропускать сетки с большим числом шестиугольников'''
+BENCH_BASELINE = '''JSON-файл с эталонными замерами для сравнения'''
+BENCH_SAVE = '''записать результаты как эталон в JSON-файл'''
+BENCH_THRESHOLD = '''допустимое относительное замедление или рост памяти'''
+SERVER_DESCRIPTION = '''HTTP-сервис отрисовки шестиугольной сетки'''
+SERVER_LISTENING = '''Сервис запущен: '''
+SERVER_MAX_PENDING = '''сколько отрисовок может ждать в очереди; остальным отвечает 503'''
+ERROR_BUSY = '''Ошибка: очередь отрисовки заполнена, повторите позже'''
+ERROR_TOO_LARGE = '''Ошибка: слишком большая сетка или изображение'''
+ERROR_GIF_COLORS = '''Ошибка: в GIF не больше 256 цветов; сохраните анимацию в APNG'''
+ERROR_NO_OUTPUT = '''Ошибка: для пакетной отрисовки у каждого задания должен быть "output"'''
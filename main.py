@@ -1,26 +1,36 @@
 import math
-import turtle
+import sys
 import time
-import webcolors
-import local as lcl
-
+from concurrent.futures import Future, ThreadPoolExecutor
 
-available_colors_1 = [
-    ('\U0001F48B' f'{lcl.RED}', 'red'),
-    ('\U0001F499' f'{lcl.BLUE}', 'blue'),
-    ('\U0001F49A' f'{lcl.GREEN}', 'green'),
-    ('\U0001F49B' f'{lcl.YELLOW}', 'yellow'),
-    ('\U0001F49C' f'{lcl.PURPLE}', 'purple'),
-    ('\U0001F4A6' f'{lcl.CYAN}', 'cyan')
-]
-available_colors_2 = [
-    ('\U0001F5A4' f'{lcl.BLACK}', 'black'),
-    ('\U0001F47D' f'{lcl.GRAY}', 'gray'),
-    ('\U0001F495' f'{lcl.PINK}', 'pink'),
-    ('\U0001F9E1' f'{lcl.ORANGE}', 'orange'),
-    ('\U0001F90E' f'{lcl.BROWN}', 'brown'),
-    ('\U0001F916' f'{lcl.YOUR_COLOUR_HEX_ENGLISH}', None)
-]
+import local as lcl
+import raster
+from canvas_backend import CanvasGrid
+# calculate_side_length, calculate_hexagon_centers, chess_pattern, alternation
+# and pattern_colors used to be defined here and stay importable from main.
+from geometry import (calculate_hexagon_centers, calculate_side_length, cell_at,
+                      edge_polylines, grid_outline, hexagon_center_arrays, hexagon_path,
+                      hexagon_vertices, shared_edges)
+from grid_state import GridState
+from lazy import lazy_import
+from patterns import (alternation, chess_pattern, pattern_colors, pattern_indices,
+                      pattern_palette, resolve_colors)
+from settings import (available_colors_1, available_colors_2, border_color_options, color_map,
+                      describe_detail, level_of_detail, shadow_options, thickness_options,
+                      turtle_rgb, validate_color)
+
+tkinter = lazy_import('tkinter')
+turtle = lazy_import('turtle')
+
+
+FRAME_RATE = 30
+ANIMATION_DURATION = 5.0
+# (pattern, pattern_type) pairs main() can be asked for.
+PATTERN_VARIANTS = (
+    (f'{lcl.CHEQUERED}', ''),
+    (f'{lcl.ALTERNATING_COLORS}', f'{lcl.ROW_BY_ROW}'),
+    (f'{lcl.ALTERNATING_COLORS}', f'{lcl.COLUMN_WISE}'),
+)
 
 
 def get_valid_color_from_user(prompt: str) -> str:
@@ -35,17 +45,10 @@ def get_valid_color_from_user(prompt: str) -> str:
     """
 
     while True:
-        user_input = input(prompt).strip().lower()
-        if user_input.startswith('#'):
-            if len(user_input) in (4, 7):
-                return user_input
-            print(f'{lcl.ERROR_INVALID_HEX}')
-        else:
-            try:
-                webcolors.name_to_hex(user_input)
-                return user_input
-            except ValueError:
-                print(f'{lcl.ERROR_UNKNOWN_COLOR}')
+        try:
+            return validate_color(input(prompt))
+        except ValueError as error:
+            print(error)
 
 
 def get_color_choice():
@@ -103,13 +106,12 @@ def border_thickness() -> int:
         int: Border thickness value.
     """
 
-    options = {f'{lcl.THIN}': 1, f'{lcl.MEDIUM}': 3, f'{lcl.THICK}': 5}
     print(f'{lcl.BORDER_TYPES}')
 
     while True:
         choice = input(f'{lcl.CHOOSE_BORDER_THICKNESS}').strip().lower()
-        if choice in options:
-            return options[choice]
+        if choice in thickness_options:
+            return thickness_options[choice]
         print(f'{lcl.INPUT_ERROR}')
 
 
@@ -121,16 +123,11 @@ def border_color() -> str:
         str: The selected border color name in Russian lowercase.
     """
 
-    options = [f'{lcl.RED}'.lower(), f'{lcl.ORANGE}'.lower(), f'{lcl.YELLOW}'.lower(),
-               f'{lcl.GREEN}'.lower(), f'{lcl.BLUE}'.lower(), f'{lcl.PURPLE}'.lower(),
-               f'{lcl.PINK}'.lower(), f'{lcl.BLACK}'.lower(), f'{lcl.GRAY}'.lower(),
-               f'{lcl.WHITE}'.lower()]
-
-    print(f'{lcl.BORDER_COLOR}' + ", ".join(options))
+    print(f'{lcl.BORDER_COLOR}' + ", ".join(border_color_options))
 
     while True:
         choice = input(f'{lcl.SELECT_BORDER_COLOR}').strip().lower()
-        if choice in options: return choice
+        if choice in border_color_options: return choice
         print(f'{lcl.INPUT_ERROR}')
 
 
@@ -142,15 +139,12 @@ def shadow_brightness() -> int:
         int: Shadow intensity value.
     """
 
-    options = {f'{lcl.NO}': 0, f'{lcl.FAINT}': 5, f'{lcl.MEDIUM}': 8, f'{lcl.STRONG}': 12}
-
-
     print(f'{lcl.SHADOW_INTENSITY}')
 
     while True:
         choice = input(f'{lcl.SELECT_SHADOW_INTENSITY}').strip().lower()
-        if choice in options:
-            return options[choice]
+        if choice in shadow_options:
+            return shadow_options[choice]
         print(f'{lcl.INPUT_ERROR}')
 
 
@@ -159,66 +153,16 @@ def get_num_hexagons() -> int:
     Prompt user for the number of hexagons in a row.
 
     Returns:
-        int: Number of hexagons (4–20).
+        int: Number of hexagons (at least 1).
     """
 
     while True:
         val = input(f'{lcl.HEX_COUNT_IN_ROW}').strip()
-        if val.isdigit() and 4 <= int(val) <= 20:
+        if val.isdigit() and int(val) >= 1:
             return int(val)
         print(f'{lcl.ERROR_INVALID_NUMBER}')
 
 
-def calculate_side_length(number: int, size: float) -> float:
-    """
-    Calculate the side length of each hexagon based on total size and number of hexagons.
-
-    Args:
-        number (int): Number of hexagons.
-        size (float): Total size or width constraint.
-
-    Returns:
-        float: Computed side length of a hexagon.
-    """
-
-    return size / (number + 0.5)
-
-
-def calculate_hexagon_centers(number: int, size: float) -> tuple:
-    """
-    Calculate the centers coordinates for a grid of hexagons.
-
-    Args:
-        number (int): Number of hexagons per row and column.
-        size (float): Approximate total size of the grid.
-
-    Returns:
-        tuple: (list of (x, y) centers, side length of hexagons)
-    """
-
-    side = calculate_side_length(number, size)
-    width_hex = math.sqrt(3) * side
-
-    total_width = width_hex * number
-    total_height = side * 1.5 * number
-
-    start_x = -total_width / 2 + width_hex / 2
-    start_y = total_height / 2 - side / 2
-
-    centers = []
-
-    for row in range(number):
-        y = start_y - row * side * 1.5
-
-        for col in range(number):
-            x = start_x + col * width_hex
-            if row % 2 == 1:
-                x += width_hex / 2
-            centers.append((x, y))
-
-    return centers, side
-
-
 def preview_colors(color1: str, color2: str) -> None:
     """
     Show a preview of the selected colors as filled squares.
@@ -272,21 +216,6 @@ def preview_colors(color1: str, color2: str) -> None:
     input(f'\n{lcl.START_DRAWING_WAIT}')
 
 
-color_map = {
-    f'{lcl.RED}'.lower(): 'red',
-    f'{lcl.ORANGE}'.lower(): 'orange',
-    f'{lcl.YELLOW}'.lower(): 'yellow',
-    f'{lcl.GREEN}'.lower(): 'green',
-    f'{lcl.BLUE}'.lower(): 'blue',
-    f'{lcl.PURPLE}'.lower(): 'purple',
-    f'{lcl.PINK}'.lower(): 'pink',
-    f'{lcl.BLACK}'.lower(): 'black',
-    f'{lcl.GRAY}'.lower(): 'gray',
-    f'{lcl.WHITE}'.lower(): 'white',
-    f'{lcl.BROWN}'.lower(): 'brown'
-}
-
-
 def draw_shadow(x: float, y: float, side: float, shadow_intensity: int) -> None:
     """
     Draw a shadow hexagon offset from the main hexagon.
@@ -301,23 +230,45 @@ def draw_shadow(x: float, y: float, side: float, shadow_intensity: int) -> None:
     if shadow_intensity == 0:
         return
 
-    shadow_x = x + shadow_intensity
-    shadow_y = y - shadow_intensity
+    path = hexagon_path(x + shadow_intensity, y - shadow_intensity, side)
 
     turtle.penup()
-    turtle.goto(shadow_x, shadow_y)
+    turtle.goto(path[0])
     turtle.pendown()
 
-    turtle.fillcolor("#686868")
+    turtle.fillcolor(turtle_rgb("#686868"))
     turtle.begin_fill()
-    turtle.setheading(30)
 
-    for _ in range(6):
-        turtle.forward(side)
-        turtle.right(60)
+    for point in path[1:]:
+        turtle.goto(point)
 
     turtle.end_fill()
-    turtle.setheading(0)
+
+
+def draw_shadow_silhouette(outlines: list, shadow_intensity: int) -> None:
+    """
+    Draw the shadow of the whole grid as one offset polygon per outline.
+
+    Args:
+        outlines (list): Closed polylines from grid_outline.
+        shadow_intensity (int): Offset for shadow.
+    """
+
+    if shadow_intensity == 0:
+        return
+
+    turtle.fillcolor(turtle_rgb("#686868"))
+
+    for outline in outlines:
+        turtle.penup()
+        turtle.goto(outline[0, 0] + shadow_intensity, outline[0, 1] - shadow_intensity)
+        turtle.pendown()
+        turtle.begin_fill()
+        for x, y in outline[1:].tolist():
+            turtle.goto(x + shadow_intensity, y - shadow_intensity)
+        turtle.end_fill()
+
+    turtle.penup()
 
 
 def draw_hexagon(x: float, y: float, side: float, color: str) -> None:
@@ -331,20 +282,19 @@ def draw_hexagon(x: float, y: float, side: float, color: str) -> None:
         color (str): Fill color.
     """
 
+    path = hexagon_path(x, y, side)
+
     turtle.penup()
-    turtle.goto(x, y)
+    turtle.goto(path[0])
     turtle.pendown()
 
-    turtle.fillcolor(color)
+    turtle.fillcolor(turtle_rgb(color))
     turtle.begin_fill()
-    turtle.setheading(30)
 
-    for _ in range(6):
-        turtle.forward(side)
-        turtle.right(60)
+    for point in path[1:]:
+        turtle.goto(point)
 
     turtle.end_fill()
-    turtle.setheading(0)
 
 
 def draw_hexagon_border(x, y, side, thickness, color) -> None:
@@ -356,90 +306,48 @@ def draw_hexagon_border(x, y, side, thickness, color) -> None:
         y (float): The y-coordinate of the hexagon's starting position.
         side (float): The length of each side of the hexagon.
         thickness (int): The border's line thickness.
-        color (str): The color of the border.
+        color: The color of the border, or its RGB tuple from turtle_rgb.
     """
 
+    path = hexagon_path(x, y, side)
+
     turtle.penup()
-    turtle.goto(x, y)
+    turtle.goto(path[0])
     turtle.pendown()
 
-    turtle.pencolor(color_map.get(color, "black"))
+    if isinstance(color, str):
+        color = turtle_rgb(color_map.get(color, "black"))
+    turtle.pencolor(color)
     turtle.pensize(thickness)
-    turtle.setheading(30)
 
-    for _ in range(6):
-        turtle.forward(side)
-        turtle.right(60)
+    for point in path[1:]:
+        turtle.goto(point)
 
-    turtle.setheading(0)
     turtle.pensize(1)
 
 
-def chess_pattern(N: int, color_first: str, color_second: str) -> list:
+def draw_border_lattice(polylines: list, thickness: int, color: str) -> None:
     """
-    Generates a list of colors for a chessboard pattern.
+    Stroke the deduplicated borders of the whole grid in one pass.
 
     Args:
-        N (int): The size of the grid (number of hexagons in each row and column).
-        color_first (str): The first color option.
-        color_second (str): The second color option.
-
-    Returns:
-        list: A list of length N*N with colors assigned in a chessboard pattern.
-    """
-
-    colors = []
-    if N % 2 == 0:
-        for i in range(N // 2):
-            for col in range(N):
-                colors.append(color_first)
-                colors.append(color_second)
-            for col in range(N):
-                colors.append(color_second)
-                colors.append(color_first)
-    else:
-        for i in range((N - 1) // 2):
-            for col in range(N):
-                colors.append(color_first)
-                colors.append(color_second)
-            for col in range(N):
-                colors.append(color_second)
-                colors.append(color_first)
-        for i in range(N):
-            color = color_first if i % 2 == 0 else color_second
-            colors.append(color)
-
-    return colors
-
-
-def alternation(N: int, pattern_type: str, color_first: str, color_second: str) -> list:
-    """
-    Generates a list of colors for an alternating pattern.
-
-    Args:
-        N (int): The grid size.
-        pattern_type (str): Either 'по строкам' (by rows) or 'по столбцам' (by columns).
-        color_first (str): The first color.
-        color_second (str): The second color.
-
-    Returns:
-        list: The list of colors following the selected pattern.
+        polylines (list): Polylines from edge_polylines.
+        thickness (int): The border's line thickness.
+        color (str): The color of the border.
     """
 
-    colors = []
+    turtle.pencolor(turtle_rgb(color_map.get(color, "black")))
+    turtle.pensize(thickness)
 
-    if pattern_type == f'{lcl.ROW_BY_ROW}':
-        for row in range(N):
-            color = color_first if row % 2 == 0 else color_second
-            for _ in range(N):
-                colors.append(color)
-    else:
-        for row in range(N):
-            for col in range(N):
-                color = color_first if col % 2 == 0 else color_second
-                colors.append(color)
+    for line in polylines:
+        turtle.penup()
+        turtle.goto(*line[0])
+        turtle.pendown()
+        for x, y in line[1:].tolist():
+            turtle.goto(x, y)
 
-    return colors
+    turtle.penup()
+    turtle.pensize(1)
 
 
 def chose_pattern_check() -> str:
@@ -480,32 +388,61 @@ def chose_type_check() -> str:
         print(f'{lcl.INPUT_ERROR}')
 
 
-def pattern_colors(N: int, color_first: str, color_second: str, 
-                   pattern: str, pattern_type: str) -> list:
+def draw_cell(x: float, y: float, side: float, color: str, thickness_width: int,
+              border_color: str, shadow_intensity: int, border: bool = True) -> None:
     """
-    Determines the color pattern based on user's choice.
+    Draw one hexagon with its shadow and border.
 
     Args:
-        N (int): Grid size.
-        color_first (str): First color option.
-        color_second (str): Second color option.
-        pattern (str): Selected pattern ('шахматный' or 'чередование цветов').
-        pattern_type (str): Pattern orientation ('по строкам' or 'по столбцам').
+        x (float): X coordinate.
+        y (float): Y coordinate.
+        side (float): Side length of hexagon.
+        color (str): Fill color.
+        thickness_width (int): Border line thickness.
+        border_color: Border color, or its RGB tuple from turtle_rgb.
+        shadow_intensity (int): Shadow darkness intensity; 0 for no shadow.
+        border (bool): Whether to stroke the border of this hexagon.
+    """
 
-    Returns:
-        list: List of colors matching the pattern.
+    if shadow_intensity > 0:
+        draw_shadow(x, y, side, shadow_intensity)
+
+    draw_hexagon(x, y, side, color)
+
+    if border:
+        draw_hexagon_border(x, y, side, thickness_width, border_color)
+
+
+def draw_flat(centers, colors, side: float) -> None:
     """
+    Show the grid as one flat-colored image stamped by raster.render.
 
-    if pattern == f'{lcl.CHEQUERED}':
-        return chess_pattern(N, color_first, color_second)
-    elif pattern == f'{lcl.ALTERNATING_COLORS}':
-        return alternation(N, pattern_type, color_first, color_second)
+    Used when hexagons are only a few pixels wide, where turtle polygons
+    would mostly smear while costing the most time.
 
+    Args:
+        centers: List of (x, y) tuples, or an (x, y) tuple of arrays.
+        colors: Fill colors for each hexagon, or an (indices, palette) tuple.
+        side (float): Side length of hexagons.
+    """
 
-def animate_drawing(centers: list, colors: list, side: float, thickness_width: int,
-                    border_color: str, shadow_intensity: int) -> None:
+    width, height = turtle.window_width(), turtle.window_height()
+    image = raster.render(centers, colors, side, 1, "", 0, width, height, borders=False)
+
+    canvas = turtle.getcanvas()
+    photo = tkinter.PhotoImage(data=b'P6 %d %d 255\n' % (width, height) + image.tobytes(),
+                               format='PPM')
+    # Tk drops an image as soon as Python forgets it, so keep it on the canvas.
+    canvas.flat_image = photo
+    canvas.create_image(0, 0, image=photo)
+    turtle.update()
+
+
+def draw_steps(centers: list, colors: list, side: float, thickness_width: int,
+               border_color: str, shadow_intensity: int, shared_borders: bool = False,
+               merged_shadow: bool = False):
     """
-    Animate drawing of hexagons with optional shadows and borders.
+    Draw the hexagons one at a time as a resumable generator.
 
     Args:
         centers (list): List of (x, y) tuples for hexagon centers.
@@ -514,24 +451,540 @@ def animate_drawing(centers: list, colors: list, side: float, thickness_width: i
         thickness_width (int): Border line thickness.
         border_color (str): Border color.
         shadow_intensity (int): Shadow darkness intensity; 0 for no shadow.
+        shared_borders (bool): Stroke every lattice edge once, together with
+            the last hexagon, instead of six edges per hexagon.
+        merged_shadow (bool): Draw the shadow of the whole grid as one
+            polygon, together with the first hexagon, instead of one shadow
+            hexagon per cell.
+
+    Yields:
+        int: Number of hexagons drawn so far.
     """
 
-    turtle.tracer(0, 0)
+    count = min(len(centers), len(colors))
+    if shared_borders:
+        polylines = edge_polylines(shared_edges(centers[:count], side))
+    if merged_shadow and count and shadow_intensity > 0:
+        draw_shadow_silhouette(grid_outline(centers[:count], side), shadow_intensity)
+        shadow_intensity = 0
 
-    for i in range(len(centers)):
+    # Resolved once here rather than by every draw_hexagon_border call.
+    pen = turtle_rgb(color_map.get(border_color, "black"))
+    for i in range(count):
         x, y = centers[i]
-        color = colors[i]
-        if shadow_intensity > 0:
-            draw_shadow(x, y, side, shadow_intensity)
+        draw_cell(x, y, side, colors[i], thickness_width, pen, shadow_intensity,
+                  border=not shared_borders)
+        if shared_borders and i == count - 1:
+            draw_border_lattice(polylines, thickness_width, border_color)
+        yield i + 1
 
-        draw_hexagon(x, y, side, color)
 
-        draw_hexagon_border(x, y, side, thickness_width, border_color)
+def recolor_at(x: float, y: float, number: int, size: float, centers: list, colors: list,
+               choices: list, side: float, thickness_width: int, border_color: str,
+               drawn: int = None, grid: CanvasGrid = None):
+    """
+    Recolor the cell under a point to the next of the chosen colors.
 
+    With a CanvasGrid only the fill of the cell's polygon item changes;
+    otherwise that cell is drawn again with turtle, without its shadow,
+    which lies under its neighbors.
+
+    Args:
+        x (float): X coordinate of the point, e.g. of a click.
+        y (float): Y coordinate of the point.
+        number (int): Number of hexagons per row and column.
+        size (float): Approximate total size of the grid.
+        centers (list): List of (x, y) tuples for hexagon centers.
+        colors (list): Fill colors for each hexagon, updated in place.
+        choices (list): Colors a cell cycles through.
+        side (float): Side length of hexagons.
+        thickness_width (int): Border line thickness.
+        border_color (str): Border color.
+        drawn (int): Number of cells drawn so far; cells after it are skipped.
+        grid (CanvasGrid): Canvas items showing the grid.
+
+    Returns:
+        int: Index of the recolored cell, or None if nothing was hit.
+    """
+
+    cell = cell_at(x, y, number, number, size)
+    if cell is None:
+        return None
+
+    i = cell[0] * number + cell[1]
+    if i >= min(len(colors), len(centers) if drawn is None else drawn):
+        return None
+
+    if colors[i] in choices:
+        colors[i] = choices[(choices.index(colors[i]) + 1) % len(choices)]
+    else:
+        colors[i] = choices[0]
+
+    if grid is not None:
+        grid.set_color(i, colors[i])
         turtle.update()
-        time.sleep(0.05)
+        return i
 
+    turtle.tracer(0, 0)
+    draw_cell(*centers[i], side, colors[i], thickness_width, border_color, 0)
+    turtle.update()
     turtle.tracer(1, 10)
+    return i
+
+
+def redraw_cells(state: GridState, cells, centers: list, side: float) -> int:
+    """
+    Draw selected cells again with their fill and border from a state.
+
+    Args:
+        state (GridState): State to draw.
+        cells: Indices of the cells to draw.
+        centers (list): List of (x, y) tuples for hexagon centers.
+        side (float): Side length of hexagons.
+
+    Returns:
+        int: Number of cells drawn.
+    """
+
+    turtle.tracer(0, 0)
+    for i in cells:
+        draw_cell(*centers[i], side, state.colors[i], int(state.width[i]),
+                  state.border_colors[i], 0)
+    turtle.update()
+    turtle.tracer(1, 10)
+    return len(cells)
+
+
+def apply_state(old: GridState, new: GridState, centers: list, side: float,
+                drawn: int = None, grid: CanvasGrid = None, shared_borders: bool = False,
+                merged_shadow: bool = False) -> int:
+    """
+    Bring the picture of one state to another, drawing only what changed.
+
+    Cells are drawn again only where their fill or border differs. A
+    changed shadow also covers neighbors, so then the whole grid is drawn
+    again. Canvas items are reconfigured instead: fills that differ,
+    the border of all cells at once, and shadows hidden or shown again
+    when their offset is unchanged.
+
+    Args:
+        old (GridState): State currently on screen.
+        new (GridState): State to show.
+        centers (list): List of (x, y) tuples for hexagon centers.
+        side (float): Side length of hexagons.
+        drawn (int): Number of cells drawn so far; cells after it are skipped.
+        grid (CanvasGrid): Canvas items showing the grid; they are
+            reconfigured instead of drawing cells with turtle.
+        shared_borders (bool): The grid is drawn with shared borders.
+        merged_shadow (bool): The grid is drawn with one merged shadow.
+
+    Returns:
+        int: Number of cells drawn or reconfigured.
+    """
+
+    if grid is not None:
+        return apply_to_grid(old, new, centers[:drawn], side, grid, shared_borders,
+                             merged_shadow)
+
+    if old.shadow_changed(new):
+        turtle.clear()
+        animate_drawing(centers[:drawn], new.colors, side, int(new.width[0]),
+                        new.border_colors[0], int(new.shadow[0]), instant=True,
+                        shared_borders=shared_borders, merged_shadow=merged_shadow)
+        return min(len(centers[:drawn]), len(new))
+
+    cells = old.diff(new)
+    if drawn is not None:
+        cells = cells[cells < drawn]
+    return redraw_cells(new, cells.tolist(), centers, side)
+
+
+def apply_to_grid(old: GridState, new: GridState, centers: list, side: float,
+                  grid: CanvasGrid, shared_borders: bool = False,
+                  merged_shadow: bool = False) -> int:
+    """
+    Bring the canvas items of a grid from one state to another.
+
+    Args:
+        old (GridState): State currently on screen.
+        new (GridState): State to show.
+        centers (list): Centers of the cells the grid was drawn with.
+        side (float): Side length of hexagons.
+        grid (CanvasGrid): Canvas items showing the grid.
+        shared_borders (bool): The grid is drawn with shared borders.
+        merged_shadow (bool): The grid is drawn with one merged shadow.
+
+    Returns:
+        int: Number of cells reconfigured, or created by drawing the grid again.
+    """
+
+    # GridState shadows and borders are the same for every cell.
+    shadow = int(new.shadow[0]) if len(new) else 0
+    if old.shadow_changed(new):
+        if shadow and shadow != grid.shadow_intensity:
+            grid.draw(centers, new.colors, side, int(new.width[0]), new.border_colors[0],
+                      shadow, shared_borders, merged_shadow)
+            turtle.update()
+            return len(grid.items)
+        grid.show_shadow(shadow > 0)
+
+    changed = grid.recolor(new.colors)
+    if (old.border != new.border).any() or (old.width != new.width).any():
+        grid.set_border(int(new.width[0]), new.border_colors[0])
+        changed = len(grid.items)
+    turtle.update()
+    return changed
+
+
+def ask_settings(pattern: str, pattern_type: str, color_first: str, color_second: str):
+    """
+    Ask for a new pattern and colors in turtle dialogs.
+
+    An empty answer keeps the current value.
+
+    Args:
+        pattern (str): Current pattern.
+        pattern_type (str): Current pattern orientation.
+        color_first (str): Current first color.
+        color_second (str): Current second color.
+
+    Returns:
+        tuple: (pattern, pattern_type, color_first, color_second), or None
+        if a dialog was cancelled.
+    """
+
+    def choice(options: list):
+        def check(answer: str) -> str:
+            if answer not in options:
+                raise ValueError(f'{lcl.INPUT_ERROR}')
+            return answer
+        return check
+
+    def ask(prompt: str, current: str, check):
+        message = ''
+        while True:
+            answer = turtle.textinput(f'{lcl.CHANGE_SETTINGS}',
+                                      f'{message}{prompt}\n{lcl.KEEP_CURRENT}{current}')
+            if answer is None:
+                return None
+            answer = answer.strip().lower()
+            if not answer:
+                return current
+            try:
+                return check(answer)
+            except ValueError as error:
+                message = f'{error}\n'
+
+    pattern = ask(f'{lcl.FILL_OPTIONS}', pattern,
+                  choice([f'{lcl.CHEQUERED}', f'{lcl.ALTERNATING_COLORS}']))
+    if pattern is None:
+        return None
+
+    if pattern == f'{lcl.ALTERNATING_COLORS}':
+        pattern_type = ask(f'{lcl.FILL_OPTIONS_COLUMNS}', pattern_type or f'{lcl.ROW_BY_ROW}',
+                           choice([f'{lcl.ROW_BY_ROW}', f'{lcl.COLUMN_WISE}']))
+        if pattern_type is None:
+            return None
+    else:
+        pattern_type = ""
+
+    color_first = ask(f'{lcl.COLOR_1}{lcl.ENTER_COLOR_HEX_ENGLISH}', color_first, validate_color)
+    if color_first is None:
+        return None
+    color_second = ask(f'{lcl.COLOR_2}{lcl.ENTER_COLOR_HEX_ENGLISH}', color_second,
+                       validate_color)
+    if color_second is None:
+        return None
+
+    return pattern, pattern_type, color_first, color_second
+
+
+class Animation:
+    """
+    Timer-driven drawing of a hexagon grid that keeps the Tk event loop free.
+
+    Each frame is a turtle.ontimer callback that advances the draw_steps
+    generator, so the window stays responsive and the drawing can be
+    paused, resumed or cancelled at any moment.
+    """
+
+    def __init__(self, steps, count: int, fps: float = FRAME_RATE,
+                 duration: float = ANIMATION_DURATION, on_progress=None, on_done=None):
+        """
+        Args:
+            steps: Generator returned by draw_steps.
+            count (int): Total number of hexagons.
+            fps (float): Target frame rate.
+            duration (float): Total animation time in seconds, or None to draw
+                as fast as possible.
+            on_progress: Called as on_progress(drawn, count) after every frame.
+            on_done: Called as on_done(animation) once finished or cancelled,
+                also when the window is closed; closed is then True.
+        """
+
+        self.steps = steps
+        self.count = count
+        self.frame_time = 1 / fps
+        self.duration = duration
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.drawn = 0
+        self.paused = False
+        self.cancelled = False
+        self.finished = False
+        self.closed = False
+        self._active = 0.0
+        self._pending = False
+
+    def start(self) -> 'Animation':
+        """
+        Schedule the first frame.
+
+        Returns:
+            Animation: self, for chaining.
+        """
+
+        turtle.tracer(0, 0)
+        self._schedule(0)
+        return self
+
+    def _schedule(self, delay: int) -> None:
+        """
+        Schedule the next frame; at most one frame timer is ever pending.
+
+        Args:
+            delay (int): Delay in milliseconds.
+        """
+
+        self._pending = True
+        turtle.ontimer(self._frame, delay)
+
+    def pause(self) -> None:
+        """
+        Stop drawing after the current frame until resume() is called.
+        """
+
+        self.paused = True
+
+    def resume(self) -> None:
+        """
+        Continue a paused animation.
+        """
+
+        if self.paused and not self.finished:
+            self.paused = False
+            # A frame still pending from before the pause carries on itself.
+            if not self._pending:
+                self._schedule(0)
+
+    def toggle(self) -> None:
+        """
+        Pause a running animation or resume a paused one.
+        """
+
+        if self.paused:
+            self.resume()
+        else:
+            self.pause()
+
+    def cancel(self) -> None:
+        """
+        Stop the animation for good, keeping what is already drawn.
+        """
+
+        if not self.finished:
+            self.cancelled = True
+            self.steps.close()
+            self._finish()
+
+    def _frame(self) -> None:
+        """
+        Draw one frame worth of hexagons and schedule the next frame.
+        """
+
+        self._pending = False
+        if self.paused or self.finished:
+            return
+
+        frame_start = time.perf_counter()
+        frame_end = frame_start + self.frame_time
+
+        if self.duration:
+            target = math.ceil(self.count * (self._active + self.frame_time) / self.duration)
+            target = min(self.count, max(self.drawn + 1, target))
+        else:
+            target = self.count
+
+        try:
+            for self.drawn in self.steps:
+                if self.drawn >= target or (not self.duration
+                                            and time.perf_counter() >= frame_end):
+                    break
+            else:
+                self.drawn = self.count
+            turtle.update()
+        except turtle.Terminator:
+            # The window is gone: nothing more to draw or update, but
+            # on_done still runs so its cleanup is not skipped.
+            self.cancelled = True
+            self.finished = True
+            self.closed = True
+            if self.on_done is not None:
+                self.on_done(self)
+            return
+
+        self._active += self.frame_time
+
+        if self.on_progress is not None:
+            self.on_progress(self.drawn, self.count)
+
+        if self.finished:
+            return
+        if self.drawn >= self.count:
+            self._finish()
+        elif not self.paused and not self.cancelled:
+            delay = frame_end - time.perf_counter() if self.duration else 0
+            self._schedule(max(0, int(delay * 1000)))
+
+    def _finish(self) -> None:
+        """
+        Restore normal screen updates and report completion.
+        """
+
+        self.finished = True
+        turtle.update()
+        turtle.tracer(1, 10)
+        if self.on_done is not None:
+            self.on_done(self)
+
+
+def animate_drawing(centers: list, colors: list, side: float, thickness_width: int,
+                    border_color: str, shadow_intensity: int, fps: float = FRAME_RATE,
+                    duration: float = ANIMATION_DURATION, instant: bool = False,
+                    on_progress=None, on_done=None, shared_borders: bool = False,
+                    merged_shadow: bool = False, profiler=None):
+    """
+    Animate drawing of hexagons with optional shadows and borders.
+
+    The drawing runs from turtle timers and returns immediately; call
+    turtle.done() or turtle.mainloop() to let it play. The screen is
+    refreshed at most fps times per second. With a duration the cells are
+    spread evenly over that time; without one each frame draws as many
+    cells as fit into its time budget.
+
+    Args:
+        centers (list): List of (x, y) tuples for hexagon centers.
+        colors (list): Corresponding fill colors for each hexagon.
+        side (float): Side length of hexagons.
+        thickness_width (int): Border line thickness.
+        border_color (str): Border color.
+        shadow_intensity (int): Shadow darkness intensity; 0 for no shadow.
+        fps (float): Target frame rate.
+        duration (float): Total animation time in seconds, or None to draw
+            as fast as possible.
+        instant (bool): Draw everything synchronously and update the screen once.
+        on_progress: Called as on_progress(drawn, count) after every frame.
+        on_done: Called as on_done(animation) once finished or cancelled.
+        shared_borders (bool): Stroke each lattice edge once instead of six
+            edges per hexagon.
+        merged_shadow (bool): Draw one shadow polygon for the whole grid
+            instead of one per hexagon.
+        profiler (instrument.Profiler): Time the drawing stages and frames;
+            installed for the duration of the drawing only.
+
+    Returns:
+        Animation: Handle to pause, resume or cancel the drawing; None in
+        instant mode.
+    """
+
+    steps = draw_steps(centers, colors, side, thickness_width, border_color, shadow_intensity,
+                       shared_borders, merged_shadow)
+    count = min(len(centers), len(colors))
+
+    if profiler is not None:
+        profiler.install(sys.modules[__name__])
+
+    if instant:
+        try:
+            turtle.tracer(0, 0)
+            for _ in steps:
+                pass
+            turtle.update()
+            turtle.tracer(1, 10)
+        finally:
+            if profiler is not None:
+                profiler.uninstall()
+        return None
+
+    if profiler is not None:
+        finished = on_done
+
+        def report(animation: Animation) -> None:
+            profiler.uninstall()
+            if finished is not None:
+                finished(animation)
+
+        def on_done(animation: Animation) -> None:
+            # The last frame is still being timed here, so report right after
+            # it, unless the window is closed and no timer can fire.
+            if animation.closed:
+                report(animation)
+            else:
+                turtle.ontimer(lambda: report(animation), 0)
+
+    animation = Animation(steps, count, fps, duration, on_progress, on_done)
+    return animation.start()
+
+
+def precompute_grid(N: int, size: float) -> dict:
+    """
+    Everything of an N x N grid that does not depend on the remaining prompts.
+
+    Computes the centers, warms the vertex and stamp caches used by the
+    first frame, and the palette indices of every pattern variant, so
+    only the colors are left to fill in once the user has chosen them.
+    A grid drawn flat keeps its centers as arrays, with no per-cell tuples.
+
+    Args:
+        N (int): Grid size.
+        size (float): Approximate total size of the grid.
+
+    Returns:
+        dict: 'centers' (a list of (x, y) tuples, or an (x, y) tuple of
+        arrays for a flat grid), 'side', and 'indices' mapping every
+        PATTERN_VARIANTS pair to pattern_indices.
+    """
+
+    x, y, side = hexagon_center_arrays(N, N, size)
+    if level_of_detail(side)['flat']:
+        centers = (x, y)
+        raster.fill_stamp(side)
+    else:
+        centers = list(zip(x.tolist(), y.tolist()))
+        hexagon_vertices(side)
+    indices = {variant: pattern_indices(N, N, *variant) for variant in PATTERN_VARIANTS}
+    return {'centers': centers, 'side': side, 'indices': indices}
+
+
+def start_precompute(N: int, size: float) -> Future:
+    """
+    Run precompute_grid on a worker thread while the prompts are pending.
+
+    input() and most of numpy release the GIL, so the work overlaps the
+    time the user spends answering.
+
+    Args:
+        N (int): Grid size.
+        size (float): Approximate total size of the grid.
+
+    Returns:
+        Future: Resolves to the result of precompute_grid.
+    """
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='precompute')
+    future = executor.submit(precompute_grid, N, size)
+    executor.shutdown(wait=False)
+    return future
 
 
 def main():
@@ -545,6 +998,8 @@ def main():
     turtle.bgcolor("white")
 
     N = get_num_hexagons()
+    size = 500
+    precomputed = start_precompute(N, size)
 
     color_first, color_second = get_color_choice()
     preview_colors(color_first, color_second)
@@ -553,9 +1008,6 @@ def main():
     border_col = border_color()
     shadow_intensity = shadow_brightness()
 
-    size = 500
-
-    centers, side = calculate_hexagon_centers(N, size)
     pattern = chose_pattern_check()
 
     if pattern == f'{lcl.ALTERNATING_COLORS}':
@@ -563,9 +1015,79 @@ def main():
     else:
         pattern_type = ""
 
-    colors = pattern_colors(N, color_first, color_second, pattern, pattern_type)
+    grid = precomputed.result()
+    centers, side = grid['centers'], grid['side']
+
+    def indices_for(pattern: str, pattern_type: str):
+        indices = grid['indices'].get((pattern, pattern_type))
+        if indices is None:
+            indices = pattern_indices(N, N, pattern, pattern_type)
+        return indices
+
+    def colors_for(pattern: str, pattern_type: str, first: str, second: str) -> list:
+        return resolve_colors(indices_for(pattern, pattern_type), pattern_palette(first, second))
+
+    level = level_of_detail(side)
+    print(describe_detail(side, level))
+    if level['flat']:
+        # Arrays all the way to raster.render: no per-cell tuples or strings.
+        draw_flat(centers, (indices_for(pattern, pattern_type),
+                            pattern_palette(color_first, color_second)), side)
+        turtle.done()
+        return
 
-    animate_drawing(centers, colors, side, thickness_width, border_col, shadow_intensity)
+    colors = colors_for(pattern, pattern_type, color_first, color_second)
+    if not level['shadow']:
+        shadow_intensity = 0
+
+    current = {'state': GridState(colors, thickness_width, border_col, shadow_intensity),
+               'pattern': pattern, 'pattern_type': pattern_type,
+               'choices': [color_first, color_second], 'drawn': None, 'grid': None}
+
+    def on_click(x: float, y: float) -> None:
+        state = current['state']
+        i = recolor_at(x, y, N, size, centers, state.colors, current['choices'], side,
+                       thickness_width, border_col, current['drawn'], current['grid'])
+        if i is not None:
+            state.set_color(i, state.colors[i])
+
+    def on_change() -> None:
+        answer = ask_settings(current['pattern'], current['pattern_type'], *current['choices'])
+        if answer is None:
+            return
+        new_pattern, new_type, first, second = answer
+        state = GridState(colors_for(new_pattern, new_type, first, second),
+                          thickness_width, border_col, shadow_intensity)
+        apply_state(current['state'], state, centers, side, current['drawn'], current['grid'],
+                    level['shared_borders'], level['merged_shadow'])
+        current.update(state=state, pattern=new_pattern, pattern_type=new_type,
+                       choices=[first, second])
+        turtle.listen()
+
+    def enable_controls(animation: Animation) -> None:
+        if animation.closed:
+            return
+        # Swap the turtle drawing for canvas items kept by cell, so edits
+        # reconfigure items instead of tracing polygons again.
+        grid = CanvasGrid()
+        turtle.clear()
+        grid.draw(centers[:animation.drawn], current['state'].colors, side, thickness_width,
+                  border_col, shadow_intensity, shared_borders=level['shared_borders'],
+                  merged_shadow=level['merged_shadow'])
+        turtle.update()
+        current.update(drawn=animation.drawn, grid=grid)
+        turtle.onscreenclick(on_click)
+        turtle.onkey(on_change, 'c')
+
+    animation = animate_drawing(centers, colors, side, thickness_width, border_col,
+                                shadow_intensity, on_done=enable_controls,
+                                shared_borders=level['shared_borders'],
+                                merged_shadow=level['merged_shadow'])
+
+    print(f'{lcl.ANIMATION_CONTROLS}')
+    turtle.onkey(animation.toggle, 'space')
+    turtle.onkey(animation.cancel, 'Escape')
+    turtle.listen()
     turtle.done()
 
 
@@ -0,0 +1,294 @@
+import functools
+import struct
+import zlib
+
+import numpy as np
+
+import local as lcl
+from geometry import cell_indices, grid_layout, hexagon_center_arrays
+from lazy import MissingModule, lazy_import
+from raster import pack, to_rgb
+from settings import available_colors_1, available_colors_2
+
+Image = lazy_import('PIL.Image')
+if isinstance(Image, MissingModule):
+    Image = None
+
+
+# Image rows labelled at once; bounds the temporary label map.
+CHUNK_ROWS = 256
+# Bits kept per channel in the nearest-palette-color lookup table.
+SNAP_BITS = 6
+
+
+def _read_ppm(data: bytes) -> np.ndarray:
+    """
+    Decode a binary PPM (P6) or PGM (P5) image with 8-bit samples.
+    """
+
+    fields = []
+    pos = 2
+    while len(fields) < 3:
+        while data[pos:pos + 1].isspace():
+            pos += 1
+        if data[pos:pos + 1] == b'#':
+            pos = data.index(b'\n', pos)
+            continue
+        end = pos
+        while not data[end:end + 1].isspace():
+            end += 1
+        fields.append(int(data[pos:end]))
+        pos = end
+    width, height, maxval = fields
+    if maxval > 255:
+        raise ValueError(f'{lcl.ERROR_IMAGE_FORMAT}')
+
+    channels = 3 if data[:2] == b'P6' else 1
+    pixels = np.frombuffer(data, dtype=np.uint8, count=width * height * channels, offset=pos + 1)
+    return pixels.reshape(height, width, channels)
+
+
+def _unfilter(raw: bytes, width: int, height: int, bpp: int) -> np.ndarray:
+    """
+    Undo the PNG row filters of 8-bit samples with bpp bytes per pixel.
+    """
+
+    stride = width * bpp
+    rows = np.frombuffer(raw, dtype=np.uint8, count=height * (stride + 1)).reshape(height, -1)
+    out = np.empty((height, stride), dtype=np.uint8)
+    prev = np.zeros(stride, dtype=np.uint8)
+
+    for y in range(height):
+        kind, cur = rows[y, 0], rows[y, 1:]
+        if kind == 0:
+            line = cur
+        elif kind == 1:
+            line = np.cumsum(cur.reshape(width, bpp), axis=0, dtype=np.uint8).reshape(-1)
+        elif kind == 2:
+            line = cur + prev
+        elif kind in (3, 4):
+            # Average and Paeth depend on the pixel just decoded, so go byte by byte.
+            line = cur.tolist()
+            up = prev.tolist()
+            for i in range(stride):
+                a = line[i - bpp] if i >= bpp else 0
+                b = up[i]
+                if kind == 3:
+                    line[i] = (line[i] + ((a + b) >> 1)) & 0xff
+                    continue
+                c = up[i - bpp] if i >= bpp else 0
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                predictor = a if pa <= pb and pa <= pc else (b if pb <= pc else c)
+                line[i] = (line[i] + predictor) & 0xff
+            line = np.array(line, dtype=np.uint8)
+        else:
+            raise ValueError(f'{lcl.ERROR_IMAGE_FORMAT}')
+        out[y] = line
+        prev = out[y]
+
+    return out
+
+
+def _read_png(data: bytes) -> np.ndarray:
+    """
+    Decode a non-interlaced 8-bit PNG: gray, RGB, palette, with or without alpha.
+    """
+
+    pos = 8
+    chunks = {}
+    while pos < len(data):
+        length, kind = struct.unpack('>I4s', data[pos:pos + 8])
+        chunks.setdefault(kind, []).append(data[pos + 8:pos + 8 + length])
+        pos += 12 + length
+
+    width, height, depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB',
+                                                                      chunks[b'IHDR'][0])
+    channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}.get(color_type)
+    if depth != 8 or interlace or channels is None:
+        raise ValueError(f'{lcl.ERROR_IMAGE_FORMAT}')
+
+    raw = zlib.decompress(b''.join(chunks[b'IDAT']))
+    pixels = _unfilter(raw, width, height, channels).reshape(height, width, channels)
+
+    if color_type == 3:
+        palette = np.frombuffer(chunks[b'PLTE'][0], dtype=np.uint8).reshape(-1, 3)
+        pixels = palette[pixels[..., 0]]
+    return pixels
+
+
+def load_image(path: str) -> np.ndarray:
+    """
+    Read an image file into an RGB array.
+
+    Any format Pillow knows is read when it is installed; without it PNG
+    and binary PPM/PGM files are decoded here. Transparent pixels are
+    blended over white.
+
+    Args:
+        path (str): Image file path.
+
+    Returns:
+        np.ndarray: (H, W, 3) uint8 image.
+
+    Raises:
+        ValueError: If the file format is not supported.
+    """
+
+    if Image is not None:
+        with Image.open(path) as picture:
+            pixels = np.asarray(picture.convert('RGBA'))
+    else:
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data.startswith(b'\x89PNG'):
+            pixels = _read_png(data)
+        elif data[:2] in (b'P5', b'P6'):
+            pixels = _read_ppm(data)
+        else:
+            raise ValueError(f'{lcl.ERROR_IMAGE_FORMAT}')
+
+    if pixels.shape[2] in (2, 4):
+        alpha = pixels[..., -1:].astype(np.float32) / 255
+        color = pixels[..., :-1].astype(np.float32)
+        pixels = np.rint(color * alpha + 255 * (1 - alpha)).astype(np.uint8)
+    if pixels.shape[2] == 1:
+        pixels = np.repeat(pixels, 3, axis=2)
+    return pixels
+
+
+def image_cell_colors(image: np.ndarray, rows: int, cols: int, size: float) -> np.ndarray:
+    """
+    Average color of the image pixels under every hexagon of a grid.
+
+    The image is scaled to cover the grid and centered on it. Every pixel
+    is labelled with its cell by geometry.cell_indices, and the colors are
+    summed per label with np.bincount, a band of rows at a time. Cells
+    smaller than a pixel that get no pixel take the one under their middle.
+
+    Args:
+        image (np.ndarray): (H, W, 3) uint8 image.
+        rows (int): Number of rows.
+        cols (int): Number of hexagons per row.
+        size (float): Approximate total size of the grid.
+
+    Returns:
+        np.ndarray: (rows * cols, 3) uint8 colors in cell order.
+    """
+
+    height, width = image.shape[:2]
+    start_x, start_y, width_hex, side = grid_layout(rows, cols, size)
+
+    left = start_x
+    right = start_x + width_hex * (cols + 0.5 if rows > 1 else cols)
+    top = start_y + side / 2
+    bottom = start_y - (rows - 1) * side * 1.5 - side * 1.5
+    scale = max((right - left) / width, (top - bottom) / height)
+    middle_x, middle_y = (left + right) / 2, (top + bottom) / 2
+
+    count = rows * cols
+    sums = np.zeros((count, 3))
+    hits = np.zeros(count)
+    x = middle_x + (np.arange(width) + 0.5 - width / 2) * scale
+
+    for first in range(0, height, CHUNK_ROWS):
+        band = image[first:first + CHUNK_ROWS]
+        y = middle_y - (np.arange(first, first + len(band)) + 0.5 - height / 2) * scale
+        labels = cell_indices(x[None, :], y[:, None], rows, cols, size).ravel()
+        inside = labels >= 0
+        labels = labels[inside]
+        pixels = band.reshape(-1, 3)[inside]
+        hits += np.bincount(labels, minlength=count)
+        for channel in range(3):
+            sums[:, channel] += np.bincount(labels, weights=pixels[:, channel], minlength=count)
+
+    colors = np.rint(sums / np.maximum(hits, 1)[:, None]).astype(np.uint8)
+
+    empty = np.flatnonzero(hits == 0)
+    if len(empty):
+        cx, cy, _ = hexagon_center_arrays(rows, cols, size)
+        px = cx[empty] + width_hex / 2
+        py = cy[empty] - side / 2
+        col = np.clip(((px - middle_x) / scale + width / 2).astype(np.intp), 0, width - 1)
+        row = np.clip(((middle_y - py) / scale + height / 2).astype(np.intp), 0, height - 1)
+        colors[empty] = image[row, col]
+
+    return colors
+
+
+def mosaic_palette() -> list:
+    """
+    Colors offered by the prompts of main(), used to snap mosaic cells.
+
+    Returns:
+        list: Color names from available_colors_1 and available_colors_2.
+    """
+
+    return [color for _, color in available_colors_1 + available_colors_2 if color]
+
+
+@functools.lru_cache(maxsize=8)
+def _snap_table(palette: tuple) -> np.ndarray:
+    """
+    Nearest palette entry for every color of a SNAP_BITS-per-channel cube.
+    """
+
+    levels = 1 << SNAP_BITS
+    step = 256 // levels
+    axis = np.arange(levels) * step + step // 2
+    cube = np.stack(np.meshgrid(axis, axis, axis, indexing='ij'), axis=-1).reshape(-1, 1, 3)
+    targets = np.array([to_rgb(color) for color in palette], dtype=np.int32)
+
+    table = np.empty(len(cube), dtype=np.uint8)
+    for start in range(0, len(cube), 1 << 15):
+        distance = ((cube[start:start + (1 << 15)] - targets[None]) ** 2).sum(axis=2)
+        table[start:start + (1 << 15)] = distance.argmin(axis=1)
+    return table
+
+
+def snap_colors(colors: np.ndarray, palette: list) -> np.ndarray:
+    """
+    Replace every color by its nearest palette color.
+
+    The nearest entries are looked up in a precomputed table of the RGB
+    cube, so the cost per cell does not depend on the palette size.
+
+    Args:
+        colors (np.ndarray): (n, 3) uint8 colors.
+        palette (list): Color names or HEX codes.
+
+    Returns:
+        np.ndarray: (n,) uint8 palette indices.
+    """
+
+    shift = 8 - SNAP_BITS
+    q = colors.astype(np.intp) >> shift
+    return _snap_table(tuple(palette))[(q[:, 0] << (2 * SNAP_BITS)) | (q[:, 1] << SNAP_BITS)
+                                       | q[:, 2]]
+
+
+def mosaic_colors(path: str, rows: int, cols: int, size: float, snap: bool = False) -> tuple:
+    """
+    Cell colors of a hexagon mosaic of an image, ready for the renderers.
+
+    Args:
+        path (str): Image file path.
+        rows (int): Number of rows.
+        cols (int): Number of hexagons per row.
+        size (float): Approximate total size of the grid.
+        snap (bool): Use only the colors of mosaic_palette.
+
+    Returns:
+        tuple: (uint index array, list of color strings), the colors form
+        accepted by raster.render and vector_export.
+    """
+
+    colors = image_cell_colors(load_image(path), rows, cols, size)
+
+    if snap:
+        palette = mosaic_palette()
+        return snap_colors(colors, palette), palette
+
+    values, indices = np.unique(pack(colors), return_inverse=True)
+    palette = ['#%06x' % value for value in values.tolist()]
+    return indices.reshape(-1), palette
@@ -1,47 +1,20 @@
-import turtle
 import math
+import turtle
 
-def calculate_side_length(number, size):
-    """Вычисление длины стороны шестиугольника для равномерного заполнения."""
-    # Расчет с учетом ширины между центрами
-    side = size / (number + 0.5)
-    return side
-
-def calculate_hexagon_centers(number, size):
-    """Рассчет координат центров шестиугольников для центрирования и заполнения."""
-    side = calculate_side_length(number, size)
-    width_hexagon = math.sqrt(3) * side  # ширина по горизонтали
-    # Расчеты позволяют центрировать сетку на холсте
-    total_width = width_hexagon * number
-    total_height = side * 1.5 * number  # приблизительная высота сетки
-
-    # Начальная позиция (центральная точка экрана)
-    start_x = - total_width/2 + width_hexagon/2
-    start_y = total_height/2 - side/2
-
-    centers = []
-
-    for row in range(number):
-        y = start_y - row * side * 1.5
-        for col in range(number):
-            x = start_x + col * width_hexagon
-            if row % 2 == 1:
-                x += width_hexagon / 2  # смещение для нечетных строк
-            centers.append((x, y))
-    return centers
+from geometry import calculate_hexagon_centers, hexagon_path
 
 def draw_hexagon(x, y, side_length):
-    """Рисование шестиугольника с центром в (x, y)."""
-    turtle.right(30)
+    """Рисование шестиугольника с верхней вершиной в (x, y), вершины из шаблона geometry."""
+    # Шаблон geometry привязан к левой верхней вершине, сдвигаем его так,
+    # чтобы в (x, y) оказалась верхняя, как раньше при turtle.right(30)
+    path = hexagon_path(x - math.sqrt(3) / 2 * side_length, y - side_length / 2, side_length)
 
     turtle.up()
-    turtle.goto(x, y)
+    turtle.goto(path[0])
     turtle.down()
 
-    for index in range(6):
-        turtle.forward(side_length)
-        turtle.right(60)
-    turtle.left(30)
+    for point in path[1:]:
+        turtle.goto(point)
 
 def main():
     turtle.speed(0)
@@ -50,8 +23,8 @@ def main():
     user_number = int(input("Введите количество шестиугольников в ряд: "))
     size = 500  # размер области
 
-    centers = calculate_hexagon_centers(user_number, size)# Расчет координат центров шестиугольников
-    side = calculate_side_length(user_number, size) # Длина стороны шестиугольника
+    # Координаты центров и длина стороны (кэшируются в geometry)
+    centers, side = calculate_hexagon_centers(user_number, size)
 
 
     for (x, y) in centers: # Рисуем каждый шестиугольник на своей позиции
@@ -0,0 +1,172 @@
+import numpy as np
+
+import local as lcl
+
+
+def pattern_indices(rows: int, cols: int, pattern: str, pattern_type: str = "") -> np.ndarray:
+    """
+    Compute the palette index of every cell from its (row, col) position.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of hexagons per row.
+        pattern (str): Selected pattern ('шахматный' or 'чередование цветов').
+        pattern_type (str): Pattern orientation ('по строкам' or 'по столбцам').
+
+    Returns:
+        np.ndarray: uint8 array of length rows * cols, cells ordered row by row;
+        0 selects the first color and 1 the second.
+
+    Raises:
+        ValueError: If pattern is neither chequered nor alternating colors.
+    """
+
+    # Only the parity matters: take it at full width, then narrow to uint8
+    # so the broadcast grid costs one byte per cell.
+    row = (np.arange(rows) & 1).astype(np.uint8)[:, None]
+    col = (np.arange(cols) & 1).astype(np.uint8)[None, :]
+    index = np.broadcast_to(cell_pattern(row, col, pattern, pattern_type), (rows, cols))
+
+    return np.ascontiguousarray(index, dtype=np.uint8).reshape(-1)
+
+
+def cell_pattern(row, col, pattern: str, pattern_type: str = ""):
+    """
+    Palette index for arbitrary (row, col) positions, e.g. a single tile.
+
+    Args:
+        row: Row numbers; any integer array broadcastable against col.
+        col: Column numbers.
+        pattern (str): Selected pattern ('шахматный' or 'чередование цветов').
+        pattern_type (str): Pattern orientation ('по строкам' or 'по столбцам').
+
+    Returns:
+        np.ndarray: uint8 palette indices with the broadcast shape.
+
+    Raises:
+        ValueError: If pattern is neither chequered nor alternating colors.
+    """
+
+    row = np.asarray(row) & 1
+    col = np.asarray(col) & 1
+
+    if pattern == f'{lcl.CHEQUERED}':
+        index = row ^ col
+    elif pattern != f'{lcl.ALTERNATING_COLORS}':
+        raise ValueError(f'{lcl.ERROR_UNKNOWN_OPTION}pattern: {pattern}')
+    elif pattern_type == f'{lcl.ROW_BY_ROW}':
+        index = row + 0 * col
+    else:
+        index = col + 0 * row
+
+    return index.astype(np.uint8)
+
+
+def pattern_palette(color_first: str, color_second: str) -> tuple:
+    """
+    Build the palette table addressed by pattern_indices.
+
+    Args:
+        color_first (str): First color option.
+        color_second (str): Second color option.
+
+    Returns:
+        tuple: (color_first, color_second)
+    """
+
+    return color_first, color_second
+
+
+def resolve_colors(indices: np.ndarray, palette: tuple) -> list:
+    """
+    Expand palette indices into a list of color strings.
+
+    Args:
+        indices (np.ndarray): Palette index of every cell.
+        palette (tuple): Palette table.
+
+    Returns:
+        list: Color of every cell.
+    """
+
+    return np.array(palette, dtype=object)[indices].tolist()
+
+
+def palette_colors(colors) -> tuple:
+    """
+    Normalize cell colors into palette indices and a palette table.
+
+    Args:
+        colors: List of color strings, or an (indices, palette) tuple as
+            produced by main.pattern_indices and main.pattern_palette.
+
+    Returns:
+        tuple: (int index array, list of color strings)
+    """
+
+    if isinstance(colors, tuple):
+        indices, palette = colors
+        return np.asarray(indices, dtype=np.intp), list(palette)
+
+    lookup = {}
+    indices = np.fromiter((lookup.setdefault(c, len(lookup)) for c in colors),
+                          dtype=np.intp, count=len(colors))
+    return indices, list(lookup)
+
+
+def chess_pattern(N: int, color_first: str, color_second: str) -> list:
+    """
+    Generates a list of colors for a chessboard pattern.
+
+    Args:
+        N (int): The size of the grid (number of hexagons in each row and column).
+        color_first (str): The first color option.
+        color_second (str): The second color option.
+
+    Returns:
+        list: A list of length N*N with colors assigned in a chessboard pattern.
+    """
+
+    indices = pattern_indices(N, N, f'{lcl.CHEQUERED}')
+    return resolve_colors(indices, pattern_palette(color_first, color_second))
+
+
+def alternation(N: int, pattern_type: str, color_first: str, color_second: str) -> list:
+    """
+    Generates a list of colors for an alternating pattern.
+
+    Args:
+        N (int): The grid size.
+        pattern_type (str): Either 'по строкам' (by rows) or 'по столбцам' (by columns).
+        color_first (str): The first color.
+        color_second (str): The second color.
+
+    Returns:
+        list: The list of colors following the selected pattern.
+    """
+
+    indices = pattern_indices(N, N, f'{lcl.ALTERNATING_COLORS}', pattern_type)
+    return resolve_colors(indices, pattern_palette(color_first, color_second))
+
+
+def pattern_colors(N: int, color_first: str, color_second: str, 
+                   pattern: str, pattern_type: str) -> list:
+    """
+    Determines the color pattern based on user's choice.
+
+    Args:
+        N (int): Grid size.
+        color_first (str): First color option.
+        color_second (str): Second color option.
+        pattern (str): Selected pattern ('шахматный' or 'чередование цветов').
+        pattern_type (str): Pattern orientation ('по строкам' or 'по столбцам').
+
+    Returns:
+        list: List of colors matching the pattern.
+
+    Raises:
+        ValueError: If pattern is neither chequered nor alternating colors.
+    """
+
+    indices = pattern_indices(N, N, pattern, pattern_type)
+    return resolve_colors(indices, pattern_palette(color_first, color_second))
@@ -0,0 +1,347 @@
+import functools
+import math
+import struct
+import zlib
+
+import numpy as np
+
+from geometry import GEOMETRY_CACHE_SIZE, center_points, hexagon_vertices, read_only
+from patterns import palette_colors
+from settings import color_map, to_rgb
+
+
+CANVAS_SIZE = 800
+BACKGROUND = (255, 255, 255)
+SHADOW_COLOR = (0x68, 0x68, 0x68)
+OUTLINE_COLOR = (0, 0, 0)
+
+# Max number of (cell, pixel) pairs stamped at once; bounds temporary memory.
+CHUNK_PIXELS = 1 << 22
+# Image rows compressed at once when writing PNG.
+PNG_BAND_ROWS = 256
+
+
+def _pixel_grid(vertices: np.ndarray, pad: float) -> tuple:
+    """
+    Pixel-center offsets of the box around a hexagon, in turtle coordinates.
+
+    Returns:
+        tuple: (row offsets, col offsets, x, y) flattened arrays.
+    """
+
+    x0 = math.floor(vertices[:, 0].min() - pad) - 1
+    x1 = math.ceil(vertices[:, 0].max() + pad) + 1
+    y0 = math.floor(-vertices[:, 1].max() - pad) - 1
+    y1 = math.ceil(-vertices[:, 1].min() + pad) + 1
+    rows, cols = np.mgrid[y0:y1 + 1, x0:x1 + 1]
+    rows = rows.ravel()
+    cols = cols.ravel()
+    return rows, cols, cols.astype(float), -rows.astype(float)
+
+
+@functools.lru_cache(maxsize=GEOMETRY_CACHE_SIZE)
+def fill_stamp(side: float) -> tuple:
+    """
+    Pixel offsets covered by a filled hexagon anchored at pixel (0, 0).
+
+    Cached per side length; the returned arrays are read-only.
+
+    Args:
+        side (float): Side length of hexagon.
+
+    Returns:
+        tuple: (row offsets, col offsets) int arrays.
+    """
+
+    vertices = hexagon_vertices(side)
+    rows, cols, x, y = _pixel_grid(vertices, 0)
+    inside = np.ones(rows.shape, dtype=bool)
+    # Vertices go clockwise, so the interior lies to the right of every edge.
+    for (ax, ay), (bx, by) in zip(vertices, np.roll(vertices, -1, axis=0)):
+        inside &= (bx - ax) * (y - ay) - (by - ay) * (x - ax) <= 1e-9
+    return read_only(rows[inside]), read_only(cols[inside])
+
+
+@functools.lru_cache(maxsize=GEOMETRY_CACHE_SIZE)
+def outline_stamp(side: float, thickness: int) -> tuple:
+    """
+    Pixel offsets covered by a hexagon outline stroked with a given pen size.
+
+    Cached per side length and pen size; the returned arrays are read-only.
+
+    Args:
+        side (float): Side length of hexagon.
+        thickness (int): Pen size.
+
+    Returns:
+        tuple: (row offsets, col offsets) int arrays.
+    """
+
+    half = max(thickness, 1) / 2
+    vertices = hexagon_vertices(side)
+    rows, cols, x, y = _pixel_grid(vertices, half)
+    dist = np.full(rows.shape, np.inf)
+    for (ax, ay), (bx, by) in zip(vertices, np.roll(vertices, -1, axis=0)):
+        ex, ey = bx - ax, by - ay
+        t = np.clip(((x - ax) * ex + (y - ay) * ey) / (ex * ex + ey * ey), 0, 1)
+        dist = np.minimum(dist, np.hypot(x - ax - t * ex, y - ay - t * ey))
+    hit = dist <= half
+    return read_only(rows[hit]), read_only(cols[hit])
+
+
+def pack(rgb) -> np.ndarray:
+    """
+    Pack RGB triples into 0xRRGGBB integers.
+
+    Args:
+        rgb: One (r, g, b) triple or an (n, 3) array.
+
+    Returns:
+        np.ndarray: uint32 scalar or array.
+    """
+
+    rgb = np.asarray(rgb, dtype=np.uint32)
+    return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+
+def unpack(packed: np.ndarray) -> np.ndarray:
+    """
+    Expand a packed 0xRRGGBB buffer into an (..., 3) uint8 RGB image.
+
+    Args:
+        packed (np.ndarray): uint32 buffer.
+
+    Returns:
+        np.ndarray: uint8 RGB image.
+    """
+
+    image = np.empty(packed.shape + (3,), dtype=np.uint8)
+    image[..., 0] = packed >> 16
+    image[..., 1] = packed >> 8
+    image[..., 2] = packed
+    return image
+
+
+def stamp(canvas: np.ndarray, anchors: tuple, offsets: tuple, fill) -> None:
+    """
+    Paint one mask at many anchors at once.
+
+    Args:
+        canvas (np.ndarray): (H, W) packed uint32 buffer, modified in place.
+        anchors (tuple): (rows, cols) int arrays of anchor pixels.
+        offsets (tuple): (rows, cols) int arrays from a *_stamp function.
+        fill: One packed color, or an array with a packed color per anchor.
+    """
+
+    height, width = canvas.shape
+    flat = canvas.reshape(-1)
+    anchor_rows, anchor_cols = anchors
+    off_rows, off_cols = offsets
+    if not len(anchor_rows) or not len(off_rows):
+        return
+    per_cell = np.ndim(fill) == 1
+    step = max(1, CHUNK_PIXELS // len(off_rows))
+
+    for start in range(0, len(anchor_rows), step):
+        stop = start + step
+        rows = anchor_rows[start:stop, None] + off_rows[None, :]
+        cols = anchor_cols[start:stop, None] + off_cols[None, :]
+        index = rows * width + cols
+        values = np.broadcast_to(fill[start:stop, None], rows.shape) if per_cell else fill
+        if (rows.min() < 0 or rows.max() >= height
+                or cols.min() < 0 or cols.max() >= width):
+            valid = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+            index = index[valid]
+            values = values[valid] if per_cell else values
+        flat[index.ravel()] = np.ravel(values) if per_cell else values
+
+
+def render(centers, colors, side: float, thickness_width: int,
+           border_color: str, shadow_intensity: int,
+           width: int = CANVAS_SIZE, height: int = CANVAS_SIZE,
+           borders: bool = True) -> np.ndarray:
+    """
+    Render the hexagon grid into an RGB buffer without turtle or Tk.
+
+    Shadows never overlap previously drawn cells, so drawing all shadows,
+    then all fills, then all borders gives the same picture as the
+    per-cell order of animate_drawing.
+
+    Args:
+        centers: List of (x, y) tuples, or an (x, y) tuple of arrays.
+        colors: Fill colors for each hexagon, or an (indices, palette) tuple.
+        side (float): Side length of hexagons.
+        thickness_width (int): Border line thickness.
+        border_color (str): Border color.
+        shadow_intensity (int): Shadow offset; 0 for no shadow.
+        width (int): Image width in pixels.
+        height (int): Image height in pixels.
+        borders (bool): Stroke the hexagon borders; without them the cells
+            are flat-colored.
+
+    Returns:
+        np.ndarray: (height, width, 3) uint8 image.
+    """
+
+    canvas = np.full((height, width), pack(BACKGROUND), dtype=np.uint32)
+
+    points = center_points(centers)
+    indices, palette = palette_colors(colors)
+    count = min(len(points), len(indices))
+    points = points[:count]
+    indices = indices[:count]
+    anchors = (np.rint(height / 2 - points[:, 1]).astype(np.intp),
+               np.rint(width / 2 + points[:, 0]).astype(np.intp))
+
+    table = pack([to_rgb(c) for c in palette] or [BACKGROUND])
+
+    if shadow_intensity > 0:
+        shifted = (anchors[0] + shadow_intensity, anchors[1] + shadow_intensity)
+        stamp(canvas, shifted, fill_stamp(side), pack(SHADOW_COLOR))
+        stamp(canvas, shifted, outline_stamp(side, 1), pack(OUTLINE_COLOR))
+
+    stamp(canvas, anchors, fill_stamp(side), table[indices])
+    if borders:
+        stamp(canvas, anchors, outline_stamp(side, thickness_width),
+              pack(to_rgb(color_map.get(border_color, 'black'))))
+
+    return unpack(canvas)
+
+
+def save_png(path: str, image: np.ndarray) -> None:
+    """
+    Write an RGB buffer to a PNG file.
+
+    Args:
+        path (str): Output file path.
+        image (np.ndarray): (H, W, 3) uint8 image.
+    """
+
+    height, width = image.shape[:2]
+    bands = (image[top:top + PNG_BAND_ROWS] for top in range(0, height, PNG_BAND_ROWS))
+    save_png_bands(path, width, height, bands)
+
+
+def save_png_bands(path: str, width: int, height: int, bands) -> None:
+    """
+    Write a PNG from consecutive bands of rows, compressing as they arrive.
+
+    Args:
+        path (str): Output file path.
+        width (int): Image width.
+        height (int): Image height.
+        bands: Iterable of (rows, width, 3) uint8 arrays covering the image
+            from top to bottom.
+    """
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (struct.pack('>I', len(data)) + kind + data
+                + struct.pack('>I', zlib.crc32(kind + data)))
+
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+
+        compressor = zlib.compressobj(6)
+        for band in bands:
+            raw = np.zeros((len(band), width * 3 + 1), dtype=np.uint8)
+            raw[:, 1:] = band.reshape(len(band), width * 3)
+            data = compressor.compress(raw.tobytes())
+            if data:
+                f.write(chunk(b'IDAT', data))
+        f.write(chunk(b'IDAT', compressor.flush()))
+        f.write(chunk(b'IEND', b''))
+
+
+def deflate_rows(band: np.ndarray) -> tuple:
+    """
+    Compress a band of image rows on its own, for parallel PNG encoding.
+
+    The band is filtered with filter type 0 and raw-deflated up to a sync
+    flush, so the results of consecutive bands can simply be concatenated.
+
+    Args:
+        band (np.ndarray): (rows, width, 3) uint8 band.
+
+    Returns:
+        tuple: (deflated bytes, adler32 of the filtered rows, their length)
+    """
+
+    raw = np.zeros((len(band), band.shape[1] * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = band.reshape(len(band), -1)
+    data = raw.tobytes()
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+    deflated = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    return deflated, zlib.adler32(data), len(data)
+
+
+def adler32_combine(first: int, second: int, length: int) -> int:
+    """
+    Adler-32 of two concatenated pieces from the checksums of each piece.
+
+    Args:
+        first (int): Checksum of the first piece.
+        second (int): Checksum of the second piece.
+        length (int): Length of the second piece.
+
+    Returns:
+        int: Checksum of the concatenation.
+    """
+
+    base = 65521
+    rem = length % base
+    low = ((first & 0xffff) + (second & 0xffff) - 1) % base
+    high = (rem * (first & 0xffff) + (first >> 16) + (second >> 16) - rem) % base
+    return (high << 16) | low
+
+
+def save_png_parts(path: str, width: int, height: int, parts) -> None:
+    """
+    Write a PNG from bands compressed independently by deflate_rows.
+
+    Args:
+        path (str): Output file path.
+        width (int): Image width.
+        height (int): Image height.
+        parts: Iterable of deflate_rows results, from top to bottom.
+    """
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (struct.pack('>I', len(data)) + kind + data
+                + struct.pack('>I', zlib.crc32(kind + data)))
+
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+
+        checksum = 1
+        f.write(chunk(b'IDAT', b'\x78\x9c'))
+        for data, adler, length in parts:
+            checksum = adler32_combine(checksum, adler, length)
+            f.write(chunk(b'IDAT', data))
+        # An empty final block ends the deflate stream.
+        f.write(chunk(b'IDAT', b'\x03\x00' + struct.pack('>I', checksum)))
+        f.write(chunk(b'IEND', b''))
+
+
+def render_png(path: str, centers, colors, side: float, thickness_width: int,
+               border_color: str, shadow_intensity: int,
+               width: int = CANVAS_SIZE, height: int = CANVAS_SIZE) -> None:
+    """
+    Headless replacement for animate_drawing that writes a PNG file.
+
+    Args:
+        path (str): Output file path.
+        centers: List of (x, y) tuples, or an (x, y) tuple of arrays.
+        colors: Fill colors for each hexagon, or an (indices, palette) tuple.
+        side (float): Side length of hexagons.
+        thickness_width (int): Border line thickness.
+        border_color (str): Border color.
+        shadow_intensity (int): Shadow offset; 0 for no shadow.
+        width (int): Image width in pixels.
+        height (int): Image height in pixels.
+    """
+
+    image = render(centers, colors, side, thickness_width, border_color,
+                   shadow_intensity, width, height)
+    save_png(path, image)
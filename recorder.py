@@ -0,0 +1,336 @@
+import struct
+import zlib
+
+import numpy as np
+
+import local as lcl
+from geometry import center_points
+from patterns import palette_colors
+from raster import (BACKGROUND, CANVAS_SIZE, OUTLINE_COLOR, SHADOW_COLOR, fill_stamp,
+                    outline_stamp, pack, to_rgb, unpack)
+from settings import color_map
+
+
+# Time each frame is shown, in seconds; GIF counts in hundredths.
+FRAME_DELAY = 0.04
+# How long the finished picture stays before the animation loops.
+FINAL_DELAY = 2.0
+# Largest LZW code of GIF.
+GIF_MAX_CODE = 4096
+# Paint layers in the order raster.render stamps them; a pixel is only
+# painted over by the same or a higher layer.
+SHADOW_LAYER, SHADOW_OUTLINE_LAYER, FILL_LAYER, BORDER_LAYER = 1, 2, 3, 4
+
+
+def _extent(offsets: tuple) -> tuple:
+    rows, cols = offsets
+    return rows.min(), rows.max(), cols.min(), cols.max()
+
+
+def _paint(canvas: np.ndarray, layers: np.ndarray, row: int, col: int, offsets: tuple,
+           color, layer: int) -> None:
+    """
+    Stamp one mask at one anchor, leaving pixels of higher layers alone.
+    """
+
+    height, width = canvas.shape
+    rows, cols = row + offsets[0], col + offsets[1]
+    valid = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+    index = rows[valid] * width + cols[valid]
+    index = index[layers.reshape(-1)[index] <= layer]
+    canvas.reshape(-1)[index] = color
+    layers.reshape(-1)[index] = layer
+
+
+def record_frames(centers, colors, side: float, thickness_width: int, border_color: str,
+                  shadow_intensity: int, width: int = CANVAS_SIZE, height: int = CANVAS_SIZE,
+                  cells_per_frame: int = 1):
+    """
+    Replay the cell-by-cell drawing of animate_drawing on a packed canvas.
+
+    Every frame adds the next cells in the order of draw_steps and yields
+    only the bounding box of what they covered. Each pixel remembers the
+    layer that painted it, so a later fill never covers a border drawn
+    before it, and a shadow never covers a fill. Every frame therefore
+    equals raster.render of the cells drawn so far, and the last frame
+    equals raster.render of the whole grid. On screen, turtle paints
+    each fill over the inner half of the neighbors' borders instead.
+    Cells off the canvas add no frame.
+
+    Args:
+        centers: List of (x, y) tuples, or an (x, y) tuple of arrays.
+        colors: Fill colors for each hexagon, or an (indices, palette) tuple.
+        side (float): Side length of hexagons.
+        thickness_width (int): Border line thickness.
+        border_color (str): Border color.
+        shadow_intensity (int): Shadow offset; 0 for no shadow.
+        width (int): Image width in pixels.
+        height (int): Image height in pixels.
+        cells_per_frame (int): Cells added by every frame.
+
+    Yields:
+        tuple: (top, left, packed uint32 patch); the first frame is the
+        whole empty canvas.
+    """
+
+    canvas = np.full((height, width), pack(BACKGROUND), dtype=np.uint32)
+    layers = np.zeros((height, width), dtype=np.uint8)
+    yield 0, 0, canvas.copy()
+
+    points = center_points(centers)
+    indices, palette = palette_colors(colors)
+    count = min(len(points), len(indices))
+    anchor_rows = np.rint(height / 2 - points[:count, 1]).astype(np.intp)
+    anchor_cols = np.rint(width / 2 + points[:count, 0]).astype(np.intp)
+    fills = pack([to_rgb(c) for c in palette] or [BACKGROUND])[indices[:count]]
+    border = pack(to_rgb(color_map.get(border_color, 'black')))
+
+    fill = fill_stamp(side)
+    outline = outline_stamp(side, thickness_width)
+    shadow_outline = outline_stamp(side, 1)
+    extents = [_extent(fill), _extent(outline)]
+    if shadow_intensity > 0:
+        low_row, high_row, low_col, high_col = _extent(shadow_outline)
+        extents.append((low_row + shadow_intensity, high_row + shadow_intensity,
+                        low_col + shadow_intensity, high_col + shadow_intensity))
+    low_row, high_row, low_col, high_col = (f(e[i] for e in extents)
+                                            for i, f in enumerate((min, max, min, max)))
+
+    step = max(1, cells_per_frame)
+    for start in range(0, count, step):
+        rows, cols = anchor_rows[start:start + step], anchor_cols[start:start + step]
+        for i in range(start, start + len(rows)):
+            row, col = anchor_rows[i], anchor_cols[i]
+            if shadow_intensity > 0:
+                _paint(canvas, layers, row + shadow_intensity, col + shadow_intensity, fill,
+                       pack(SHADOW_COLOR), SHADOW_LAYER)
+                _paint(canvas, layers, row + shadow_intensity, col + shadow_intensity,
+                       shadow_outline, pack(OUTLINE_COLOR), SHADOW_OUTLINE_LAYER)
+            _paint(canvas, layers, row, col, fill, fills[i], FILL_LAYER)
+            _paint(canvas, layers, row, col, outline, border, BORDER_LAYER)
+
+        top = max(0, rows.min() + low_row)
+        bottom = min(height, rows.max() + high_row + 1)
+        left = max(0, cols.min() + low_col)
+        right = min(width, cols.max() + high_col + 1)
+        if top < bottom and left < right:
+            yield top, left, canvas[top:bottom, left:right].copy()
+
+
+def canvas_colors(colors, border_color: str, shadow_intensity: int) -> np.ndarray:
+    """
+    Every packed color record_frames may paint.
+
+    Args:
+        colors: Fill colors for each hexagon, or an (indices, palette) tuple.
+        border_color (str): Border color.
+        shadow_intensity (int): Shadow offset; 0 for no shadow.
+
+    Returns:
+        np.ndarray: Sorted unique packed colors.
+    """
+
+    _, palette = palette_colors(colors)
+    rgb = [BACKGROUND, to_rgb(color_map.get(border_color, 'black'))]
+    rgb += [to_rgb(c) for c in palette]
+    if shadow_intensity > 0:
+        rgb += [SHADOW_COLOR, OUTLINE_COLOR]
+    return np.unique(pack(rgb))
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I',
+                                                                    zlib.crc32(kind + data))
+
+
+def save_apng(path: str, width: int, height: int, frames, delay: float = FRAME_DELAY,
+              final_delay: float = FINAL_DELAY) -> None:
+    """
+    Write frames from record_frames as an animated PNG.
+
+    Every frame is stored as its own rectangle over the previous ones, so
+    the file grows with the changed pixels, not with the canvas. The
+    first frame is also the still image shown by viewers without APNG
+    support.
+
+    Args:
+        path (str): Output file path.
+        width (int): Image width.
+        height (int): Image height.
+        frames: Iterable of (top, left, packed patch) from record_frames.
+        delay (float): Seconds each frame is shown.
+        final_delay (float): Seconds the last frame is shown.
+    """
+
+    def control(sequence: int, top: int, left: int, patch: np.ndarray, shown: float) -> bytes:
+        rows, cols = patch.shape
+        return _chunk(b'fcTL', struct.pack('>IIIIIHHBB', sequence, cols, rows, left, top,
+                                           round(shown * 1000), 1000, 0, 0))
+
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        # The frame count is only known at the end; acTL is rewritten then.
+        animation = f.tell()
+        f.write(_chunk(b'acTL', struct.pack('>II', 0, 0)))
+
+        sequence = 0
+        count = 0
+        last = None
+        for top, left, patch in frames:
+            rows, cols = patch.shape
+            last = (f.tell(), sequence, top, left, patch)
+            f.write(control(sequence, top, left, patch, delay))
+            sequence += 1
+
+            raw = np.zeros((rows, cols * 3 + 1), dtype=np.uint8)
+            raw[:, 1:] = unpack(patch).reshape(rows, cols * 3)
+            data = zlib.compress(raw.tobytes(), 6)
+            if count == 0:
+                f.write(_chunk(b'IDAT', data))
+            else:
+                f.write(_chunk(b'fdAT', struct.pack('>I', sequence) + data))
+                sequence += 1
+            count += 1
+        f.write(_chunk(b'IEND', b''))
+
+        f.seek(animation)
+        f.write(_chunk(b'acTL', struct.pack('>II', count, 0)))
+        if last is not None:
+            offset, *frame = last
+            f.seek(offset)
+            f.write(control(*frame, final_delay))
+
+
+def _lzw(data: bytes, min_size: int) -> bytes:
+    """
+    GIF variant of LZW compression of palette indices.
+    """
+
+    clear = 1 << min_size
+    size = min_size + 1
+    table = {}
+    next_code = clear + 2
+    out = bytearray()
+    buffer, bits = clear, size
+
+    prefix = data[0]
+    for byte in data[1:]:
+        key = prefix << 8 | byte
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+
+        buffer |= prefix << bits
+        bits += size
+        while bits >= 8:
+            out.append(buffer & 0xff)
+            buffer >>= 8
+            bits -= 8
+
+        if next_code < GIF_MAX_CODE:
+            table[key] = next_code
+            if next_code == 1 << size:
+                size += 1
+            next_code += 1
+        else:
+            buffer |= clear << bits
+            bits += size
+            table.clear()
+            next_code = clear + 2
+            size = min_size + 1
+        prefix = byte
+
+    for code in (prefix, clear + 1):
+        buffer |= code << bits
+        bits += size
+    while bits > 0:
+        out.append(buffer & 0xff)
+        buffer >>= 8
+        bits -= 8
+    return bytes(out)
+
+
+def save_gif(path: str, width: int, height: int, frames, colors: np.ndarray,
+             delay: float = FRAME_DELAY, final_delay: float = FINAL_DELAY) -> None:
+    """
+    Write frames from record_frames as an animated GIF.
+
+    Args:
+        path (str): Output file path.
+        width (int): Image width.
+        height (int): Image height.
+        frames: Iterable of (top, left, packed patch) from record_frames.
+        colors (np.ndarray): Sorted packed colors of all frames, from
+            canvas_colors.
+        delay (float): Seconds each frame is shown.
+        final_delay (float): Seconds the last frame is shown.
+
+    Raises:
+        ValueError: If there are more than 256 colors.
+    """
+
+    if len(colors) > 256:
+        raise ValueError(f'{lcl.ERROR_GIF_COLORS}')
+    depth = max(1, (len(colors) - 1).bit_length())
+    table = np.zeros((1 << depth, 3), dtype=np.uint8)
+    table[:len(colors)] = unpack(colors)
+    min_size = max(2, depth)
+
+    def block(top: int, left: int, patch: np.ndarray, shown: float) -> bytes:
+        rows, cols = patch.shape
+        data = _lzw(np.searchsorted(colors, patch).astype(np.uint8).tobytes(), min_size)
+        blocks = b''.join(bytes([len(data[i:i + 255])]) + data[i:i + 255]
+                          for i in range(0, len(data), 255))
+        return (b'\x21\xf9\x04' + struct.pack('<BHB', 4, round(shown * 100), 0) + b'\x00'
+                + b'\x2c' + struct.pack('<HHHHB', left, top, cols, rows, 0)
+                + bytes([min_size]) + blocks + b'\x00')
+
+    with open(path, 'wb') as f:
+        f.write(b'GIF89a' + struct.pack('<HHBBB', width, height, 0xf0 | (depth - 1), 0, 0))
+        f.write(table.tobytes())
+        f.write(b'\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00')
+
+        # Hold one frame back to give the last one the final delay.
+        previous = None
+        for frame in frames:
+            if previous is not None:
+                f.write(block(*previous, delay))
+            previous = frame
+        if previous is not None:
+            f.write(block(*previous, final_delay))
+        f.write(b'\x3b')
+
+
+def record(path: str, centers, colors, side: float, thickness_width: int, border_color: str,
+           shadow_intensity: int, width: int = CANVAS_SIZE, height: int = CANVAS_SIZE,
+           cells_per_frame: int = 1, delay: float = FRAME_DELAY) -> None:
+    """
+    Headless recording of animate_drawing as an animated GIF or APNG.
+
+    The format follows the extension: .gif, otherwise APNG. Frames are
+    encoded as fast as they are computed, independent of the on-screen
+    frame rate.
+
+    Args:
+        path (str): Output file path.
+        centers: List of (x, y) tuples, or an (x, y) tuple of arrays.
+        colors: Fill colors for each hexagon, or an (indices, palette) tuple.
+        side (float): Side length of hexagons.
+        thickness_width (int): Border line thickness.
+        border_color (str): Border color.
+        shadow_intensity (int): Shadow offset; 0 for no shadow.
+        width (int): Image width in pixels.
+        height (int): Image height in pixels.
+        cells_per_frame (int): Cells added by every frame.
+        delay (float): Seconds each frame is shown.
+    """
+
+    frames = record_frames(centers, colors, side, thickness_width, border_color,
+                           shadow_intensity, width, height, cells_per_frame)
+    if path.lower().endswith('.gif'):
+        save_gif(path, width, height, frames,
+                 canvas_colors(colors, border_color, shadow_intensity), delay)
+    else:
+        save_apng(path, width, height, frames, delay)
@@ -0,0 +1,292 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+import local as lcl
+from settings import color_map, hex_color
+
+
+# Default cache directory; HEXGRID_CACHE overrides it.
+CACHE_DIR = os.environ.get('HEXGRID_CACHE') or os.path.join(os.path.expanduser('~'), '.cache',
+                                                           'hexgrid')
+# Total size of cached files kept after every store, in bytes.
+CACHE_LIMIT = 512 * 2 ** 20
+# Bump when the renderers change their output, so old entries stop matching.
+CACHE_VERSION = 1
+# A lock not refreshed for this long is left over from a crashed worker and may
+# be taken over; a worker refreshes its lock four times per period.
+LOCK_TIMEOUT = 600
+LOCK_POLL = 0.05
+
+# Job keys that change the rendered file.
+KEY_FIELDS = ('n', 'rows', 'colors', 'border_thickness', 'border_color', 'shadow', 'pattern',
+              'pattern_type', 'size', 'width', 'height', 'snap', 'frame_cells')
+# Output formats recorded as an animation, the only ones using frame_cells.
+ANIMATION_FORMATS = ('.gif', '.apng')
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(job: dict) -> str:
+    """
+    Stable hash of everything that decides the rendered file of a job.
+
+    Colors are compared by RGB value and sizes as floats, the pattern
+    orientation is ignored for the chequered pattern, frame_cells for
+    still images, and a mosaic image by its content, so jobs that render
+    the same file get the same key.
+
+    Args:
+        job (dict): Job returned by cli.normalize_job, with an output path.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+
+    params = {key: job[key] for key in KEY_FIELDS}
+    params['format'] = os.path.splitext(job['output'])[1].lower()
+    for key in ('size', 'width', 'height'):
+        params[key] = float(params[key])
+    if params['format'] not in ANIMATION_FORMATS:
+        del params['frame_cells']
+    params['colors'] = [hex_color(color) for color in job['colors']]
+    params['border_color'] = hex_color(color_map.get(job['border_color'], 'black'))
+    if job['pattern'] == f'{lcl.CHEQUERED}' or job['image']:
+        params['pattern_type'] = ''
+    if job['image']:
+        params['pattern'] = ''
+        params['colors'] = []
+        params['image'] = _file_digest(job['image'])
+    params['version'] = CACHE_VERSION
+
+    text = json.dumps(params, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _copy_atomic(source: str, target: str) -> None:
+    """
+    Copy a file so that readers of target never see a partial file.
+    """
+
+    folder = os.path.dirname(os.path.abspath(target))
+    temp = os.path.join(folder, f'.{os.path.basename(target)}.{uuid.uuid4().hex}.tmp')
+    try:
+        shutil.copyfile(source, temp)
+        os.replace(temp, target)
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def _read_token(path: str) -> str:
+    try:
+        with open(path, encoding='ascii') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _unlock(path: str, token: str) -> None:
+    """
+    Remove a lock file only if it still holds the given token.
+
+    A stale lock may have been taken over, and the new holder's lock must
+    survive the release of the old one.
+    """
+
+    if _read_token(path) != token:
+        return
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _create_lock(path: str, token: str) -> bool:
+    # Linking a complete temporary file never shows a lock without its token.
+    temp = f'{path}.{token}.tmp'
+    with open(temp, 'w', encoding='ascii') as f:
+        f.write(token)
+    try:
+        os.link(temp, path)
+        return True
+    except FileExistsError:
+        return False
+    finally:
+        os.remove(temp)
+
+
+def _break_stale(path: str) -> None:
+    """
+    Remove a lock whose holder stopped refreshing it.
+
+    The token is read before the age is checked, and the file is renamed
+    away before it is deleted; if the renamed file turns out to be a
+    fresher lock, it is put back.
+    """
+
+    token = _read_token(path)
+    try:
+        if token is None or time.time() - os.path.getmtime(path) <= LOCK_TIMEOUT:
+            return
+        moved = f'{path}.{uuid.uuid4().hex}.tmp'
+        os.rename(path, moved)
+    except FileNotFoundError:
+        return
+    try:
+        if _read_token(moved) != token:
+            try:
+                os.link(moved, path)
+            except FileExistsError:
+                pass
+    finally:
+        os.remove(moved)
+
+
+def _lock(path: str) -> str:
+    """
+    Try to take the lock file of a cache entry.
+
+    The lock file holds a token unique to the taker, so only its holder
+    releases it. A lock not refreshed for LOCK_TIMEOUT is left over from
+    a crashed worker and removed, so that a later try can take it. The
+    lock only saves duplicate renders; entries are correct without it,
+    since they are stored by an atomic rename.
+
+    Returns:
+        str: Token of the lock now held by this process, or None.
+    """
+
+    token = uuid.uuid4().hex
+    if _create_lock(path, token):
+        return token
+    _break_stale(path)
+    return None
+
+
+def _keep_alive(path: str, token: str, done: threading.Event) -> None:
+    """
+    Refresh the age of a held lock until done is set.
+    """
+
+    while not done.wait(LOCK_TIMEOUT / 4):
+        if _read_token(path) != token:
+            return
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return
+
+
+def evict(cache_dir: str, limit: int = CACHE_LIMIT) -> int:
+    """
+    Delete the least recently used entries until the cache fits its limit.
+
+    Entries are touched on every hit, so their modification time is the
+    time of last use.
+
+    Args:
+        cache_dir (str): Cache directory.
+        limit (int): Allowed total size in bytes.
+
+    Returns:
+        int: Number of entries deleted.
+    """
+
+    entries = []
+    for folder, _, names in os.walk(cache_dir):
+        for name in names:
+            if name.endswith('.lock') or '.tmp' in name:
+                continue
+            path = os.path.join(folder, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    deleted = 0
+    for _, size, path in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        deleted += 1
+    return deleted
+
+
+def cached_render(job: dict, render, cache_dir: str = None, limit: int = CACHE_LIMIT) -> str:
+    """
+    Write the output of a job from the cache, rendering it only on a miss.
+
+    Entries are content-addressed by cache_key. A miss is rendered into a
+    temporary file and renamed into place, so the cache never holds a
+    partial file. A lock file per key makes concurrent workers asking
+    for the same key wait for the first one instead of rendering again.
+
+    Args:
+        job (dict): Job returned by cli.normalize_job, with an output path.
+        render: Called as render(job) to write job['output'].
+        cache_dir (str): Cache directory; defaults to CACHE_DIR.
+        limit (int): Total size of the cache in bytes kept after a store.
+
+    Returns:
+        str: Path of the written output.
+    """
+
+    cache_dir = cache_dir or CACHE_DIR
+    key = cache_key(job)
+    extension = os.path.splitext(job['output'])[1].lower()
+    folder = os.path.join(cache_dir, key[:2])
+    entry = os.path.join(folder, key + extension)
+    lock = os.path.join(folder, key + '.lock')
+    os.makedirs(folder, exist_ok=True)
+
+    while True:
+        if os.path.exists(entry):
+            try:
+                os.utime(entry)
+                _copy_atomic(entry, job['output'])
+                return job['output']
+            except FileNotFoundError:
+                # Evicted by another worker between the check and the copy.
+                continue
+        token = _lock(lock)
+        if token is not None:
+            break
+        time.sleep(LOCK_POLL)
+
+    # Keep the lock fresh so a long render is not taken for a crashed one.
+    done = threading.Event()
+    threading.Thread(target=_keep_alive, args=(lock, token, done), daemon=True).start()
+    try:
+        # Another worker may have stored it just before the lock was released.
+        if not os.path.exists(entry):
+            temp = os.path.join(folder, f'{key}.{uuid.uuid4().hex}.tmp{extension}')
+            try:
+                render(dict(job, output=temp))
+                os.replace(temp, entry)
+            finally:
+                if os.path.exists(temp):
+                    os.remove(temp)
+        _copy_atomic(entry, job['output'])
+    finally:
+        done.set()
+        _unlock(lock, token)
+
+    evict(cache_dir, limit)
+    return job['output']
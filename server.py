@@ -0,0 +1,401 @@
+import argparse
+import asyncio
+import collections
+import functools
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import cli
+import local as lcl
+import render_cache
+
+
+HOST = '127.0.0.1'
+PORT = 8765
+# Renders queued or running at once; further new jobs are answered 503.
+MAX_PENDING = 32
+# Largest grid and picture a request may ask for.
+MAX_CELLS = 10 ** 6
+MAX_PIXELS = 8192 * 8192
+MAX_BODY = 64 * 2 ** 10
+CHUNK_SIZE = 64 * 2 ** 10
+# Recent requests kept for the latency percentiles.
+LATENCY_WINDOW = 1000
+
+CONTENT_TYPES = {
+    'png': ('image/png', None),
+    'svg': ('image/svg+xml', None),
+    'svgz': ('image/svg+xml', 'gzip'),
+    'pdf': ('application/pdf', None),
+    'gif': ('image/gif', None),
+    'apng': ('image/apng', None),
+}
+
+# Job keys a request may set; the output path belongs to the service, and
+# image files and levels of detail only make sense on the local machine.
+REQUEST_FIELDS = set(cli.DEFAULT_JOB) - {'output', 'image', 'lod'}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str = None):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+def _percentiles(values) -> dict:
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {'p50': pick(0.5), 'p95': pick(0.95), 'p99': pick(0.99), 'max': ordered[-1] * 1000}
+
+
+def request_job(query: str, body: bytes = b'') -> dict:
+    """
+    Render job of a request: query parameters, or a JSON object in the body.
+
+    Numbers may come as strings and are converted here; in a query the two
+    colors are given as 'colors=red,blue'. 'format' picks png, svg, svgz,
+    pdf, or a gif or apng recording of the drawing.
+
+    Args:
+        query (str): URL query string.
+        body (bytes): Request body.
+
+    Returns:
+        dict: Job returned by cli.normalize_job, with 'format' and no output.
+
+    Raises:
+        ValueError: If a parameter is invalid or the picture is too large.
+    """
+
+    if body:
+        job = json.loads(body)
+        if not isinstance(job, dict):
+            raise ValueError(f'{lcl.ERROR_UNKNOWN_OPTION}{body[:80]!r}')
+    else:
+        job = {key: values[-1] for key, values in parse_qs(query).items()}
+        if 'colors' in job:
+            job['colors'] = job['colors'].split(',')
+    for key, kind in (('n', int), ('rows', int), ('size', float), ('width', int),
+                      ('height', int), ('frame_cells', int)):
+        if job.get(key) is not None:
+            job[key] = kind(job[key])
+
+    fmt = str(job.pop('format', 'png')).lower()
+    if fmt not in CONTENT_TYPES:
+        raise ValueError(f'{lcl.ERROR_UNKNOWN_OPTION}format: {fmt}')
+    unknown = set(job) - REQUEST_FIELDS
+    if unknown:
+        raise ValueError(f'{lcl.ERROR_UNKNOWN_OPTION}{", ".join(sorted(unknown))}')
+
+    job = cli.normalize_job(job)
+    if (job['n'] * job['rows'] > MAX_CELLS or job['width'] * job['height'] > MAX_PIXELS
+            or min(job['width'], job['height'], job['size']) <= 0):
+        raise ValueError(f'{lcl.ERROR_TOO_LARGE}')
+    job['format'] = fmt
+    return job
+
+
+class Metrics:
+    """
+    Request counters, latencies and render throughput of the service.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.counts = collections.Counter()
+        self.bytes_sent = 0
+        self.latency = collections.deque(maxlen=LATENCY_WINDOW)
+        self.render_time = collections.deque(maxlen=LATENCY_WINDOW)
+
+    def snapshot(self, pending: int, in_flight: int) -> dict:
+        """
+        Current statistics.
+
+        Args:
+            pending (int): Renders queued or running.
+            in_flight (int): Distinct jobs being rendered.
+
+        Returns:
+            dict: JSON-serializable statistics; times in milliseconds.
+        """
+
+        uptime = time.monotonic() - self.started
+        return {
+            'uptime_seconds': uptime,
+            'pending': pending,
+            'in_flight': in_flight,
+            **self.counts,
+            'bytes_sent': self.bytes_sent,
+            'renders_per_sec': self.counts['renders'] / uptime if uptime else 0.0,
+            'latency_ms': _percentiles(self.latency),
+            'render_ms': _percentiles(self.render_time),
+        }
+
+
+class _Flight:
+    """
+    One render in progress and the requests waiting for its file.
+    """
+
+    def __init__(self, future: asyncio.Future, path: str):
+        self.future = future
+        self.path = path
+        self.waiters = 0
+
+
+class RenderService:
+    """
+    HTTP front end queueing render jobs to a pool of headless renderers.
+
+    Identical jobs, compared by render_cache.cache_key, that arrive while
+    one of them is rendering share its render. New jobs beyond
+    max_pending are refused with 503 and Retry-After instead of growing
+    the queue, and responses are written no faster than clients read them.
+
+    Endpoints:
+        GET /render?n=..&colors=a,b&...  or  POST /render with a JSON job
+        GET /metrics
+    """
+
+    def __init__(self, workers: int = None, max_pending: int = MAX_PENDING,
+                 cache_dir: str = None, cache_limit: int = render_cache.CACHE_LIMIT):
+        """
+        Args:
+            workers (int): Renderer processes; defaults to the CPU count.
+            max_pending (int): Renders queued or running at once.
+            cache_dir (str): Keep renders in a render_cache in this
+                directory; None renders every new job.
+            cache_limit (int): Size of the cache in bytes.
+        """
+
+        # Forked workers would inherit the listening and client sockets and
+        # keep connections open after the service closes them, so start the
+        # renderers from a clean forkserver process instead.
+        self.executor = ProcessPoolExecutor(max_workers=workers,
+                                            mp_context=multiprocessing.get_context('forkserver'))
+        self.max_pending = max_pending
+        self.render = functools.partial(cli.render_job, cache_dir=cache_dir,
+                                        cache_limit=cache_limit)
+        self.folder = tempfile.mkdtemp(prefix='hexgrid-')
+        self.flights = {}
+        self.pending = 0
+        self.metrics = Metrics()
+        # Connections whose response status line is already written.
+        self.responding = set()
+
+    def close(self) -> None:
+        """
+        Stop the renderers and delete the temporary files.
+        """
+
+        self.executor.shutdown(cancel_futures=True)
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    async def _run(self, job: dict) -> str:
+        start = time.perf_counter()
+        try:
+            path = await asyncio.get_running_loop().run_in_executor(self.executor, self.render,
+                                                                    job)
+        finally:
+            self.pending -= 1
+        self.metrics.render_time.append(time.perf_counter() - start)
+        self.metrics.counts['renders'] += 1
+        return path
+
+    def _join(self, job: dict) -> _Flight:
+        """
+        Flight rendering a job: a running one for the same key, or a new one.
+
+        Raises:
+            HTTPError: 503 if max_pending renders are already queued.
+        """
+
+        job = dict(job, output=os.path.join(self.folder, f"{uuid.uuid4().hex}.{job['format']}"))
+        del job['format']
+        key = render_cache.cache_key(job)
+
+        flight = self.flights.get(key)
+        if flight is not None:
+            self.metrics.counts['coalesced'] += 1
+        else:
+            if self.pending >= self.max_pending:
+                self.metrics.counts['rejected'] += 1
+                raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, f'{lcl.ERROR_BUSY}')
+            self.pending += 1
+            flight = _Flight(asyncio.ensure_future(self._run(job)), job['output'])
+            self.flights[key] = flight
+
+            def landed(_):
+                del self.flights[key]
+                self._release(flight)
+
+            flight.future.add_done_callback(landed)
+
+        flight.waiters += 1
+        return flight
+
+    def _release(self, flight: _Flight) -> None:
+        # Later requests for the same job start a new flight, so the file can
+        # go once the render is over and every waiter has sent or dropped it.
+        if flight.future.done() and not flight.waiters and os.path.exists(flight.path):
+            os.remove(flight.path)
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: HTTPStatus,
+                       headers: dict, body: bytes = b'') -> None:
+        self.responding.add(writer)
+        head = [f'HTTP/1.1 {status.value} {status.phrase}', 'Connection: close']
+        head += [f'{name}: {value}' for name, value in headers.items()]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+        self.metrics.bytes_sent += len(body)
+
+    async def _respond_json(self, writer: asyncio.StreamWriter, status: HTTPStatus,
+                            data: dict) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        headers = {'Content-Type': 'application/json; charset=utf-8',
+                   'Content-Length': len(body)}
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            headers['Retry-After'] = 1
+        await self._respond(writer, status, headers, body)
+
+    async def _send_file(self, writer: asyncio.StreamWriter, path: str, fmt: str) -> None:
+        content_type, encoding = CONTENT_TYPES[fmt]
+        headers = {'Content-Type': content_type, 'Content-Length': os.path.getsize(path)}
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        with open(path, 'rb') as f:
+            await self._respond(writer, HTTPStatus.OK, headers)
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                writer.write(chunk)
+                await writer.drain()
+                self.metrics.bytes_sent += len(chunk)
+
+    async def _render(self, writer: asyncio.StreamWriter, query: str, body: bytes) -> None:
+        try:
+            job = request_job(query, body)
+            flight = self._join(job)
+        except (ValueError, TypeError, OverflowError) as error:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(error))
+
+        try:
+            # Shielded: a client that hangs up must not cancel a render others wait for.
+            path = await asyncio.shield(flight.future)
+            await self._send_file(writer, path, job['format'])
+        finally:
+            flight.waiters -= 1
+            self._release(flight)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serve one HTTP/1.1 request and close the connection.
+        """
+
+        start = time.perf_counter()
+        self.metrics.counts['requests'] += 1
+        try:
+            try:
+                method, target, _ = (await reader.readline()).decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = (await reader.readline()).decode('latin-1').strip()
+                    if not line:
+                        break
+                    name, _, value = line.partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST)
+            if length > MAX_BODY:
+                raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+            body = await reader.readexactly(length) if length else b''
+
+            url = urlsplit(target)
+            if url.path == '/metrics' and method == 'GET':
+                await self._respond_json(writer, HTTPStatus.OK, self.metrics.snapshot(
+                    self.pending, len(self.flights)))
+            elif url.path == '/render' and method in ('GET', 'POST'):
+                await self._render(writer, url.query, body)
+            elif url.path in ('/metrics', '/render'):
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+            else:
+                raise HTTPError(HTTPStatus.NOT_FOUND)
+            self.metrics.latency.append(time.perf_counter() - start)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            self.metrics.counts['disconnected'] += 1
+        except Exception as error:
+            self.metrics.counts['errors'] += 1
+            # Once a response has started the only way to report an error is
+            # to cut the connection short of its Content-Length.
+            if writer not in self.responding:
+                status = getattr(error, 'status', HTTPStatus.INTERNAL_SERVER_ERROR)
+                try:
+                    await self._respond_json(writer, status, {'error': str(error)})
+                except ConnectionError:
+                    pass
+        finally:
+            self.responding.discard(writer)
+            writer.close()
+
+
+async def serve(host: str = HOST, port: int = PORT, **options) -> None:
+    """
+    Run a RenderService until cancelled.
+
+    Args:
+        host (str): Address to listen on.
+        port (int): Port to listen on.
+        **options: Arguments of RenderService.
+    """
+
+    service = RenderService(**options)
+    try:
+        server = await asyncio.start_server(service.handle, host, port)
+        print(f'{lcl.SERVER_LISTENING}http://{host}:{port}/render')
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv: list = None) -> None:
+    """
+    Entry point: start the render service from command line options.
+
+    Args:
+        argv (list): Arguments without the program name; defaults to sys.argv.
+    """
+
+    parser = argparse.ArgumentParser(description=f'{lcl.SERVER_DESCRIPTION}')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('-j', '--workers', type=int, help=f'{lcl.CLI_WORKERS}')
+    parser.add_argument('--max-pending', type=int, default=MAX_PENDING,
+                        help=f'{lcl.SERVER_MAX_PENDING}')
+    parser.add_argument('--cache', nargs='?', const=render_cache.CACHE_DIR, metavar='DIR',
+                        help=f'{lcl.CLI_CACHE}')
+    parser.add_argument('--cache-limit', type=float, metavar='MB', help=f'{lcl.CLI_CACHE_LIMIT}')
+    args = parser.parse_args(argv)
+
+    cache_limit = int(args.cache_limit * 2 ** 20) if args.cache_limit else \
+        render_cache.CACHE_LIMIT
+    try:
+        asyncio.run(serve(args.host, args.port, workers=args.workers,
+                          max_pending=args.max_pending, cache_dir=args.cache,
+                          cache_limit=cache_limit))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,218 @@
+import functools
+
+import local as lcl
+from lazy import lazy_import
+
+webcolors = lazy_import('webcolors')
+
+
+available_colors_1 = [
+    ('\U0001F48B' f'{lcl.RED}', 'red'),
+    ('\U0001F499' f'{lcl.BLUE}', 'blue'),
+    ('\U0001F49A' f'{lcl.GREEN}', 'green'),
+    ('\U0001F49B' f'{lcl.YELLOW}', 'yellow'),
+    ('\U0001F49C' f'{lcl.PURPLE}', 'purple'),
+    ('\U0001F4A6' f'{lcl.CYAN}', 'cyan')
+]
+available_colors_2 = [
+    ('\U0001F5A4' f'{lcl.BLACK}', 'black'),
+    ('\U0001F47D' f'{lcl.GRAY}', 'gray'),
+    ('\U0001F495' f'{lcl.PINK}', 'pink'),
+    ('\U0001F9E1' f'{lcl.ORANGE}', 'orange'),
+    ('\U0001F90E' f'{lcl.BROWN}', 'brown'),
+    ('\U0001F916' f'{lcl.YOUR_COLOUR_HEX_ENGLISH}', None)
+]
+
+thickness_options = {f'{lcl.THIN}': 1, f'{lcl.MEDIUM}': 3, f'{lcl.THICK}': 5}
+border_color_options = [f'{lcl.RED}'.lower(), f'{lcl.ORANGE}'.lower(), f'{lcl.YELLOW}'.lower(),
+                        f'{lcl.GREEN}'.lower(), f'{lcl.BLUE}'.lower(), f'{lcl.PURPLE}'.lower(),
+                        f'{lcl.PINK}'.lower(), f'{lcl.BLACK}'.lower(), f'{lcl.GRAY}'.lower(),
+                        f'{lcl.WHITE}'.lower()]
+shadow_options = {f'{lcl.NO}': 0, f'{lcl.FAINT}': 5, f'{lcl.MEDIUM}': 8, f'{lcl.STRONG}': 12}
+
+# On-screen side length in pixels below which a detail is simplified:
+# shadows are dropped, borders are stroked once per lattice edge, the
+# grid is stamped as a flat-colored image instead of turtle polygons, and
+# the shadow is one polygon under the whole grid instead of one per cell.
+lod_thresholds = {'shadow': 8, 'borders': 5, 'flat': 3, 'merged_shadow': 16}
+
+
+def level_of_detail(side: float, thresholds: dict = None) -> dict:
+    """
+    Choose what to draw for hexagons of a given on-screen size.
+
+    Args:
+        side (float): Side length of hexagons in pixels.
+        thresholds (dict): Overrides for lod_thresholds.
+
+    Returns:
+        dict: 'shadow' (draw shadows), 'shared_borders' (merge borders),
+        'flat' (stamp a flat-colored image) and 'merged_shadow' (one shadow
+        for the whole grid) flags.
+    """
+
+    limits = dict(lod_thresholds, **(thresholds or {}))
+    return {
+        'shadow': side >= limits['shadow'],
+        'shared_borders': side < limits['borders'],
+        'flat': side < limits['flat'],
+        'merged_shadow': side < limits['merged_shadow'],
+    }
+
+
+def describe_detail(side: float, level: dict) -> str:
+    """
+    Human-readable report of a level_of_detail decision.
+
+    Args:
+        side (float): Side length of hexagons in pixels.
+        level (dict): Result of level_of_detail.
+
+    Returns:
+        str: Localized one-line report.
+    """
+
+    notes = []
+    if not level['shadow']:
+        notes.append(f'{lcl.LOD_NO_SHADOW}')
+    elif level['merged_shadow']:
+        notes.append(f'{lcl.LOD_MERGED_SHADOW}')
+    if level['flat']:
+        notes.append(f'{lcl.LOD_FLAT}')
+    elif level['shared_borders']:
+        notes.append(f'{lcl.LOD_SHARED_BORDERS}')
+
+    return f'{lcl.LOD_SIDE}{side:.1f}: ' + (', '.join(notes) or f'{lcl.LOD_FULL}')
+
+
+# Tk resolves these names through the X11 table, which differs from CSS.
+TK_COLORS = {
+    'green': (0, 255, 0),
+    'gray': (190, 190, 190),
+    'grey': (190, 190, 190),
+    'purple': (160, 32, 240),
+    'maroon': (176, 48, 96),
+}
+# The rest of the predefined colors, so the app's own palette never needs
+# webcolors; it is only imported for other color names.
+BASIC_COLORS = {
+    'red': (255, 0, 0),
+    'orange': (255, 165, 0),
+    'yellow': (255, 255, 0),
+    'blue': (0, 0, 255),
+    'cyan': (0, 255, 255),
+    'pink': (255, 192, 203),
+    'brown': (165, 42, 42),
+    'black': (0, 0, 0),
+    'white': (255, 255, 255),
+}
+HEX_DIGITS = frozenset('0123456789abcdef')
+# Colors remembered by each color cache; arbitrary HEX input is unbounded.
+COLOR_CACHE_SIZE = 1024
+
+
+@functools.lru_cache(maxsize=COLOR_CACHE_SIZE)
+def to_rgb(color: str) -> tuple:
+    """
+    Resolve a color once into an RGB tuple.
+
+    Russian names of color_map, Tk and CSS color names and #rgb/#rrggbb
+    codes are accepted. Results are cached, so every renderer looks each
+    color up in the same table instead of parsing it again per cell.
+
+    Args:
+        color (str): Color name or HEX code.
+
+    Returns:
+        tuple: (r, g, b) integers in 0..255.
+
+    Raises:
+        ValueError: With a localized message if the color is invalid.
+    """
+
+    color = color.strip().lower()
+    color = color_map.get(color, color)
+    if color in TK_COLORS:
+        return TK_COLORS[color]
+    if color in BASIC_COLORS:
+        return BASIC_COLORS[color]
+    if color.startswith('#'):
+        digits = color[1:]
+        if len(digits) not in (3, 6) or not HEX_DIGITS.issuperset(digits):
+            raise ValueError(f'{lcl.ERROR_INVALID_HEX}')
+        if len(digits) == 3:
+            digits = ''.join(d * 2 for d in digits)
+        return int(digits[0:2], 16), int(digits[2:4], 16), int(digits[4:6], 16)
+    try:
+        rgb = webcolors.name_to_rgb(color)
+    except ValueError:
+        raise ValueError(f'{lcl.ERROR_UNKNOWN_COLOR}') from None
+    return rgb.red, rgb.green, rgb.blue
+
+
+@functools.lru_cache(maxsize=COLOR_CACHE_SIZE)
+def hex_color(color) -> str:
+    """
+    Canonical #rrggbb code of a color, for Tk canvas items and files.
+
+    Args:
+        color: Color accepted by to_rgb, or an (r, g, b) tuple.
+
+    Returns:
+        str: Lowercase HEX code.
+    """
+
+    return '#%02x%02x%02x' % (color if isinstance(color, tuple) else to_rgb(color))
+
+
+@functools.lru_cache(maxsize=COLOR_CACHE_SIZE)
+def turtle_rgb(color: str) -> tuple:
+    """
+    Color as a float RGB tuple for turtle's default color mode.
+
+    turtle formats tuples itself but asks Tk to check every color string,
+    so handing it these saves a Tk round trip per fillcolor and pencolor.
+
+    Args:
+        color (str): Color accepted by to_rgb.
+
+    Returns:
+        tuple: (r, g, b) floats in 0..1.
+    """
+
+    return tuple(c / 255 for c in to_rgb(color))
+
+
+def validate_color(color: str) -> str:
+    """
+    Check that a color is a HEX code or a known color name.
+
+    Args:
+        color (str): Color to check.
+
+    Returns:
+        str: The color, stripped and lowercased; Russian names of color_map
+        are translated for turtle.
+
+    Raises:
+        ValueError: With a localized message if the color is invalid.
+    """
+
+    color = color.strip().lower()
+    to_rgb(color)
+    return color_map.get(color, color)
+
+
+color_map = {
+    f'{lcl.RED}'.lower(): 'red',
+    f'{lcl.ORANGE}'.lower(): 'orange',
+    f'{lcl.YELLOW}'.lower(): 'yellow',
+    f'{lcl.GREEN}'.lower(): 'green',
+    f'{lcl.BLUE}'.lower(): 'blue',
+    f'{lcl.PURPLE}'.lower(): 'purple',
+    f'{lcl.PINK}'.lower(): 'pink',
+    f'{lcl.BLACK}'.lower(): 'black',
+    f'{lcl.GRAY}'.lower(): 'gray',
+    f'{lcl.WHITE}'.lower(): 'white',
+    f'{lcl.BROWN}'.lower(): 'brown'
+}
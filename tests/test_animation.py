@@ -0,0 +1,48 @@
+from unittest import mock
+
+import pytest
+
+import bench
+import main
+from geometry import calculate_hexagon_centers
+
+
+@pytest.fixture
+def screen():
+    stub = bench.HeadlessTurtle()
+    with mock.patch.object(main, 'turtle', stub), mock.patch('time.sleep'):
+        yield stub
+
+
+def start(n: int = 10) -> main.Animation:
+    centers, side = calculate_hexagon_centers(n, 500)
+    return main.animate_drawing(centers, ['red'] * len(centers), side, 1, 'black', 0)
+
+
+def test_toggle_keeps_one_timer(screen):
+    animation = start()
+    screen.timers.popleft()()
+    assert len(screen.timers) == 1
+
+    for _ in range(5):
+        animation.toggle()
+        animation.toggle()
+    assert not animation.paused
+    assert len(screen.timers) == 1
+
+
+def test_resume_after_pending_frame_ran(screen):
+    animation = start()
+    screen.timers.popleft()()
+    animation.pause()
+    # The pending frame sees the pause and stops the chain.
+    screen.timers.popleft()()
+    assert not screen.timers
+
+    animation.resume()
+    animation.toggle()
+    animation.toggle()
+    assert len(screen.timers) == 1
+
+    screen.run()
+    assert animation.finished and animation.drawn == animation.count
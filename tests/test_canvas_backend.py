@@ -0,0 +1,151 @@
+from unittest import mock
+
+import pytest
+
+import bench
+import main
+from canvas_backend import SHADOW_COLOR, CanvasGrid
+from geometry import calculate_hexagon_centers
+from grid_state import GridState
+from settings import hex_color
+
+
+class FakeCanvas:
+    """
+    Tk canvas stand-in that keeps the options and tags of every item.
+    """
+
+    def __init__(self):
+        self.items = {}
+        self.created = 0
+        self.configured = 0
+
+    def _create(self, coords, tags=(), **options):
+        self.created += 1
+        self.items[self.created] = dict(options, coords=coords, tags=tuple(tags))
+        return self.created
+
+    def create_polygon(self, coords, **options):
+        return self._create(coords, **options)
+
+    def create_line(self, coords, **options):
+        return self._create(coords, **options)
+
+    def find_withtag(self, tag):
+        if isinstance(tag, int):
+            return (tag,) if tag in self.items else ()
+        return tuple(item for item, options in self.items.items() if tag in options['tags'])
+
+    def itemconfigure(self, tag, **options):
+        self.configured += 1
+        for item in self.find_withtag(tag):
+            self.items[item].update(options)
+
+    def delete(self, tag):
+        for item in self.find_withtag(tag):
+            del self.items[item]
+
+
+@pytest.fixture
+def screen():
+    stub = bench.HeadlessTurtle()
+    with mock.patch.object(main, 'turtle', stub):
+        yield stub
+
+
+def grid_of(n: int = 6, shadow: int = 3, colors: list = None) -> tuple:
+    centers, side = calculate_hexagon_centers(n, 300)
+    colors = colors or ['red'] * len(centers)
+    grid = CanvasGrid(FakeCanvas())
+    grid.draw(centers, colors, side, 1, 'black', shadow)
+    return grid, centers, side
+
+
+def fills(grid: CanvasGrid) -> list:
+    return [grid.canvas.items[item]['fill'] for item in grid.items]
+
+
+def states(grid: CanvasGrid) -> set:
+    return {grid.canvas.items[item].get('state', 'normal') for item in grid.shadows}
+
+
+def test_draw_creates_items_by_cell():
+    grid, centers, side = grid_of(4)
+
+    assert len(grid.items) == len(grid.shadows) == len(centers)
+    assert fills(grid) == [hex_color('red')] * len(centers)
+    assert {grid.canvas.items[item]['fill'] for item in grid.shadows} == {SHADOW_COLOR}
+    assert grid.shadow_intensity == 3
+
+
+def test_recolor_touches_only_changed_cells():
+    grid, centers, _ = grid_of(4)
+    colors = ['red'] * len(centers)
+    colors[2] = colors[9] = 'blue'
+
+    assert grid.recolor(colors) == 2
+    assert grid.canvas.configured == 2
+    assert fills(grid) == [hex_color(c) for c in colors]
+    assert grid.recolor(colors) == 0
+
+
+def test_show_shadow_hides_and_shows_items():
+    grid, _, _ = grid_of(4)
+
+    grid.show_shadow(False)
+    assert states(grid) == {'hidden'}
+    grid.show_shadow(True)
+    assert states(grid) == {'normal'}
+
+
+def test_clear_deletes_every_item():
+    grid, _, _ = grid_of(4)
+
+    grid.clear()
+    assert not grid.canvas.items and not grid.items and not grid.shadows
+    assert grid.shadow_intensity == 0
+
+
+def test_apply_state_recolors_changed_fills(screen):
+    grid, centers, side = grid_of()
+    old = GridState(['red'] * len(centers), 1, 'black', 3)
+    new = GridState(['blue'] * 5 + ['#ff0000'] * (len(centers) - 5), 1, 'black', 3)
+    created = grid.canvas.created
+
+    assert main.apply_state(old, new, centers, side, grid=grid) == 5
+    assert grid.canvas.created == created
+    assert fills(grid)[:6] == [hex_color('blue')] * 5 + [hex_color('red')]
+
+
+def test_apply_state_changes_border_in_one_call(screen):
+    grid, centers, side = grid_of()
+    old = GridState(['red'] * len(centers), 1, 'black', 3)
+    new = GridState(['red'] * len(centers), 4, 'blue', 3)
+
+    assert main.apply_state(old, new, centers, side, grid=grid) == len(centers)
+    assert grid.canvas.configured == 1
+    assert {grid.canvas.items[item]['width'] for item in grid.items} == {4}
+
+
+def test_apply_state_toggles_shadow_without_redrawing(screen):
+    grid, centers, side = grid_of()
+    colors = ['red'] * len(centers)
+    created = grid.canvas.created
+
+    main.apply_state(GridState(colors, 1, 'black', 3), GridState(colors, 1, 'black', 0),
+                     centers, side, grid=grid)
+    assert states(grid) == {'hidden'}
+    main.apply_state(GridState(colors, 1, 'black', 0), GridState(colors, 1, 'black', 3),
+                     centers, side, grid=grid)
+    assert states(grid) == {'normal'}
+    assert grid.canvas.created == created
+
+
+def test_apply_state_draws_a_moved_shadow_again(screen):
+    grid, centers, side = grid_of(shadow=0)
+    colors = ['red'] * len(centers)
+
+    count = main.apply_state(GridState(colors, 1, 'black', 0), GridState(colors, 1, 'black', 5),
+                             centers, side, drawn=10, grid=grid)
+    assert count == len(grid.items) == len(grid.shadows) == 10
+    assert grid.shadow_intensity == 5
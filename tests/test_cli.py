@@ -0,0 +1,51 @@
+import pytest
+
+import cli
+import local as lcl
+
+
+@pytest.mark.parametrize('value, expected', [
+    (True, True), (False, False), (1, True), (0, False),
+    ('true', True), ('False', False), ('yes', True), ('no', False), (' 1 ', True), ('0', False),
+])
+def test_flags(value, expected):
+    job = cli.normalize_job({'snap': value, 'tiled': value})
+
+    assert job['snap'] is expected
+    assert job['tiled'] is expected
+
+
+@pytest.mark.parametrize('key', ['snap', 'tiled'])
+@pytest.mark.parametrize('value', ['maybe', '2', '', 'on'])
+def test_flag_rejects_unknown(key, value):
+    with pytest.raises(ValueError):
+        cli.normalize_job({key: value})
+
+
+def test_tiled_defaults_to_automatic():
+    assert cli.normalize_job({})['tiled'] is None
+
+
+@pytest.mark.parametrize('key, value, expected', [
+    ('border_thickness', f'{lcl.THICK}', 5), ('border_thickness', 3, 3),
+    ('shadow', '12', 12), ('shadow', f'{lcl.NO}', 0),
+])
+def test_choices(key, value, expected):
+    assert cli.normalize_job({key: value})[key] == expected
+
+
+@pytest.mark.parametrize('key, value', [
+    ('border_thickness', 7), ('border_thickness', '2'), ('shadow', 4), ('shadow', True),
+    ('shadow', 'strong'),
+])
+def test_choices_reject_other_values(key, value):
+    with pytest.raises(ValueError):
+        cli.normalize_job({key: value})
+
+
+@pytest.mark.parametrize('key, value', [
+    ('n', 0), ('rows', 0), ('size', 0), ('size', 'nan'), ('width', -1), ('height', 0),
+])
+def test_numbers_must_be_positive(key, value):
+    with pytest.raises(ValueError):
+        cli.normalize_job({key: value})
@@ -0,0 +1,148 @@
+import math
+from unittest import mock
+
+import numpy as np
+import pytest
+
+import bench
+import main
+from geometry import (calculate_hexagon_centers, cell_at, cell_indices,
+                      hexagon_center_arrays, hexagon_vertices)
+
+
+def polygons(rows: int, cols: int, size: float) -> np.ndarray:
+    x, y, side = hexagon_center_arrays(rows, cols, size)
+    return hexagon_vertices(side)[None] + np.stack([x, y], axis=1)[:, None]
+
+
+def containing(points: np.ndarray, cells: np.ndarray, tolerance: float) -> list:
+    """
+    Brute-force point-in-polygon: the cells whose hexagon holds each point.
+
+    The vertices run clockwise, so a point is inside when it lies to the
+    right of every edge; tolerance > 0 includes the edges themselves.
+    """
+
+    start = cells
+    edge = np.roll(cells, -1, axis=1) - start
+    offset = points[:, None, None] - start[None]
+    cross = edge[None, ..., 0] * offset[..., 1] - edge[None, ..., 1] * offset[..., 0]
+    inside = (cross <= tolerance).all(axis=2)
+    return [set(np.flatnonzero(row).tolist()) for row in inside]
+
+
+@pytest.mark.parametrize('rows, cols, size', [(1, 1, 100), (5, 5, 500), (4, 9, 333), (8, 3, 640)])
+def test_cell_indices_match_brute_force(rows, cols, size):
+    rng = np.random.default_rng(rows * 100 + cols)
+    cells = polygons(rows, cols, size)
+    low, high = cells.reshape(-1, 2).min(axis=0), cells.reshape(-1, 2).max(axis=0)
+    margin = (high - low) * 0.2
+
+    points = rng.uniform(low - margin, high + margin, size=(2000, 2))
+    found = cell_indices(points[:, 0], points[:, 1], rows, cols, size)
+    strict = containing(points, cells, -1e-9)
+    closed = containing(points, cells, 1e-9)
+
+    # Only points clearly inside one hexagon or clearly outside all of them;
+    # the edges are checked separately.
+    for index, hits, near in zip(found.tolist(), strict, closed):
+        if hits == near:
+            assert index == (hits.pop() if hits else -1)
+    assert (found >= 0).any() and (found < 0).any()
+
+
+@pytest.mark.parametrize('rows, cols, size', [(5, 5, 500), (4, 9, 333)])
+def test_cell_indices_on_edges(rows, cols, size):
+    rng = np.random.default_rng(cols)
+    cells = polygons(rows, cols, size)
+
+    cell = rng.integers(len(cells), size=1000)
+    corner = rng.integers(6, size=1000)
+    t = rng.uniform(0, 1, size=(1000, 1))
+    t[:60] = 0
+    start = cells[cell, corner]
+    points = start + t * (cells[cell, (corner + 1) % 6] - start)
+
+    found = cell_indices(points[:, 0], points[:, 1], rows, cols, size)
+    hits = containing(points, cells, 1e-6)
+    for index, vertex, cells_hit in zip(found.tolist(), t[:, 0] == 0, hits):
+        if index != -1:
+            assert index in cells_hit
+        else:
+            # Only the outline may round outside: an edge shared by two
+            # cells, or a vertex shared by three, always belongs to one.
+            assert len(cells_hit) < (3 if vertex else 2)
+
+
+def test_cell_at_returns_row_and_col():
+    rows, cols, size = 4, 6, 300
+    x, y, side = hexagon_center_arrays(rows, cols, size)
+    middle = (math.sqrt(3) / 2 * side, -side)
+
+    for index in range(rows * cols):
+        assert cell_at(x[index] + middle[0], y[index] + middle[1], rows, cols, size) \
+            == divmod(index, cols)
+    assert cell_at(x[0] - side, y[0] + side, rows, cols, size) is None
+
+
+class FakeGrid:
+    def __init__(self):
+        self.calls = []
+
+    def set_color(self, i, color):
+        self.calls.append((i, color))
+
+
+@pytest.fixture
+def screen():
+    stub = bench.HeadlessTurtle()
+    with mock.patch.object(main, 'turtle', stub):
+        yield stub
+
+
+def click(n: int, size: float, centers: list, side: float, i: int) -> tuple:
+    x, y = centers[i]
+    return x + math.sqrt(3) / 2 * side, y - side
+
+
+def test_recolor_at_cycles_clicked_cell(screen):
+    n, size = 5, 500
+    centers, side = calculate_hexagon_centers(n, size)
+    colors = ['red'] * len(centers)
+    choices = ['red', 'blue', 'green']
+
+    for expected in ['blue', 'green', 'red']:
+        i = main.recolor_at(*click(n, size, centers, side, 7), n, size, centers, colors,
+                            choices, side, 1, 'black')
+        assert i == 7 and colors[7] == expected
+    assert colors.count('red') == len(colors)
+
+    colors[3] = 'pink'
+    assert main.recolor_at(*click(n, size, centers, side, 3), n, size, centers, colors,
+                           choices, side, 1, 'black') == 3
+    assert colors[3] == 'red'
+
+
+def test_recolor_at_misses(screen):
+    n, size = 5, 500
+    centers, side = calculate_hexagon_centers(n, size)
+    colors = ['red'] * len(centers)
+    x, y = centers[0]
+
+    assert main.recolor_at(x - side, y + side, n, size, centers, colors,
+                           ['blue'], side, 1, 'black') is None
+    # Cells the animation has not drawn yet stay untouched.
+    assert main.recolor_at(*click(n, size, centers, side, 12), n, size, centers, colors,
+                           ['blue'], side, 1, 'black', drawn=10) is None
+    assert colors == ['red'] * len(centers)
+
+
+def test_recolor_at_updates_canvas_item(screen):
+    n, size = 5, 500
+    centers, side = calculate_hexagon_centers(n, size)
+    colors = ['red'] * len(centers)
+    grid = FakeGrid()
+
+    assert main.recolor_at(*click(n, size, centers, side, 18), n, size, centers, colors,
+                           ['red', 'blue'], side, 1, 'black', grid=grid) == 18
+    assert grid.calls == [(18, 'blue')]
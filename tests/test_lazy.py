@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from lazy import MissingModule, lazy_import
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter where tkinter and webcolors cannot be found.
+HEADLESS = textwrap.dedent('''
+    import sys
+
+    class Hidden:
+        def find_spec(self, name, path=None, target=None):
+            if name.split('.')[0] in ('tkinter', '_tkinter', 'webcolors'):
+                raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+
+    sys.meta_path.insert(0, Hidden())
+    for name in list(sys.modules):
+        if name.split('.')[0] in ('tkinter', '_tkinter', 'webcolors', 'turtle'):
+            del sys.modules[name]
+
+    import cli, geometry, patterns, server
+
+    job = cli.normalize_job({'n': 4, 'width': 64, 'height': 64, 'output': sys.argv[1]})
+    cli.render_job(job)
+    for module, name in ((cli.main.turtle, 'forward'), (cli.settings.webcolors, 'name_to_rgb')):
+        try:
+            getattr(module, name)
+        except ImportError as error:
+            print(error.name)
+''')
+
+
+def test_missing_module_raises_on_use():
+    module = lazy_import('no_such_module_here')
+
+    assert isinstance(module, MissingModule)
+    assert not hasattr(module, '__file__')
+    with pytest.raises(ImportError):
+        module.anything
+
+
+def test_headless_modules_import_without_tk(tmp_path):
+    output = tmp_path / 'grid.png'
+
+    result = subprocess.run([sys.executable, '-c', HEADLESS, str(output)], cwd=ROOT,
+                            capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ['tkinter', 'webcolors']
+    assert output.read_bytes().startswith(b'\x89PNG')
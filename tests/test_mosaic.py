@@ -0,0 +1,93 @@
+import struct
+import zlib
+
+import numpy as np
+import pytest
+
+import mosaic
+
+
+def paeth(a: int, b: int, c: int) -> int:
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+
+def filter_row(kind: int, row: bytes, previous: bytes, bpp: int) -> bytes:
+    """
+    Apply one PNG filter type to a row, the reference way, byte by byte.
+    """
+
+    out = bytearray()
+    for i, x in enumerate(row):
+        a = row[i - bpp] if i >= bpp else 0
+        b = previous[i]
+        c = previous[i - bpp] if i >= bpp else 0
+        predictor = (0, a, b, (a + b) // 2, paeth(a, b, c))[kind]
+        out.append((x - predictor) % 256)
+    return bytes([kind]) + bytes(out)
+
+
+def encode_png(pixels: np.ndarray, color_type: int, filters: list,
+               palette: np.ndarray = None) -> bytes:
+    height, width, channels = pixels.shape
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (struct.pack('>I', len(data)) + kind + data
+                + struct.pack('>I', zlib.crc32(kind + data)))
+
+    previous = bytes(width * channels)
+    raw = b''
+    for y in range(height):
+        row = pixels[y].tobytes()
+        raw += filter_row(filters[y % len(filters)], row, previous, channels)
+        previous = row
+
+    data = b'\x89PNG\r\n\x1a\n'
+    data += chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0))
+    if palette is not None:
+        data += chunk(b'PLTE', palette.tobytes())
+    # Split IDAT to check that the chunks are joined before inflating.
+    compressed = zlib.compress(raw)
+    half = len(compressed) // 2
+    data += chunk(b'IDAT', compressed[:half]) + chunk(b'IDAT', compressed[half:])
+    return data + chunk(b'IEND', b'')
+
+
+@pytest.mark.parametrize('kind', [0, 1, 2, 3, 4])
+@pytest.mark.parametrize('color_type, channels', [(0, 1), (2, 3), (4, 2), (6, 4)])
+def test_read_png_filter(kind, color_type, channels):
+    pixels = np.random.default_rng(kind).integers(0, 256, (9, 13, channels), dtype=np.uint8)
+
+    decoded = mosaic._read_png(encode_png(pixels, color_type, [kind]))
+
+    np.testing.assert_array_equal(decoded, pixels)
+
+
+def test_read_png_mixed_filters():
+    pixels = np.random.default_rng(5).integers(0, 256, (20, 17, 3), dtype=np.uint8)
+
+    decoded = mosaic._read_png(encode_png(pixels, 2, [4, 0, 3, 1, 2, 4, 4]))
+
+    np.testing.assert_array_equal(decoded, pixels)
+
+
+def test_read_png_palette():
+    rng = np.random.default_rng(6)
+    palette = rng.integers(0, 256, (7, 3), dtype=np.uint8)
+    indices = rng.integers(0, 7, (11, 8, 1), dtype=np.uint8)
+
+    decoded = mosaic._read_png(encode_png(indices, 3, [0, 1, 2, 3, 4], palette))
+
+    np.testing.assert_array_equal(decoded, palette[indices[..., 0]])
+
+
+def test_read_png_rejects_16_bit():
+    data = encode_png(np.zeros((2, 2, 3), dtype=np.uint8), 2, [0])
+    ihdr = struct.pack('>IIBBBBB', 2, 2, 16, 2, 0, 0, 0)
+    data = data[:16] + ihdr + struct.pack('>I', zlib.crc32(b'IHDR' + ihdr)) + data[33:]
+
+    with pytest.raises(ValueError):
+        mosaic._read_png(data)
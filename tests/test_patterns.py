@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+import local as lcl
+from patterns import (alternation, cell_pattern, chess_pattern, pattern_colors,
+                      pattern_indices, pattern_palette, resolve_colors)
+
+
+def baseline_chess(N: int, color_first: str, color_second: str) -> list:
+    """
+    The list-of-strings chess_pattern that main.py shipped before patterns.py.
+    """
+
+    colors = []
+    if N % 2 == 0:
+        for i in range(N // 2):
+            for col in range(N):
+                colors.append(color_first)
+                colors.append(color_second)
+            for col in range(N):
+                colors.append(color_second)
+                colors.append(color_first)
+    else:
+        for i in range((N - 1) // 2):
+            for col in range(N):
+                colors.append(color_first)
+                colors.append(color_second)
+            for col in range(N):
+                colors.append(color_second)
+                colors.append(color_first)
+        for i in range(N):
+            color = color_first if i % 2 == 0 else color_second
+            colors.append(color)
+
+    return colors
+
+
+def baseline_alternation(N: int, pattern_type: str, color_first: str, color_second: str) -> list:
+    """
+    The list-of-strings alternation that main.py shipped before patterns.py.
+    """
+
+    colors = []
+
+    if pattern_type == f'{lcl.ROW_BY_ROW}':
+        for row in range(N):
+            color = color_first if row % 2 == 0 else color_second
+            for _ in range(N):
+                colors.append(color)
+    else:
+        for row in range(N):
+            for col in range(N):
+                color = color_first if col % 2 == 0 else color_second
+                colors.append(color)
+
+    return colors
+
+
+SIZES = [1, 2, 3, 4, 7, 10]
+ORIENTATIONS = [f'{lcl.ROW_BY_ROW}', f'{lcl.COLUMN_WISE}']
+
+
+@pytest.mark.parametrize('n', SIZES)
+@pytest.mark.parametrize('pattern_type', ORIENTATIONS)
+def test_alternation_matches_baseline(n, pattern_type):
+    expected = baseline_alternation(n, pattern_type, 'red', 'blue')
+    indices = pattern_indices(n, n, f'{lcl.ALTERNATING_COLORS}', pattern_type)
+
+    assert resolve_colors(indices, pattern_palette('red', 'blue')) == expected
+    assert alternation(n, pattern_type, 'red', 'blue') == expected
+    assert pattern_colors(n, 'red', 'blue', f'{lcl.ALTERNATING_COLORS}', pattern_type) == expected
+
+
+@pytest.mark.parametrize('n', SIZES)
+@pytest.mark.parametrize('pattern_type', ORIENTATIONS + [''])
+def test_chess_is_a_checkerboard(n, pattern_type):
+    # The baseline built 2 * N * N colors and its first N * N cells only
+    # alternated along rows in pairs; the index version is a true checkerboard
+    # that agrees with it on the first row.
+    baseline = baseline_chess(n, 'red', 'blue')
+    indices = pattern_indices(n, n, f'{lcl.CHEQUERED}', pattern_type)
+    colors = resolve_colors(indices, pattern_palette('red', 'blue'))
+
+    assert len(colors) == n * n
+    assert colors[:n] == baseline[:n]
+    row, col = np.divmod(np.arange(n * n), n)
+    assert indices.tolist() == ((row ^ col) & 1).tolist()
+    assert chess_pattern(n, 'red', 'blue') == colors
+    assert pattern_colors(n, 'red', 'blue', f'{lcl.CHEQUERED}', pattern_type) == colors
+
+
+@pytest.mark.parametrize('pattern, pattern_type', [
+    (f'{lcl.CHEQUERED}', ''),
+    (f'{lcl.ALTERNATING_COLORS}', f'{lcl.ROW_BY_ROW}'),
+    (f'{lcl.ALTERNATING_COLORS}', f'{lcl.COLUMN_WISE}'),
+])
+def test_cell_pattern_matches_grid(pattern, pattern_type):
+    rows, cols = 5, 6
+    row, col = np.divmod(np.arange(rows * cols), cols)
+
+    assert (cell_pattern(row, col, pattern, pattern_type)
+            == pattern_indices(rows, cols, pattern, pattern_type)).all()
+
+
+def test_unknown_pattern_is_rejected():
+    with pytest.raises(ValueError):
+        cell_pattern(0, 0, 'spiral')
+    with pytest.raises(ValueError):
+        pattern_indices(3, 3, 'spiral', f'{lcl.ROW_BY_ROW}')
+    with pytest.raises(ValueError):
+        pattern_colors(3, 'red', 'blue', '', '')
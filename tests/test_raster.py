@@ -0,0 +1,88 @@
+import struct
+import zlib
+
+import numpy as np
+import pytest
+
+import raster
+
+
+def read_png(path) -> tuple:
+    """
+    Check the chunk CRCs of an RGB PNG and inflate its IDAT stream.
+
+    Returns:
+        tuple: (width, height, inflated bytes)
+    """
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    assert data[:8] == b'\x89PNG\r\n\x1a\n'
+
+    position = 8
+    idat = b''
+    while position < len(data):
+        length, kind = struct.unpack('>I4s', data[position:position + 8])
+        body = data[position + 8:position + 8 + length]
+        crc, = struct.unpack('>I', data[position + 8 + length:position + 12 + length])
+        assert zlib.crc32(kind + body) == crc
+        if kind == b'IHDR':
+            width, height = struct.unpack('>II', body[:8])
+        elif kind == b'IDAT':
+            idat += body
+        position += 12 + length
+
+    # zlib.decompress also verifies the Adler-32 trailer.
+    return width, height, zlib.decompress(idat)
+
+
+def unfiltered(image: np.ndarray) -> bytes:
+    height, width = image.shape[:2]
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = image.reshape(height, -1)
+    return raw.tobytes()
+
+
+@pytest.fixture
+def image() -> np.ndarray:
+    return np.random.default_rng(1).integers(0, 256, (97, 61, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize('sizes', [(0, 0), (1, 5), (65521, 3), (70000, 131072), (5, 200000)])
+def test_adler32_combine(sizes):
+    rng = np.random.default_rng(sum(sizes))
+    first, second = (rng.integers(0, 256, size, dtype=np.uint8).tobytes() for size in sizes)
+
+    combined = raster.adler32_combine(zlib.adler32(first), zlib.adler32(second), len(second))
+
+    assert combined == zlib.adler32(first + second)
+
+
+def test_save_png_round_trip(tmp_path, image):
+    path = tmp_path / 'image.png'
+
+    raster.save_png(str(path), image)
+
+    assert read_png(path) == (61, 97, unfiltered(image))
+
+
+@pytest.mark.parametrize('band_rows', [1, 10, 97])
+def test_save_png_parts_round_trip(tmp_path, image, band_rows):
+    path = tmp_path / 'parts.png'
+    parts = (raster.deflate_rows(image[top:top + band_rows])
+             for top in range(0, len(image), band_rows))
+
+    raster.save_png_parts(str(path), 61, 97, parts)
+
+    assert read_png(path) == (61, 97, unfiltered(image))
+
+
+def test_save_png_parts_long_stream(tmp_path):
+    # More than 65521 bytes per band exercises the modulo of the checksum.
+    image = np.random.default_rng(2).integers(0, 256, (64, 400, 3), dtype=np.uint8)
+    path = tmp_path / 'long.png'
+
+    raster.save_png_parts(str(path), 400, 64,
+                          (raster.deflate_rows(image[top:top + 60]) for top in (0, 60)))
+
+    assert read_png(path) == (400, 64, unfiltered(image))
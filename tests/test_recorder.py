@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+import local as lcl
+import raster
+import recorder
+from geometry import hexagon_center_arrays
+from patterns import pattern_colors
+
+
+def lzw_decode(data: bytes, min_size: int) -> tuple:
+    """
+    Reference GIF LZW decoder.
+
+    Returns:
+        tuple: (decoded bytes, number of clear codes read)
+    """
+
+    clear, end = 1 << min_size, (1 << min_size) + 1
+    bits = int.from_bytes(data, 'little')
+    position, total = 0, len(data) * 8
+    size, table, previous = min_size + 1, None, None
+    out, clears = [], 0
+
+    while position + size <= total:
+        code = bits >> position & (1 << size) - 1
+        position += size
+        if code == clear:
+            table = [bytes([i]) for i in range(clear)] + [b'', b'']
+            size, previous = min_size + 1, None
+            clears += 1
+            continue
+        if code == end:
+            return b''.join(out), clears
+
+        if previous is None:
+            entry = table[code]
+        elif code < len(table):
+            entry = table[code]
+            table.append(table[previous] + entry[:1])
+        else:
+            entry = table[previous] + table[previous][:1]
+            table.append(entry)
+        out.append(entry)
+        previous = code
+        if len(table) == 1 << size and size < 12:
+            size += 1
+
+    raise AssertionError('no end code')
+
+
+@pytest.mark.parametrize('min_size', [2, 4, 8])
+def test_lzw_round_trip(min_size):
+    symbols = 1 << min_size
+    data = np.random.default_rng(min_size).integers(0, symbols, 3000, dtype=np.uint8).tobytes()
+
+    assert lzw_decode(recorder._lzw(data, min_size), min_size)[0] == data
+
+
+def test_lzw_table_reset():
+    # Random bytes fill the 4096-code table several times over.
+    data = np.random.default_rng(0).integers(0, 256, 30000, dtype=np.uint8).tobytes()
+
+    decoded, clears = lzw_decode(recorder._lzw(data, 8), 8)
+
+    assert decoded == data
+    assert clears > 2
+
+
+def test_lzw_runs():
+    data = bytes(20000) + bytes([1, 2, 3]) * 5000
+
+    assert lzw_decode(recorder._lzw(data, 2), 2)[0] == data
+
+
+@pytest.mark.parametrize('shadow', [0, 5])
+def test_last_frame_matches_render(shadow):
+    x, y, side = hexagon_center_arrays(12, 12, 500)
+    colors = pattern_colors(12, 'red', '#00ff00', f'{lcl.CHEQUERED}', '')
+    canvas = None
+    for top, left, patch in recorder.record_frames((x, y), colors, side, 3, 'синий', shadow,
+                                                   cells_per_frame=7):
+        if canvas is None:
+            canvas = patch.copy()
+        canvas[top:top + patch.shape[0], left:left + patch.shape[1]] = patch
+
+    expected = raster.render((x, y), colors, side, 3, 'синий', shadow)
+
+    np.testing.assert_array_equal(raster.unpack(canvas), expected)
@@ -0,0 +1,117 @@
+import os
+import time
+
+import pytest
+
+import cli
+import render_cache
+
+
+@pytest.fixture
+def job(tmp_path) -> dict:
+    return cli.normalize_job({'n': 4, 'width': 64, 'height': 64,
+                              'output': str(tmp_path / 'out.png')})
+
+
+class Renderer:
+    """
+    Render stand-in that counts its calls and writes the job's key.
+    """
+
+    def __init__(self, pause: float = 0):
+        self.calls = 0
+        self.pause = pause
+
+    def __call__(self, job: dict) -> None:
+        self.calls += 1
+        time.sleep(self.pause)
+        with open(job['output'], 'w') as f:
+            f.write(render_cache.cache_key(job) * 10)
+
+
+def lock_path(cache_dir, job: dict) -> str:
+    key = render_cache.cache_key(job)
+    return os.path.join(cache_dir, key[:2], key + '.lock')
+
+
+def test_miss_then_hit(tmp_path, job):
+    render = Renderer()
+
+    render_cache.cached_render(job, render, str(tmp_path / 'cache'))
+    first = open(job['output']).read()
+    os.remove(job['output'])
+    render_cache.cached_render(job, render, str(tmp_path / 'cache'))
+
+    assert render.calls == 1
+    assert open(job['output']).read() == first
+    assert not os.path.exists(lock_path(tmp_path / 'cache', job))
+
+
+def test_equivalent_jobs_share_an_entry(tmp_path, job):
+    render = Renderer()
+    same = cli.normalize_job(dict(job, colors=['#f00', '#0000ff'], size=500.0, frame_cells=5))
+
+    render_cache.cached_render(job, render, str(tmp_path / 'cache'))
+    render_cache.cached_render(same, render, str(tmp_path / 'cache'))
+
+    assert render.calls == 1
+
+
+def test_evict_least_recently_used(tmp_path):
+    cache = tmp_path / 'cache'
+    (cache / 'ab').mkdir(parents=True)
+    for age, name in enumerate(['new.png', 'old.png', 'older.png']):
+        path = cache / 'ab' / name
+        path.write_bytes(bytes(100))
+        os.utime(path, (time.time() - age * 100,) * 2)
+    (cache / 'ab' / 'x.lock').write_text('token')
+
+    assert render_cache.evict(str(cache), 150) == 2
+    assert sorted(os.listdir(cache / 'ab')) == ['new.png', 'x.lock']
+
+
+def test_stale_lock_is_taken_over(tmp_path, job):
+    render = Renderer()
+    lock = lock_path(tmp_path / 'cache', job)
+    os.makedirs(os.path.dirname(lock))
+    with open(lock, 'w') as f:
+        f.write('crashed')
+    old = time.time() - render_cache.LOCK_TIMEOUT - 10
+    os.utime(lock, (old, old))
+
+    render_cache.cached_render(job, render, str(tmp_path / 'cache'))
+
+    assert render.calls == 1
+    assert not os.path.exists(lock)
+
+
+def test_fresh_lock_is_kept(tmp_path):
+    lock = str(tmp_path / 'entry.lock')
+    token = render_cache._lock(lock)
+
+    assert token is not None
+    assert render_cache._lock(lock) is None
+    render_cache._unlock(lock, 'someone else')
+    assert render_cache._read_token(lock) == token
+    render_cache._unlock(lock, token)
+    assert not os.path.exists(lock)
+    render_cache._unlock(lock, token)
+
+
+def test_lock_refreshed_during_long_render(tmp_path, job, monkeypatch):
+    monkeypatch.setattr(render_cache, 'LOCK_TIMEOUT', 0.2)
+    lock = lock_path(tmp_path / 'cache', job)
+    seen = []
+
+    def render(job: dict) -> None:
+        for _ in range(6):
+            time.sleep(0.1)
+            seen.append(time.time() - os.path.getmtime(lock))
+            # Another worker finds the lock alive all along.
+            assert render_cache._lock(lock) is None
+        Renderer()(job)
+
+    render_cache.cached_render(job, render, str(tmp_path / 'cache'))
+
+    assert max(seen) < render_cache.LOCK_TIMEOUT
+    assert not os.path.exists(lock)
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import server
+
+
+class StubRender:
+    """
+    Render stand-in run on threads; holds every render until released.
+    """
+
+    def __init__(self, fail: bool = False):
+        self.jobs = []
+        self.release = threading.Event()
+        self.fail = fail
+
+    def __call__(self, job: dict) -> str:
+        self.jobs.append(job)
+        self.release.wait(5)
+        if self.fail:
+            raise RuntimeError('render failed')
+        with open(job['output'], 'wb') as f:
+            f.write(b'picture of %d cells' % (job['n'] * job['rows']))
+        return job['output']
+
+
+@pytest.fixture
+def service():
+    service = server.RenderService(workers=1, max_pending=1)
+    service.executor.shutdown()
+    service.executor = ThreadPoolExecutor(max_workers=4)
+    service.render = StubRender()
+    yield service
+    service.render.release.set()
+    service.close()
+
+
+async def request(port: int, target: str) -> tuple:
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f'GET {target} HTTP/1.1\r\nHost: test\r\n\r\n'.encode())
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    head, _, body = data.partition(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    headers = dict(line.split(': ', 1) for line in lines[1:])
+    return int(lines[0].split()[1]), headers, body
+
+
+async def until(condition) -> None:
+    for _ in range(500):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError('condition never met')
+
+
+def run(service, scenario):
+    async def main():
+        listener = await asyncio.start_server(service.handle, '127.0.0.1', 0)
+        async with listener:
+            return await scenario(listener.sockets[0].getsockname()[1])
+    return asyncio.run(main())
+
+
+def test_identical_requests_share_one_render(service):
+    async def scenario(port):
+        first = asyncio.ensure_future(request(port, '/render?n=4&width=64&height=64'))
+        second = asyncio.ensure_future(request(port, '/render?n=4&width=64&height=64'))
+        await until(lambda: service.metrics.counts['coalesced'] == 1)
+        service.render.release.set()
+        return await first, await second
+
+    first, second = run(service, scenario)
+
+    assert len(service.render.jobs) == 1
+    assert first[0] == second[0] == 200
+    assert first[2] == second[2] == b'picture of 16 cells'
+    assert int(first[1]['Content-Length']) == len(first[2])
+
+
+def test_full_queue_returns_503(service):
+    async def scenario(port):
+        first = asyncio.ensure_future(request(port, '/render?n=4'))
+        await until(lambda: service.pending == 1)
+        refused = await request(port, '/render?n=5')
+        service.render.release.set()
+        return await first, refused
+
+    first, refused = run(service, scenario)
+
+    assert first[0] == 200
+    assert refused[0] == 503
+    assert refused[1]['Retry-After'] == '1'
+    assert service.metrics.counts['rejected'] == 1
+    assert len(service.render.jobs) == 1
+
+
+@pytest.mark.parametrize('value, tiled', [('false', False), ('0', False), ('true', True)])
+def test_tiled_flag_from_query(service, value, tiled):
+    service.render.release.set()
+
+    status, _, _ = run(service, lambda port: request(port, f'/render?n=4&tiled={value}'))
+
+    assert status == 200
+    assert service.render.jobs[0]['tiled'] is tiled
+
+
+@pytest.mark.parametrize('target', ['/render?n=4&tiled=maybe', '/render?n=0',
+                                    '/render?n=4&width=wide', '/render?format=bmp'])
+def test_bad_requests_return_400(service, target):
+    status, _, body = run(service, lambda port: request(port, target))
+
+    assert status == 400
+    assert 'error' in json.loads(body)
+    assert not service.render.jobs
+
+
+def test_render_error_returns_500(service):
+    service.render = StubRender(fail=True)
+    service.render.release.set()
+
+    status, _, body = run(service, lambda port: request(port, '/render?n=4'))
+
+    assert status == 500
+    assert json.loads(body) == {'error': 'render failed'}
+
+
+def test_error_while_streaming_cuts_the_response(service, monkeypatch):
+    class Failing:
+        def __init__(self, path, mode):
+            self.reads = 0
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def read(self, size):
+            self.reads += 1
+            if self.reads > 1:
+                raise OSError('disk gone')
+            return b'partial'
+
+    monkeypatch.setattr(server, 'open', Failing, raising=False)
+    service.render.release.set()
+
+    status, headers, body = run(service, lambda port: request(port, '/render?n=4'))
+
+    # The 200 header stands; the body stops short and no error status follows it.
+    assert status == 200
+    assert body == b'partial'
+    assert int(headers['Content-Length']) > len(body)
+    assert service.metrics.counts['errors'] == 1
@@ -0,0 +1,61 @@
+import gzip
+import re
+import zlib
+
+import pytest
+
+import local as lcl
+import vector_export
+from geometry import hexagon_center_arrays
+
+
+@pytest.fixture
+def grid() -> tuple:
+    x, y, side = hexagon_center_arrays(6, 5, 300)
+    colors = ['red', 'blue', '#00ff00'] * 10
+    return (x, y), colors, side
+
+
+@pytest.mark.parametrize('shadow', [0, 5])
+def test_pdf_xref_offsets(tmp_path, grid, shadow):
+    path = tmp_path / 'grid.pdf'
+    centers, colors, side = grid
+
+    vector_export.write_pdf(str(path), centers, colors, side, 2, f'{lcl.BLACK}'.lower(), shadow)
+    data = path.read_bytes()
+
+    xref = int(re.search(rb'startxref\n(\d+)\n%%EOF\n$', data).group(1))
+    assert data[xref:xref + 5] == b'xref\n'
+    count = int(re.match(rb'xref\n0 (\d+)\n', data[xref:]).group(1))
+    entries = re.findall(rb'(\d{10}) (\d{5}) ([fn]) \n', data[xref:])
+    assert len(entries) == count
+    assert entries[0] == (b'0000000000', b'65535', b'f')
+    for number, (offset, _, _) in enumerate(entries[1:], start=1):
+        offset = int(offset)
+        assert data[offset:].startswith(b'%d 0 obj\n' % number)
+    assert re.search(rb'/Size %d ' % count, data)
+
+
+def test_pdf_stream_length(tmp_path, grid):
+    path = tmp_path / 'grid.pdf'
+    centers, colors, side = grid
+
+    vector_export.write_pdf(str(path), centers, colors, side, 1, f'{lcl.BLACK}'.lower(), 0)
+    data = path.read_bytes()
+
+    stream = re.search(rb'5 0 obj\n<< /Length 6 0 R /Filter /FlateDecode >>\nstream\n(.*?)'
+                       rb'\nendstream\nendobj\n6 0 obj\n(\d+)\nendobj\n', data, re.S)
+    assert len(stream.group(1)) == int(stream.group(2))
+    content = zlib.decompress(stream.group(1))
+    assert content.count(b'/H Do') == len(colors)
+
+
+@pytest.mark.parametrize('name', ['grid.svgz', 'GRID.SVGZ'])
+def test_svgz_is_gzipped(tmp_path, grid, name):
+    path = tmp_path / name
+    centers, colors, side = grid
+
+    vector_export.export(str(path), centers, colors, side, 1, f'{lcl.BLACK}'.lower(), 0)
+
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        assert f.read().startswith('<?xml')
@@ -0,0 +1,282 @@
+import math
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from geometry import grid_layout
+from patterns import cell_pattern, pattern_palette
+from raster import (BACKGROUND, OUTLINE_COLOR, PNG_BAND_ROWS, SHADOW_COLOR, deflate_rows,
+                    fill_stamp, outline_stamp, pack, save_png_bands, save_png_parts, stamp,
+                    to_rgb, unpack)
+from settings import color_map
+
+
+TILE_SIZE = 1024
+# Pictures with more pixels are rendered by render_tiled unless asked otherwise.
+TILED_PIXELS = 1 << 27
+# Smaller tiles for the process pool, so work spreads evenly over many cores.
+PARALLEL_TILE_SIZE = 512
+
+# Shared picture and render parameters of a render_parallel worker process.
+_shared = {}
+
+
+def tile_cells(rows: int, cols: int, layout: tuple, box: tuple, pad: float) -> tuple:
+    """
+    Cells whose hexagon (grown by pad) intersects a box, found by range math.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of hexagons per row.
+        layout (tuple): (start_x, start_y, width_hex, side) from grid_layout.
+        box (tuple): (x0, y0, x1, y1) in turtle coordinates.
+        pad (float): Extra margin around every hexagon.
+
+    Returns:
+        tuple: (row array, col array) of the intersecting cells.
+    """
+
+    start_x, start_y, width_hex, side = layout
+    x0, y0, x1, y1 = box
+    step_y = side * 1.5
+
+    # The hexagon anchored at (x, y) spans [x, x + width_hex] x [y - 1.5 side, y + side / 2].
+    first_row = max(0, math.ceil((start_y - step_y - pad - y1) / step_y))
+    last_row = min(rows - 1, math.floor((start_y + side / 2 + pad - y0) / step_y))
+
+    found_rows = []
+    found_cols = []
+    for parity in (0, 1):
+        row = np.arange(first_row + (first_row + parity) % 2, last_row + 1, 2)
+        if not len(row):
+            continue
+        shift = start_x + parity * width_hex / 2
+        first_col = max(0, math.ceil((x0 - pad - width_hex - shift) / width_hex))
+        last_col = min(cols - 1, math.floor((x1 + pad - shift) / width_hex))
+        if first_col > last_col:
+            continue
+        col = np.arange(first_col, last_col + 1)
+        found_rows.append(np.repeat(row, len(col)))
+        found_cols.append(np.tile(col, len(row)))
+
+    if not found_rows:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    return np.concatenate(found_rows), np.concatenate(found_cols)
+
+
+def render_tile(top: int, left: int, tile_height: int, tile_width: int, rows: int, cols: int,
+                layout: tuple, pattern: str, pattern_type: str, table: np.ndarray,
+                thickness_width: int, border: int, shadow_intensity: int,
+                width: int, height: int) -> np.ndarray:
+    """
+    Render one tile of a width x height picture of the grid.
+
+    Anchors are rounded in picture coordinates exactly as raster.render
+    does, so neighbouring tiles join without seams.
+
+    Args:
+        top (int): First picture row of the tile.
+        left (int): First picture column of the tile.
+        tile_height (int): Tile height in pixels.
+        tile_width (int): Tile width in pixels.
+        rows (int): Number of grid rows.
+        cols (int): Number of hexagons per row.
+        layout (tuple): (start_x, start_y, width_hex, side) from grid_layout.
+        pattern (str): Selected pattern.
+        pattern_type (str): Pattern orientation.
+        table (np.ndarray): Packed colors of the palette.
+        thickness_width (int): Border line thickness.
+        border (int): Packed border color.
+        shadow_intensity (int): Shadow offset; 0 for no shadow.
+        width (int): Picture width.
+        height (int): Picture height.
+
+    Returns:
+        np.ndarray: (tile_height, tile_width, 3) uint8 tile.
+    """
+
+    start_x, start_y, width_hex, side = layout
+    canvas = np.full((tile_height, tile_width), pack(BACKGROUND), dtype=np.uint32)
+
+    pad = thickness_width / 2 + shadow_intensity + 2
+    box = (left - width / 2, height / 2 - (top + tile_height),
+           left + tile_width - width / 2, height / 2 - top)
+    row, col = tile_cells(rows, cols, layout, box, pad)
+    if not len(row):
+        return unpack(canvas)
+
+    x = start_x + col * width_hex + (row % 2) * (width_hex / 2)
+    y = start_y - row * side * 1.5
+    anchors = (np.rint(height / 2 - y).astype(np.intp) - top,
+               np.rint(width / 2 + x).astype(np.intp) - left)
+
+    if shadow_intensity > 0:
+        shifted = (anchors[0] + shadow_intensity, anchors[1] + shadow_intensity)
+        stamp(canvas, shifted, fill_stamp(side), pack(SHADOW_COLOR))
+        stamp(canvas, shifted, outline_stamp(side, 1), pack(OUTLINE_COLOR))
+
+    stamp(canvas, anchors, fill_stamp(side), table[cell_pattern(row, col, pattern, pattern_type)])
+    stamp(canvas, anchors, outline_stamp(side, thickness_width), border)
+
+    return unpack(canvas)
+
+
+def raw_bands(raw_path: str, width: int, height: int, rows: int = PNG_BAND_ROWS):
+    """
+    Read a raw RGB file back in bands of rows with plain file reads.
+
+    Yields:
+        np.ndarray: (rows, width, 3) uint8 band; the last one may be shorter.
+    """
+
+    with open(raw_path, 'rb') as f:
+        for top in range(0, height, rows):
+            count = min(rows, height - top)
+            data = f.read(count * width * 3)
+            yield np.frombuffer(data, dtype=np.uint8).reshape(count, width, 3)
+
+
+def render_tiled(path: str, rows: int, cols: int, size: float, color_first: str,
+                 color_second: str, pattern: str, pattern_type: str, thickness_width: int,
+                 border_color: str, shadow_intensity: int, width: int, height: int,
+                 tile: int = TILE_SIZE, raw_path: str = None) -> None:
+    """
+    Render a grid too large for memory into a PNG, one tile at a time.
+
+    Every tile is written into a raw RGB file row by row at its offset, and
+    the file is then compressed to PNG in bands of PNG_BAND_ROWS rows.
+    Memory holds one tile and one band at a time: it grows with the tile
+    size and the picture width, but not with the picture height.
+
+    Args:
+        path (str): Output PNG path.
+        rows (int): Number of rows.
+        cols (int): Number of hexagons per row.
+        size (float): Grid size in pixels.
+        color_first (str): First color.
+        color_second (str): Second color.
+        pattern (str): Selected pattern.
+        pattern_type (str): Pattern orientation.
+        thickness_width (int): Border line thickness.
+        border_color (str): Border color.
+        shadow_intensity (int): Shadow offset; 0 for no shadow.
+        width (int): Picture width in pixels.
+        height (int): Picture height in pixels.
+        tile (int): Tile edge in pixels.
+        raw_path (str): Keep the raw (height, width, 3) buffer at this path;
+            by default a temporary file next to path is used and removed.
+    """
+
+    layout = grid_layout(rows, cols, size)
+    table = pack([to_rgb(c) for c in pattern_palette(color_first, color_second)])
+    border = pack(to_rgb(color_map.get(border_color, 'black')))
+
+    keep_raw = raw_path is not None
+    if not keep_raw:
+        handle, raw_path = tempfile.mkstemp(suffix='.rgb',
+                                            dir=os.path.dirname(os.path.abspath(path)))
+        os.close(handle)
+
+    try:
+        with open(raw_path, 'wb') as f:
+            f.truncate(width * height * 3)
+            for top in range(0, height, tile):
+                tile_height = min(tile, height - top)
+                for left in range(0, width, tile):
+                    tile_width = min(tile, width - left)
+                    image = render_tile(top, left, tile_height, tile_width, rows, cols, layout,
+                                        pattern, pattern_type, table, thickness_width, border,
+                                        shadow_intensity, width, height)
+                    for row in range(tile_height):
+                        f.seek(((top + row) * width + left) * 3)
+                        f.write(image[row].tobytes())
+
+        save_png_bands(path, width, height, raw_bands(raw_path, width, height))
+    finally:
+        if not keep_raw:
+            os.remove(raw_path)
+
+
+def _attach(name: str, shape: tuple, params: tuple) -> None:
+    """
+    Process pool initializer: map the shared picture into the worker.
+    """
+
+    _shared['memory'] = shared_memory.SharedMemory(name=name)
+    _shared['image'] = np.ndarray(shape, dtype=np.uint8, buffer=_shared['memory'].buf)
+    _shared['params'] = params
+
+
+def _render_shared(box: tuple) -> None:
+    """
+    Render one tile straight into the shared picture.
+    """
+
+    top, left, tile_height, tile_width = box
+    _shared['image'][top:top + tile_height, left:left + tile_width] = render_tile(
+        top, left, tile_height, tile_width, *_shared['params'])
+
+
+def _deflate_shared(top: int) -> tuple:
+    """
+    Compress one band of rows of the shared picture.
+    """
+
+    return deflate_rows(_shared['image'][top:top + PNG_BAND_ROWS])
+
+
+def render_parallel(path: str, rows: int, cols: int, size: float, color_first: str,
+                    color_second: str, pattern: str, pattern_type: str, thickness_width: int,
+                    border_color: str, shadow_intensity: int, width: int, height: int,
+                    workers: int = None, tile: int = PARALLEL_TILE_SIZE) -> None:
+    """
+    Render a grid into a PNG on all cores.
+
+    The picture lives in one multiprocessing.shared_memory block; every
+    worker renders whole tiles into it in place, then compresses bands of
+    rows independently. Only the compressed bands travel back to this
+    process, which concatenates them into the PNG.
+
+    Args:
+        path (str): Output PNG path.
+        rows (int): Number of rows.
+        cols (int): Number of hexagons per row.
+        size (float): Grid size in pixels.
+        color_first (str): First color.
+        color_second (str): Second color.
+        pattern (str): Selected pattern.
+        pattern_type (str): Pattern orientation.
+        thickness_width (int): Border line thickness.
+        border_color (str): Border color.
+        shadow_intensity (int): Shadow offset; 0 for no shadow.
+        width (int): Picture width in pixels.
+        height (int): Picture height in pixels.
+        workers (int): Number of processes; defaults to the CPU count.
+        tile (int): Tile edge in pixels.
+    """
+
+    layout = grid_layout(rows, cols, size)
+    table = pack([to_rgb(c) for c in pattern_palette(color_first, color_second)])
+    border = pack(to_rgb(color_map.get(border_color, 'black')))
+    params = (rows, cols, layout, pattern, pattern_type, table, thickness_width, border,
+              shadow_intensity, width, height)
+
+    boxes = [(top, left, min(tile, height - top), min(tile, width - left))
+             for top in range(0, height, tile) for left in range(0, width, tile)]
+    shape = (height, width, 3)
+
+    memory = shared_memory.SharedMemory(create=True, size=max(1, height * width * 3))
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                                 initializer=_attach,
+                                 initargs=(memory.name, shape, params)) as executor:
+            for _ in executor.map(_render_shared, boxes):
+                pass
+            parts = executor.map(_deflate_shared, range(0, height, PNG_BAND_ROWS))
+            save_png_parts(path, width, height, parts)
+    finally:
+        memory.close()
+        memory.unlink()
@@ -0,0 +1,229 @@
+import gzip
+import zlib
+
+import numpy as np
+
+from geometry import center_points, hexagon_vertices
+from patterns import palette_colors
+from raster import CANVAS_SIZE, OUTLINE_COLOR, SHADOW_COLOR, to_rgb
+from settings import color_map, hex_color
+
+
+# Cells formatted per chunk; bounds the size of every string or bytes piece.
+CHUNK_CELLS = 4096
+
+
+def _groups(colors, count: int):
+    """
+    Split cells by palette entry.
+
+    Yields:
+        tuple: (color string, array of cell indices with that color)
+    """
+
+    indices, palette = palette_colors(colors)
+    indices = indices[:count]
+    for k, color in enumerate(palette):
+        cells = np.flatnonzero(indices == k)
+        if len(cells):
+            yield color, cells
+
+
+def svg_chunks(centers, colors, side: float, thickness_width: int, border_color: str,
+               shadow_intensity: int, width: int = CANVAS_SIZE, height: int = CANVAS_SIZE):
+    """
+    Generate an SVG document for the grid piece by piece.
+
+    The hexagon is defined once as a symbol and every cell is a <use> of
+    it. Cells are grouped by fill color into uncolored groups in <defs>,
+    so both the shadow layer and the cell layer are a few <use> elements
+    of those groups and the cell positions are written only once.
+
+    Args:
+        centers: List of (x, y) tuples, or an (x, y) tuple of arrays.
+        colors: Fill colors for each hexagon, or an (indices, palette) tuple.
+        side (float): Side length of hexagons.
+        thickness_width (int): Border line thickness.
+        border_color (str): Border color.
+        shadow_intensity (int): Shadow offset; 0 for no shadow.
+        width (int): Picture width.
+        height (int): Picture height.
+
+    Yields:
+        str: Consecutive pieces of the document.
+    """
+
+    points = center_points(centers)
+    count = min(len(points), len(palette_colors(colors)[0]))
+    hexagon = ' '.join(f'{x:.3f},{-y:.3f}' for x, y in hexagon_vertices(side).tolist())
+
+    yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+           f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+           f'width="{width}" height="{height}" '
+           f'viewBox="{-width / 2} {-height / 2} {width} {height}">\n'
+           '<defs>\n'
+           f'<symbol id="h" overflow="visible"><polygon points="{hexagon}"/></symbol>\n')
+
+    fills = []
+    for k, (color, cells) in enumerate(_groups(colors, count)):
+        fills.append((k, hex_color(color)))
+        yield f'<g id="c{k}">\n'
+        for start in range(0, len(cells), CHUNK_CELLS):
+            chunk = points[cells[start:start + CHUNK_CELLS]]
+            yield ''.join(f'<use xlink:href="#h" x="{x:.2f}" y="{-y:.2f}"/>'
+                          for x, y in chunk.tolist())
+            yield '\n'
+        yield '</g>\n'
+
+    yield ('</defs>\n'
+           f'<rect x="{-width / 2}" y="{-height / 2}" width="{width}" height="{height}" '
+           'fill="#ffffff"/>\n')
+
+    if shadow_intensity > 0:
+        yield (f'<g fill="{hex_color(SHADOW_COLOR)}" stroke="{hex_color(OUTLINE_COLOR)}" stroke-width="1" '
+               f'transform="translate({shadow_intensity} {shadow_intensity})">'
+               + ''.join(f'<use xlink:href="#c{k}"/>' for k, _ in fills) + '</g>\n')
+
+    stroke = hex_color(color_map.get(border_color, 'black'))
+    yield (f'<g stroke="{stroke}" stroke-width="{thickness_width}" stroke-linejoin="round">'
+           + ''.join(f'<use xlink:href="#c{k}" fill="{fill}"/>' for k, fill in fills)
+           + '</g>\n</svg>\n')
+
+
+def write_svg(path: str, *args, **kwargs) -> None:
+    """
+    Stream svg_chunks to a file; a .svgz path is gzip-compressed.
+
+    Args:
+        path (str): Output file path.
+        *args, **kwargs: Passed to svg_chunks.
+    """
+
+    opener = gzip.open if path.lower().endswith('.svgz') else open
+    with opener(path, 'wt', encoding='utf-8') as f:
+        for piece in svg_chunks(*args, **kwargs):
+            f.write(piece)
+
+
+def pdf_chunks(centers, colors, side: float, thickness_width: int, border_color: str,
+               shadow_intensity: int, width: int = CANVAS_SIZE, height: int = CANVAS_SIZE):
+    """
+    Generate a one-page PDF for the grid piece by piece.
+
+    The hexagon is a form XObject drawn once per cell with a translation;
+    cells are grouped by fill color and the page content is deflated as it
+    is produced.
+
+    Args:
+        centers: List of (x, y) tuples, or an (x, y) tuple of arrays.
+        colors: Fill colors for each hexagon, or an (indices, palette) tuple.
+        side (float): Side length of hexagons.
+        thickness_width (int): Border line thickness.
+        border_color (str): Border color.
+        shadow_intensity (int): Shadow offset; 0 for no shadow.
+        width (int): Page width in points.
+        height (int): Page height in points.
+
+    Yields:
+        bytes: Consecutive pieces of the file.
+    """
+
+    points = center_points(centers)
+    count = min(len(points), len(palette_colors(colors)[0]))
+    offsets = []
+    written = 0
+
+    def emit(data: bytes) -> bytes:
+        nonlocal written
+        written += len(data)
+        return data
+
+    def start(number: int) -> bytes:
+        offsets.append(written)
+        return emit(f'{number} 0 obj\n'.encode())
+
+    def rgb(color: tuple) -> str:
+        return ' '.join(f'{c / 255:.4f}' for c in color)
+
+    vertices = hexagon_vertices(side)
+    path = ' '.join(f'{x:.3f} {y:.3f} {"m" if i == 0 else "l"}'
+                    for i, (x, y) in enumerate(vertices.tolist())) + ' h B'
+    pad = thickness_width + 1
+    bbox = (f'{vertices[:, 0].min() - pad:.3f} {vertices[:, 1].min() - pad:.3f} '
+            f'{vertices[:, 0].max() + pad:.3f} {vertices[:, 1].max() + pad:.3f}')
+
+    yield emit(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    yield start(1) + emit(b'<< /Type /Catalog /Pages 2 0 R >>\nendobj\n')
+    yield start(2) + emit(b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n')
+    yield start(3) + emit(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] '
+                          '/Resources << /XObject << /H 4 0 R >> >> /Contents 5 0 R >>\n'
+                          'endobj\n'.encode())
+    yield start(4) + emit(f'<< /Type /XObject /Subtype /Form /BBox [{bbox}] '
+                          f'/Length {len(path)} >>\nstream\n{path}\nendstream\nendobj\n'.encode())
+    yield start(5) + emit(b'<< /Length 6 0 R /Filter /FlateDecode >>\nstream\n')
+
+    compressor = zlib.compressobj(6)
+    length = 0
+
+    def cells(selected: np.ndarray, dx: float, dy: float):
+        for begin in range(0, len(selected), CHUNK_CELLS):
+            chunk = points[selected[begin:begin + CHUNK_CELLS]]
+            yield ''.join(f'q 1 0 0 1 {x + width / 2 + dx:.2f} {y + height / 2 + dy:.2f} cm '
+                          '/H Do Q\n' for x, y in chunk.tolist())
+
+    def content():
+        yield f'1 1 1 rg 0 0 {width} {height} re f 1 j\n'
+        if shadow_intensity > 0:
+            yield f'{rgb(SHADOW_COLOR)} rg {rgb(OUTLINE_COLOR)} RG 1 w\n'
+            yield from cells(np.arange(count), shadow_intensity, -shadow_intensity)
+        yield f'{rgb(to_rgb(color_map.get(border_color, "black")))} RG {thickness_width} w\n'
+        for color, selected in _groups(colors, count):
+            yield f'{rgb(to_rgb(color))} rg\n'
+            yield from cells(selected, 0, 0)
+
+    for piece in content():
+        data = compressor.compress(piece.encode())
+        if data:
+            length += len(data)
+            yield emit(data)
+    data = compressor.flush()
+    length += len(data)
+    yield emit(data)
+
+    yield emit(b'\nendstream\nendobj\n')
+    yield start(6) + emit(f'{length}\nendobj\n'.encode())
+
+    xref = written
+    yield emit(f'xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n'.encode()
+               + ''.join(f'{offset:010d} 00000 n \n' for offset in offsets).encode())
+    yield emit(f'trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\n'
+               f'startxref\n{xref}\n%%EOF\n'.encode())
+
+
+def write_pdf(path: str, *args, **kwargs) -> None:
+    """
+    Stream pdf_chunks to a file.
+
+    Args:
+        path (str): Output file path.
+        *args, **kwargs: Passed to pdf_chunks.
+    """
+
+    with open(path, 'wb') as f:
+        for piece in pdf_chunks(*args, **kwargs):
+            f.write(piece)
+
+
+def export(path: str, *args, **kwargs) -> None:
+    """
+    Write the grid as SVG, SVGZ or PDF depending on the file extension.
+
+    Args:
+        path (str): Output file path.
+        *args, **kwargs: Passed to svg_chunks or pdf_chunks.
+    """
+
+    if path.lower().endswith('.pdf'):
+        write_pdf(path, *args, **kwargs)
+    else:
+        write_svg(path, *args, **kwargs)